@@ -0,0 +1,148 @@
+"""
+배치 업로드 벤치마크: 로컬 가짜 Blogger 서버로 게시글 N개를 create_post로 한 건씩 올릴 때와
+create_posts(HTTP 배치 요청)로 올릴 때의 HTTP 왕복 수와 완료 시간을 비교하고, 중복 게시 방지 경로를 확인합니다.
+
+- partial: 429/5xx를 주입해 재시도 없이 일부만 성공시킨 뒤 다시 실행 → 실패한 글만 올라가고 중복이 없어야 함
+- lost: 서버가 글을 만든 뒤 500을 돌려줌 → 대조로 성공 처리하고 다시 보내지 않아야 함 (중복 없음)
+- pending: 서버에는 올라갔지만 응답을 받지 못한 글(원장 pending) → 다시 실행하면 대조만 하고 보내지 않아야 함
+- same title: 제목만 같고 본문이 다른 기존 글은 게시된 것으로 보지 않아야 함
+- unverified: pending 글을 대조할 수 없을 때(목록 조회 실패) create_post는 보내지 않고 pending으로 남겨야 함
+
+실행: python -m benchmarks.bench_batch_upload [--posts 40] [--latency 0.02] [--error-rate 0.3] [--lost-rate 0.3]
+"""
+import os
+import time
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime, timedelta, timezone
+from benchmarks.fake_blogger import FakeBlogger, FakeBloggerServer
+from src.blogger_client import BloggerClient
+from src.publish_ledger import PublishLedger, content_key, PENDING
+
+
+def _client(endpoint, ledger):
+    client = BloggerClient('bench', 'bench', 'bench', 'bench-blog', api_endpoint=endpoint, ledger=ledger)
+    # OAuth 갱신 없이 바로 요청하도록 유효한 토큰을 채워 둡니다
+    client.creds.token = 'bench-token'
+    client.creds.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    client.batch_backoff = 0.05
+    return client
+
+
+def _posts(n, prefix):
+    return [{'title': f"{prefix} {i}", 'content': f"<p>{prefix} 본문 {i}</p>", 'labels': ['bench']} for i in range(n)]
+
+
+@contextlib.contextmanager
+def _setup(latency, error_rate=0.0, seed=42, lost_rate=0.0):
+    fake = FakeBlogger(latency, error_rate, seed=seed, lost_rate=lost_rate)
+    with tempfile.TemporaryDirectory() as tmp, FakeBloggerServer(fake) as server:
+        ledger = PublishLedger(os.path.join(tmp, 'ledger.sqlite'))
+        try:
+            yield fake, _client(server.endpoint, ledger), ledger
+        finally:
+            ledger.close()
+
+
+def compare(args):
+    rows = []
+    for mode in ('create_post', 'create_posts'):
+        with _setup(args.latency) as (fake, client, _):
+            posts = _posts(args.posts, mode)
+            started = time.perf_counter()
+            if mode == 'create_post':
+                ok = sum(1 for p in posts if client.create_post(p['title'], p['content'], p['labels'], is_draft=False))
+            else:
+                ok = sum(1 for r in client.create_posts(posts, is_draft=False) if r['ok'])
+            rows.append((mode, ok, fake.http_requests, time.perf_counter() - started))
+    return rows
+
+
+def check_partial(args):
+    with _setup(args.latency, args.error_rate) as (fake, client, _):
+        posts = _posts(args.posts, 'partial')
+        first = client.create_posts(posts, is_draft=False, max_retries=0)
+        failed = sum(1 for r in first if not r['ok'])
+        assert failed, "--error-rate가 낮아 실패한 글이 없습니다"
+        fake.error_rate = 0.0
+        second = client.create_posts(posts, is_draft=False)
+        assert all(r['ok'] for r in second), "다시 실행해도 실패한 글이 있습니다"
+        assert sum(1 for r in second if r['skipped']) == len(posts) - failed, "이미 게시된 글을 다시 보냈습니다"
+        assert len(fake.posts) == len(posts), f"중복 게시: 서버에 {len(fake.posts)}개"
+        return failed
+
+
+def check_lost(args):
+    with _setup(args.latency, lost_rate=args.lost_rate) as (fake, client, _):
+        posts = _posts(args.posts, 'lost')
+        results = client.create_posts(posts, is_draft=False)
+        lost = sum(1 for r in results if r['skipped'])
+        assert lost, "--lost-rate가 낮아 500 후 만들어진 글이 없습니다"
+        assert all(r['ok'] for r in results), "500 후 만들어진 글을 성공으로 확인하지 못했습니다"
+        assert len(fake.posts) == len(posts), f"중복 게시: 서버에 {len(fake.posts)}개"
+        return lost
+
+
+def check_same_title(args):
+    with _setup(args.latency) as (fake, client, ledger):
+        post = _posts(1, 'same title')[0]
+        fake._insert('bench-blog', dict(post, content='<p>다른 본문</p>'), {'isDraft': ['false']})
+        key = content_key('bench-blog', post['title'], post['content'], post['labels'], False)
+        ledger.mark_pending(key, 'bench-blog', post['title'])
+        results = client.create_posts([post], is_draft=False)
+        assert results[0]['ok'] and not results[0]['skipped'], "제목만 같은 글을 게시된 것으로 보았습니다"
+        assert len(fake.posts) == 2
+
+
+def check_pending(args):
+    with _setup(args.latency) as (fake, client, ledger):
+        post = _posts(1, 'pending')[0]
+        # 서버는 처리했지만 응답을 받지 못한 상황: 서버에만 글이 있고 원장은 pending
+        fake._insert('bench-blog', post, {'isDraft': ['false']})
+        key = content_key('bench-blog', post['title'], post['content'], post['labels'], False)
+        ledger.mark_pending(key, 'bench-blog', post['title'])
+        results = client.create_posts([post], is_draft=False)
+        assert results[0]['ok'] and results[0]['skipped'], "pending 글을 대조하지 않았습니다"
+        assert len(fake.posts) == 1, "pending 글을 다시 보냈습니다"
+
+
+def check_unverified(args):
+    with _setup(args.latency) as (fake, client, ledger):
+        post = _posts(1, 'unverified')[0]
+        key = content_key('bench-blog', post['title'], post['content'], post['labels'], False)
+        ledger.mark_pending(key, 'bench-blog', post['title'])
+        fake.error_rate = 1.0  # 목록 조회 실패
+        assert client.create_post(post['title'], post['content'], post['labels'], is_draft=False) is None
+        assert ledger.get(key)['status'] == PENDING, "확인하지 못한 글의 pending 상태가 바뀌었습니다"
+        assert not fake.posts, "확인하지 못한 글을 다시 보냈습니다"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.02, help="Blogger 요청당 지연 시간(초)")
+    parser.add_argument('--error-rate', type=float, default=0.3, help="partial 확인에서 주입할 429/5xx 확률")
+    parser.add_argument('--lost-rate', type=float, default=0.3, help="lost 확인에서 글을 만든 뒤 500을 돌려줄 확률")
+    parser.add_argument('--verbose', action='store_true', help="클라이언트 로그 출력")
+    args = parser.parse_args()
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    with output:
+        rows = compare(args)
+        failed = check_partial(args)
+        lost = check_lost(args)
+        check_pending(args)
+        check_same_title(args)
+        check_unverified(args)
+
+    print(f"{'mode':<13} {'ok/posts':>9} {'http reqs':>10} {'wall s':>8}")
+    for mode, ok, requests, wall in rows:
+        print(f"{mode:<13} {ok:>4}/{args.posts:<4} {requests:>10} {wall:>8.2f}")
+    print(f"\npartial: 첫 실행 실패 {failed}개 → 다시 실행으로 모두 게시, 중복 없음")
+    print(f"lost: 500 후 만들어진 글 {lost}개 → 대조로 성공 처리, 중복 없음")
+    print("pending: 대조 후 재전송 없음 / same title: 본문이 다르면 새로 게시 / unverified: 보내지 않고 pending 유지")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+여러 블로그 게시 벤치마크: 블로그마다 파이프라인을 따로 실행(per-blog, 저장소를 블로그 수만큼 복사해 돌리던 방식)
+vs 주제별로 한 번 생성해 모든 블로그에 동시 게시(fanout)를 블로그 수별로 비교합니다.
+
+녹화된 Gemini 응답(FakeGenaiClient)과 로컬 가짜 Blogger 서버를 사용합니다. 블로그는 --languages 순서로 언어를 돌려 가며
+배정하므로, fanout에서는 주제마다 생성 1회 + 기준 언어가 아닌 언어별 현지화 1회가 호출됩니다.
+
+실행: python -m benchmarks.bench_fanout [--topics 4] [--blogs 1 2 4 8] [--languages ko en]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime, timedelta, timezone
+from benchmarks.bench_pipeline import ROUTER_COOLDOWNS, BLOGGER_BACKOFF, DEFAULT_REPORT_DIR, _git_revision
+
+
+def _engine(args):
+    from benchmarks.fake_genai import FakeGenaiClient
+    from src.content_engine import ContentEngine
+    from src.model_router import ModelRouter
+
+    fake = FakeGenaiClient(latency=args.gemini_latency, ttft=min(0.05, args.gemini_latency), seed=args.seed)
+    engine = ContentEngine('bench', client=fake)
+    engine.router = ModelRouter(engine.models, **ROUTER_COOLDOWNS)
+    return fake, engine
+
+
+def _pool(tenants, ledger_path):
+    from src.tenants import BloggerPool
+    from src.publish_ledger import PublishLedger
+
+    pool = BloggerPool(tenants, ledger=PublishLedger(ledger_path))
+    for tenant in tenants:
+        # OAuth 갱신 없이 바로 요청하도록 유효한 토큰을 채워 둡니다
+        client = pool.get(tenant)
+        client.creds.token = 'bench-token'
+        client.creds.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+        client.batch_backoff = BLOGGER_BACKOFF
+    pool.warm()
+    return pool
+
+
+def run_per_blog(tenants, topics, args, tmp):
+    from src.batch_runner import run_batch
+
+    calls, ok = 0, 0
+    for tenant in tenants:
+        # 블로그마다 독립된 실행 (생성 결과를 공유하지 않음)
+        fake, engine = _engine(args)
+        pool = _pool([tenant], os.path.join(tmp, f'ledger-{tenant.name}.sqlite'))
+        results = asyncio.run(run_batch(engine, pool.get(tenant), topics, concurrency=args.concurrency,
+                                        is_draft=tenant.draft))
+        if tenant.language != 'ko':
+            # 다른 언어 블로그는 따로 번역해 올리던 작업을 현지화 호출 1회로 계산
+            for result in results:
+                if result['ok']:
+                    asyncio.run(engine.localize_async('<h1>x</h1>', tenant.language))
+        calls += fake.calls
+        ok += sum(r['ok'] for r in results)
+        pool.ledger.close()
+    return calls, ok
+
+
+def run_fanout_mode(tenants, topics, args, tmp):
+    from src.fanout import plan_topics, run_fanout
+
+    fake, engine = _engine(args)
+    pool = _pool(tenants, os.path.join(tmp, 'ledger-fanout.sqlite'))
+    results = asyncio.run(run_fanout(engine, pool, plan_topics(tenants, topics), concurrency=args.concurrency))
+    pool.ledger.close()
+    return fake.calls, sum(r['ok'] for r in results)
+
+
+def main():
+    from benchmarks.fake_blogger import FakeBlogger, FakeBloggerServer
+    from src.tenants import Tenant
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--topics', type=int, default=4, help="서로 다른 주제 수")
+    parser.add_argument('--blogs', type=int, nargs='+', default=[1, 2, 4, 8], help="블로그 수")
+    parser.add_argument('--languages', nargs='+', default=['ko', 'en'], help="블로그에 돌려 가며 배정할 언어")
+    parser.add_argument('--concurrency', type=int, default=4, help="동시 처리 주제 수")
+    parser.add_argument('--gemini-latency', type=float, default=0.3, help="Gemini 호출당 응답 시간(초)")
+    parser.add_argument('--blogger-latency', type=float, default=0.05, help="Blogger 요청당 지연 시간(초)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="JSON 리포트 경로 (기본: .cache/bench/fanout-<시각>.json)")
+    parser.add_argument('--verbose', action='store_true', help="파이프라인 로그 출력")
+    args = parser.parse_args()
+
+    topics = [f"Bench Topic {i} ({chr(65 + i % 26)})" for i in range(args.topics)]
+    started = datetime.now(timezone.utc)
+    report = {'run': {'started': started.isoformat(), 'git': _git_revision(), 'topics': args.topics,
+                      'languages': args.languages}, 'results': []}
+
+    def measure(runner, blogs, topics):
+        fake_blogger = FakeBlogger(args.blogger_latency, seed=args.seed)
+        with tempfile.TemporaryDirectory() as tmp, FakeBloggerServer(fake_blogger) as server:
+            tenants = [
+                Tenant(name=f"blog-{i}", blog_id=str(1000 + i), client_id='bench', client_secret='bench',
+                       refresh_token='bench', language=args.languages[i % len(args.languages)],
+                       draft=False, api_endpoint=server.endpoint)
+                for i in range(blogs)
+            ]
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+            with output:
+                t0 = time.perf_counter()
+                calls, ok = runner(tenants, topics, args, tmp)
+                return calls, ok, time.perf_counter() - t0
+
+    # 첫 실행의 SDK import/discovery 문서 로드 비용이 첫 측정에 섞이지 않도록 한 번 미리 실행
+    measure(run_fanout_mode, 1, topics[:1])
+
+    print(f"{'mode':<9} {'blogs':>5} {'ok/posts':>9} {'gemini calls':>13} {'wall s':>8}")
+    for blogs in args.blogs:
+        for mode, runner in (('per-blog', run_per_blog), ('fanout', run_fanout_mode)):
+            calls, ok, wall = measure(runner, blogs, topics)
+            result = {'mode': mode, 'blogs': blogs, 'posts': blogs * len(topics), 'ok': ok,
+                      'gemini_calls': calls, 'wall_s': round(wall, 2)}
+            report['results'].append(result)
+            print(f"{mode:<9} {blogs:>5} {ok:>4}/{result['posts']:<4} {calls:>13} {wall:>8.2f}")
+
+    path = args.output or os.path.join(DEFAULT_REPORT_DIR, f"fanout-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n리포트 저장: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+업로드 전 HTML 축소 벤치마크: 크기별 축소 전/후 바이트와 처리 시간(KB당 ms로 선형성 확인)을 측정합니다.
+축소 후에도 제목/태그와 화면에 보이는 텍스트(태그 제거 + 공백 정리)가 같은지 확인합니다.
+
+실행: python -m benchmarks.bench_minify [--sizes 20 60 200 1000] [--repeat 20]
+"""
+import re
+import time
+import argparse
+from benchmarks.bench_postprocess import synthetic_post
+from benchmarks.fake_genai import FIXTURES_DIR
+from src.html_minifier import HtmlMinifier
+from src.postprocess import clean_html, scan
+
+_TAG_RE = re.compile(r'<[^>]*>')
+_WS_RE = re.compile(r'[ \t\n\r\f]+')
+
+
+def visible_text(html):
+    return _WS_RE.sub(' ', _TAG_RE.sub(' ', html)).strip()
+
+
+def check(body, minified):
+    assert scan(body, 'x')[:2] == scan(minified, 'x')[:2], "제목/태그가 달라졌습니다"
+    assert visible_text(body) == visible_text(minified), "보이는 텍스트가 달라졌습니다"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 60, 200, 1000], help="합성 게시글 크기 (KB)")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(f"{FIXTURES_DIR}/gemini_content.html", encoding='utf-8') as f:
+        inputs = [('fixture', clean_html(f.read()))]
+    inputs += [(f"{size}KB", clean_html(synthetic_post(size))) for size in args.sizes]
+
+    print(f"{'input':>8} {'before B':>10} {'after B':>10} {'saved':>7} {'ms':>8} {'ms/KB':>7}")
+    for name, body in inputs:
+        minified, stats = HtmlMinifier().minify(body)
+        check(body, minified)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            # 실제 실행처럼 style 캐시가 빈 상태에서 측정
+            HtmlMinifier().minify(body)
+        ms = (time.perf_counter() - started) / args.repeat * 1000
+        print(f"{name:>8} {stats['bytes_before']:>10} {stats['bytes_after']:>10} {stats['saved_pct']:>6.1f}% "
+              f"{ms:>8.2f} {ms / (stats['bytes_before'] / 1024):>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+전체 파이프라인 오프라인 벤치마크: 녹화된 Gemini 응답(FakeGenaiClient)과 로컬 가짜 Blogger 서버로
+ContentEngine → postprocess → BloggerClient 경로를 실제 코드 그대로 실행합니다.
+
+시나리오
+- single: main.py 단일 실행 경로(주제 추천 → 생성 → 후처리 → 업로드)를 순서대로 반복
+- batch:  배치 모드(run_batch) 동시 처리
+- storm:  배치 모드 + 높은 429/404 및 Blogger 5xx 비율
+
+게시글별 지연 시간 p50/p95, 분당 게시글 수, 최대 RSS를 JSON 리포트로 저장합니다.
+최대 RSS가 시나리오별 값이 되도록 각 시나리오는 별도 프로세스에서 실행됩니다.
+
+실행: python -m benchmarks.bench_pipeline [--scenarios single batch storm] [--posts 20] [--stream]
+      python -m benchmarks.bench_pipeline --compare .cache/bench/pipeline-이전.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+DEFAULT_REPORT_DIR = os.path.join('.cache', 'bench')
+
+SCENARIOS = {
+    'single': {
+        'mode': 'single', 'posts': 5, 'concurrency': 1,
+        'gemini_latency': 0.2, 'ttft': 0.05, 'rate_limit_rate': 0.0, 'not_found_rate': 0.0,
+        'blogger_latency': 0.02, 'blogger_error_rate': 0.0,
+    },
+    'batch': {
+        'mode': 'batch', 'posts': 20, 'concurrency': 4,
+        'gemini_latency': 0.2, 'ttft': 0.05, 'rate_limit_rate': 0.0, 'not_found_rate': 0.0,
+        'blogger_latency': 0.02, 'blogger_error_rate': 0.0,
+    },
+    'storm': {
+        'mode': 'batch', 'posts': 20, 'concurrency': 4,
+        'gemini_latency': 0.2, 'ttft': 0.05, 'rate_limit_rate': 0.3, 'not_found_rate': 0.05,
+        'blogger_latency': 0.02, 'blogger_error_rate': 0.1,
+    },
+}
+
+# 실제 쿨다운(수 초~하루)을 그대로 쓰면 벤치마크가 대기 시간만 재게 되므로 축소합니다
+ROUTER_COOLDOWNS = {'base_cooldown': 0.05, 'max_cooldown': 0.5, 'not_found_cooldown': 1.0, 'probe_poll': 0.05}
+# 배치 업로드 재시도 대기(기본 2초부터 지수 백오프)도 같은 이유로 축소
+BLOGGER_BACKOFF = 0.05
+
+
+def percentile(values, q):
+    """
+    선형 보간 백분위수 (q: 0~100).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def peak_rss_mb():
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(usage / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _build(params, endpoint, ledger_path):
+    from benchmarks.fake_genai import FakeGenaiClient
+    from src.content_engine import ContentEngine
+    from src.blogger_client import BloggerClient
+    from src.model_router import ModelRouter
+    from src.publish_ledger import PublishLedger
+
+    fake = FakeGenaiClient(
+        latency=params['gemini_latency'], ttft=params['ttft'],
+        rate_limit_rate=params['rate_limit_rate'], not_found_rate=params['not_found_rate'],
+        seed=params['seed'],
+    )
+    engine = ContentEngine('bench', client=fake)
+    engine.router = ModelRouter(engine.models, **ROUTER_COOLDOWNS)
+    blogger = BloggerClient('bench', 'bench', 'bench', 'bench-blog', api_endpoint=endpoint,
+                            ledger=PublishLedger(ledger_path))
+    # OAuth 갱신 없이 바로 요청하도록 유효한 토큰을 채워 둡니다
+    blogger.creds.token = 'bench-token'
+    blogger.creds.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+    blogger.batch_backoff = BLOGGER_BACKOFF
+    return fake, engine, blogger
+
+
+def _run_single(engine, blogger, params):
+    latencies, ok = [], 0
+    for _ in range(params['posts']):
+        started = time.perf_counter()
+        topic = engine.recommend_topic()
+        raw = engine.generate_content(topic, stream=params['stream'])
+        if raw:
+            post_result = engine.process(raw, topic)
+            if blogger.create_post(post_result.title, post_result.body, post_result.tags, is_draft=False):
+                ok += 1
+        latencies.append(time.perf_counter() - started)
+    return latencies, ok
+
+
+def _run_batch(engine, blogger, params):
+    from src.batch_runner import run_batch
+    topics = [f"Bench Topic {i} ({chr(65 + i % 26)})" for i in range(params['posts'])]
+    results = asyncio.run(run_batch(
+        engine, blogger, topics, concurrency=params['concurrency'], is_draft=False, stream=params['stream']
+    ))
+    return [r['elapsed'] for r in results], sum(1 for r in results if r['ok'])
+
+
+def run_scenario(name, params, verbose=False):
+    """
+    시나리오 하나를 실행하고 결과 dict를 반환합니다. (별도 프로세스에서 호출됨)
+    """
+    from benchmarks.fake_blogger import FakeBlogger, FakeBloggerServer
+
+    fake_blogger = FakeBlogger(params['blogger_latency'], params['blogger_error_rate'], seed=params['seed'])
+    with tempfile.TemporaryDirectory() as tmp, FakeBloggerServer(fake_blogger) as server:
+        fake, engine, blogger = _build(params, server.endpoint, os.path.join(tmp, 'ledger.sqlite'))
+        runner = _run_single if params['mode'] == 'single' else _run_batch
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+        with output:
+            started = time.perf_counter()
+            latencies, ok = runner(engine, blogger, params)
+            wall = time.perf_counter() - started
+        blogger.ledger.close()
+
+    ms = [v * 1000 for v in latencies]
+    return {
+        'params': params,
+        'posts': len(latencies),
+        'ok': ok,
+        'failed': len(latencies) - ok,
+        'wall_s': round(wall, 3),
+        'posts_per_min': round(ok / wall * 60, 2) if wall else None,
+        'latency_ms': {
+            'p50': round(percentile(ms, 50), 1),
+            'p95': round(percentile(ms, 95), 1),
+            'mean': round(sum(ms) / len(ms), 1),
+            'max': round(max(ms), 1),
+        },
+        'peak_rss_mb': peak_rss_mb(),
+        'gemini': {'calls': fake.calls, 'rate_limited': fake.errors[429], 'not_found': fake.errors[404]},
+        'blogger': {'requests': fake_blogger.requests, 'posts': len(fake_blogger.posts)},
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _delta(now, before):
+    if not before or now is None:
+        return '-'
+    return f"{(now - before) / before * 100:+.1f}%"
+
+
+def compare(report, baseline):
+    """
+    기준 리포트 대비 시나리오별 변화율을 출력합니다.
+    """
+    print(f"\n기준: {baseline['run'].get('started')} ({baseline['run'].get('git')})")
+    print(f"{'scenario':<10} {'p50':>10} {'p95':>10} {'posts/min':>10} {'rss':>10}")
+    for name, current in report['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        print(f"{name:<10} "
+              f"{_delta(current['latency_ms']['p50'], base['latency_ms']['p50']):>10} "
+              f"{_delta(current['latency_ms']['p95'], base['latency_ms']['p95']):>10} "
+              f"{_delta(current['posts_per_min'], base['posts_per_min']):>10} "
+              f"{_delta(current['peak_rss_mb'], base['peak_rss_mb']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=['single', 'batch', 'storm'])
+    parser.add_argument('--posts', type=int, help="시나리오별 게시글 수")
+    parser.add_argument('--concurrency', type=int, help="배치 시나리오 동시 처리 수")
+    parser.add_argument('--gemini-latency', type=float, help="Gemini 호출당 응답 시간(초)")
+    parser.add_argument('--ttft', type=float, help="첫 청크까지의 시간(초)")
+    parser.add_argument('--rate-limit-rate', type=float, help="Gemini 429 주입 확률")
+    parser.add_argument('--not-found-rate', type=float, help="Gemini 404 주입 확률")
+    parser.add_argument('--blogger-latency', type=float, help="Blogger 요청당 지연 시간(초)")
+    parser.add_argument('--blogger-error-rate', type=float, help="Blogger 429/5xx 주입 확률")
+    parser.add_argument('--stream', action='store_true', help="스트리밍 생성 경로 사용")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="JSON 리포트 경로 (기본: .cache/bench/pipeline-<시각>.json)")
+    parser.add_argument('--compare', help="비교할 이전 JSON 리포트")
+    parser.add_argument('--verbose', action='store_true', help="파이프라인 로그 출력")
+    args = parser.parse_args()
+
+    overrides = {
+        key: getattr(args, key)
+        for key in ('posts', 'concurrency', 'gemini_latency', 'ttft', 'rate_limit_rate', 'not_found_rate',
+                    'blogger_latency', 'blogger_error_rate')
+        if getattr(args, key) is not None
+    }
+    started = datetime.now(timezone.utc)
+    report = {
+        'run': {
+            'started': started.isoformat(),
+            'git': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'scenarios': {},
+    }
+
+    print(f"{'scenario':<10} {'ok/posts':>9} {'p50 ms':>9} {'p95 ms':>9} {'posts/min':>10} {'rss MB':>8}")
+    context = multiprocessing.get_context('spawn')
+    for name in args.scenarios:
+        params = dict(SCENARIOS[name], **overrides, stream=args.stream, seed=args.seed)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_scenario, name, params, args.verbose).result()
+        report['scenarios'][name] = result
+        print(f"{name:<10} {result['ok']:>4}/{result['posts']:<4} {result['latency_ms']['p50']:>9.1f} "
+              f"{result['latency_ms']['p95']:>9.1f} {result['posts_per_min']:>10.1f} {result['peak_rss_mb']:>8.1f}")
+
+    path = args.output or os.path.join(DEFAULT_REPORT_DIR, f"pipeline-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n리포트 저장: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
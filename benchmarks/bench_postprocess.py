@@ -0,0 +1,93 @@
+"""
+후처리 마이크로 벤치마크: 기존 정규식 다중 스캔 vs src.postprocess 단일 스캔.
+
+실행: python -m benchmarks.bench_postprocess [--sizes 20 60 200] [--repeat 50]
+"""
+import re
+import time
+import random
+import argparse
+from src.postprocess import process_post
+
+
+def legacy_process(raw_content, topic):
+    # 기존 ContentEngine.clean_html / extract_tags / main.py 제목 추출 로직 그대로
+    cleaned = raw_content.strip()
+    cleaned = re.sub(r'^```html\s*', '', cleaned, flags=re.IGNORECASE)
+    cleaned = re.sub(r'\s*```$', '', cleaned)
+    cleaned = cleaned.strip()
+
+    tags = []
+    match = re.search(r'<div id="tags"[^>]*>(.*?)</div>', cleaned, re.DOTALL)
+    if match:
+        for t in match.group(1).split(','):
+            tag = t.strip()
+            if tag and not re.match(r'^[0-9a-fA-F]{3,6}$', tag):
+                tags.append(tag)
+    for ht in re.findall(r'(?:^|\s)#(\w+)', cleaned):
+        if not re.match(r'^[0-9a-fA-F]{3,6}$', ht):
+            tags.append(ht)
+    tags = list(dict.fromkeys([t for t in tags if t]))[:20]
+
+    title_match = re.search(r'<h1[^>]*>(.*?)</h1>', cleaned, re.IGNORECASE | re.DOTALL)
+    if title_match:
+        title = re.sub('<[^<]+?>', '', title_match.group(1)).strip()
+    else:
+        alt = re.search(r'(?:^|\n)#\s*(.*?)(?:\n|$)', cleaned) or \
+              re.search(r'<strong>(.*?)</strong>', cleaned, re.IGNORECASE) or \
+              re.search(r'<b>(.*?)</b>', cleaned, re.IGNORECASE)
+        title = re.sub('<[^<]+?>', '', alt.group(1)).strip() if alt else topic
+    return title, tags, cleaned
+
+
+def synthetic_post(size_kb, seed=0):
+    """
+    인라인 스타일, 색상 코드, 테이블, 해시태그가 섞인 생성 결과와 비슷한 HTML을 만듭니다.
+    """
+    rng = random.Random(seed)
+    colors = ['#1a73e8', '#fff', '#333333', '#e8f0fe', '#d93025']
+    blocks = ['```html\n<div style="font-family: -apple-system, sans-serif; color: #333;">',
+              '<h1 style="font-size: 1.5rem; color: #1a73e8;">포드 모터 (F) <b>심층 분석</b></h1>']
+    while sum(len(b) for b in blocks) < size_kb * 1024:
+        color = rng.choice(colors)
+        blocks.append(
+            f'<div class="metric-card" style="padding: 1rem; border: 1px solid {color}; background: {color};">'
+            f'<strong>매출 성장률</strong> <span style="color: {color};">+{rng.randint(1, 30)}%</span></div>\n'
+        )
+        if rng.random() < 0.2:
+            blocks.append(
+                '<table class="tst-financial-table" style="width: 100%; border-collapse: collapse;">'
+                + ''.join(f'<tr><td style="padding: 0.5rem; color: {color};">{rng.randint(100, 999)}</td></tr>' for _ in range(5))
+                + '</table>\n'
+            )
+        if rng.random() < 0.1:
+            blocks.append(f'<p>관련 키워드: #가치투자 #배당주{rng.randint(1, 9)} #{rng.choice(["abc", "F", "자동차"])}</p>\n')
+    blocks.append('<div id="tags" style="display:none">포드, 자동차, 가치투자, fff</div></div>\n```')
+    return ''.join(blocks)
+
+
+def bench(fn, raw, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(raw, 'Ford Motor (F)')
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 60, 200], help="게시글 크기 (KB)")
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'legacy ms':>10} {'single ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        raw = synthetic_post(size)
+        new = process_post(raw, 'Ford Motor (F)')
+        assert (new.title, new.tags, new.body) == legacy_process(raw, 'Ford Motor (F)'), "출력이 기존 구현과 다릅니다"
+        legacy_ms = bench(legacy_process, raw, args.repeat)
+        single_ms = bench(process_post, raw, args.repeat)
+        print(f"{size:>6}KB {legacy_ms:>10.3f} {single_ms:>10.3f} {legacy_ms / single_ms:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+속도 제한 벤치마크: 서버 쪽 분당 한도가 있는 가짜 Gemini에 동시 생성 요청을 보내
+QuotaManager 없이(429를 받고 쿨다운) vs QuotaManager로 미리 예약(한도 안에서 간격을 둠)을 비교합니다.
+
+실제 한도 기준 시간(60초)을 그대로 쓰면 대기 시간만 재게 되므로 --window초로 축소합니다.
+가짜 서버와 QuotaManager는 같은 한도(--rpm 요청 / --window초)를 사용합니다.
+
+실행: python -m benchmarks.bench_quota [--topics 30] [--concurrency 8] [--rpm 5] [--window 1.0]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime, timezone
+from benchmarks.bench_pipeline import percentile, ROUTER_COOLDOWNS, DEFAULT_REPORT_DIR, _git_revision
+
+
+async def _generate_all(engine, topics, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(topic):
+        async with semaphore:
+            started = time.perf_counter()
+            text = await engine.generate_content_async(topic)
+            latencies.append(time.perf_counter() - started)
+            return text is not None
+
+    results = await asyncio.gather(*(one(topic) for topic in topics))
+    return sum(results), latencies
+
+
+def run_mode(mode, topics, args, workdir):
+    from benchmarks.fake_genai import FakeGenaiClient
+    from src.content_engine import ContentEngine
+    from src.model_router import ModelRouter
+    from src.quota import QuotaManager
+
+    fake = FakeGenaiClient(latency=args.latency, ttft=min(0.05, args.latency), seed=args.seed,
+                           rpm_limit=args.rpm, rpm_window=args.window)
+    engine = ContentEngine('bench', client=fake)
+    engine.router = ModelRouter(engine.models, **ROUTER_COOLDOWNS)
+    if mode == 'quota':
+        limits = {model: {'rpm': args.rpm} for model in engine.models}
+        engine.quota = QuotaManager(limits, path=os.path.join(workdir, f'quota-{mode}.sqlite'), window=args.window)
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    started = time.perf_counter()
+    with output:
+        ok, latencies = asyncio.run(_generate_all(engine, topics, args.concurrency))
+    elapsed = time.perf_counter() - started
+    if engine.quota is not None:
+        engine.quota.close()
+
+    return {
+        'topics': len(topics),
+        'ok': ok,
+        'calls': fake.calls,
+        'rate_limited': fake.errors[429],
+        'elapsed_s': round(elapsed, 2),
+        'latency_s': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--topics', type=int, default=30, help="생성할 주제 수")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시 생성 수")
+    parser.add_argument('--rpm', type=int, default=5, help="모델별 window초당 허용 요청 수 (가짜 서버와 QuotaManager 공통)")
+    parser.add_argument('--window', type=float, default=1.0, help="한도 기준 시간(초, 실제로는 60)")
+    parser.add_argument('--latency', type=float, default=0.2, help="Gemini 호출당 응답 시간(초)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="JSON 리포트 경로 (기본: .cache/bench/quota-<시각>.json)")
+    parser.add_argument('--verbose', action='store_true', help="생성 로그 출력")
+    args = parser.parse_args()
+
+    topics = [f"Bench Topic {i} ({chr(65 + i % 26)})" for i in range(args.topics)]
+    started = datetime.now(timezone.utc)
+    report = {
+        'run': {'started': started.isoformat(), 'git': _git_revision(), 'rpm': args.rpm, 'window': args.window,
+                'concurrency': args.concurrency, 'latency': args.latency},
+        'modes': {},
+    }
+
+    print(f"{'mode':<10} {'ok':>5} {'calls':>6} {'429':>5} {'elapsed s':>10} {'p50 s':>7} {'p95 s':>7}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in ('reactive', 'quota'):
+            result = run_mode(mode, topics, args, workdir)
+            report['modes'][mode] = result
+            print(f"{mode:<10} {result['ok']:>2}/{result['topics']:<2} {result['calls']:>6} "
+                  f"{result['rate_limited']:>5} {result['elapsed_s']:>10.2f} "
+                  f"{result['latency_s']['p50']:>7.2f} {result['latency_s']['p95']:>7.2f}")
+
+    path = args.output or os.path.join(DEFAULT_REPORT_DIR, f"quota-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n리포트 저장: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+섹션 분할 생성 벤치마크: 한 번에 생성(monolithic) vs 팩트 시트 → 섹션 병렬 생성(sectioned)의 완료 시간 비교.
+
+출력 토큰 생성은 호출 안에서 순차적이므로, 가짜 클라이언트의 응답 시간을 ttft + 응답 길이 / output_rate로
+두고 녹화 응답(benchmarks/fixtures/)을 재생합니다. 조립 결과가 후처리(제목/태그 추출)를 통과하는지도 확인합니다.
+
+실행: python -m benchmarks.bench_sectioned [--topics 3] [--output-rate 1000] [--ttft 0.5] [--stream]
+"""
+import os
+import json
+import time
+import argparse
+import contextlib
+from datetime import datetime, timezone
+from benchmarks.bench_pipeline import percentile, ROUTER_COOLDOWNS, DEFAULT_REPORT_DIR, _git_revision
+
+
+def run_mode(mode, topics, args):
+    from benchmarks.fake_genai import FakeGenaiClient
+    from src.content_engine import ContentEngine
+    from src.model_router import ModelRouter
+
+    fake = FakeGenaiClient(ttft=args.ttft, output_rate=args.output_rate, seed=args.seed)
+    engine = ContentEngine('bench', client=fake)
+    engine.router = ModelRouter(engine.models, **ROUTER_COOLDOWNS)
+    engine.sectioned = mode == 'sectioned'
+
+    latencies, chars, titles_ok = [], 0, 0
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    with output:
+        for topic in topics:
+            started = time.perf_counter()
+            raw = engine.generate_content(topic, stream=args.stream)
+            latencies.append(time.perf_counter() - started)
+            if raw:
+                post = engine.process(raw, topic)
+                chars += len(post.body)
+                titles_ok += post.title != topic and bool(post.tags)
+
+    return {
+        'topics': len(topics),
+        'complete_s': {
+            'p50': round(percentile(latencies, 50), 3),
+            'max': round(max(latencies), 3),
+        },
+        'calls': fake.calls,
+        'body_chars': chars // max(len(topics), 1),
+        'title_and_tags_ok': titles_ok,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--topics', type=int, default=3, help="모드별 생성 횟수")
+    parser.add_argument('--output-rate', type=float, default=1000.0, help="초당 출력 글자 수 (호출당)")
+    parser.add_argument('--ttft', type=float, default=0.5, help="첫 청크까지의 시간(초)")
+    parser.add_argument('--stream', action='store_true', help="스트리밍 생성 경로 사용")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="JSON 리포트 경로 (기본: .cache/bench/sectioned-<시각>.json)")
+    parser.add_argument('--verbose', action='store_true', help="생성 로그 출력")
+    args = parser.parse_args()
+
+    topics = [f"Bench Topic {i} ({chr(65 + i % 26)})" for i in range(args.topics)]
+    started = datetime.now(timezone.utc)
+    report = {
+        'run': {'started': started.isoformat(), 'git': _git_revision(), 'output_rate': args.output_rate,
+                'ttft': args.ttft, 'stream': args.stream},
+        'modes': {},
+    }
+
+    print(f"{'mode':<12} {'p50 s':>8} {'max s':>8} {'calls':>6} {'chars':>7} {'ok':>4}")
+    for mode in ('monolithic', 'sectioned'):
+        result = run_mode(mode, topics, args)
+        report['modes'][mode] = result
+        print(f"{mode:<12} {result['complete_s']['p50']:>8.2f} {result['complete_s']['max']:>8.2f} "
+              f"{result['calls']:>6} {result['body_chars']:>7} {result['title_and_tags_ok']:>4}")
+
+    mono = report['modes']['monolithic']['complete_s']['p50']
+    sectioned = report['modes']['sectioned']['complete_s']['p50']
+    report['speedup'] = round(mono / sectioned, 2) if sectioned else None
+    print(f"\n완료 시간 p50: {mono:.2f}s → {sectioned:.2f}s (x{report['speedup']})")
+
+    path = args.output or os.path.join(DEFAULT_REPORT_DIR, f"sectioned-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"리포트 저장: {path}")
+
+
+if __name__ == '__main__':
+    main()
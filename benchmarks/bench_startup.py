@@ -0,0 +1,127 @@
+"""
+시작 시간 벤치마크: `python -X importtime`으로 진입점별 import 시간과 SDK 로드 여부를 측정합니다.
+
+경로
+- import:   `import main` (모듈 로드만)
+- missing:  환경 변수 없이 `main.py` 실행 (설정 오류로 바로 종료하는 경로)
+- check:    `main.py --check --offline` (클라이언트 없이 설정 형식만 확인)
+- list_models: API 키 없이 `list_models.py` 실행
+
+각 경로를 별도 프로세스로 repeat번 실행해 중앙값을 JSON 리포트로 저장합니다.
+
+실행: python -m benchmarks.bench_startup [--repeat 5] [--compare .cache/bench/startup-이전.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from benchmarks.bench_pipeline import DEFAULT_REPORT_DIR, _git_revision, _delta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 불러오면 시작 시간이 크게 늘어나는 SDK (클라이언트를 만들 때만 불러와야 함)
+HEAVY_MODULES = ('google.genai', 'googleapiclient.discovery', 'google.oauth2.credentials', 'httplib2', 'dotenv')
+
+# 형식 검사를 통과하는 가짜 설정 (네트워크 요청은 하지 않음)
+CHECK_ENV = {
+    'GEMINI_API_KEY': 'bench-key-0123456789abcdef',
+    'CLIENT_ID': 'bench.apps.googleusercontent.com',
+    'CLIENT_SECRET': 'bench-secret',
+    'REFRESH_TOKEN': 'bench-refresh-token',
+    'BLOG_ID': '1234567890',
+}
+ENV_KEYS = ('GEMINI_API_KEY', 'GOOGLE_API_KEY', 'CLIENT_ID', 'BLOGGER_CLIENT_ID', 'CLIENT_SECRET',
+            'BLOGGER_CLIENT_SECRET', 'REFRESH_TOKEN', 'BLOGGER_REFRESH_TOKEN', 'BLOG_ID', 'BLOGGER_BLOG_ID')
+
+PATHS = {
+    'import': (['-c', 'import main'], {}),
+    'missing': (['main.py'], {}),
+    'check': (['main.py', '--check', '--offline'], CHECK_ENV),
+    'list_models': (['list_models.py'], {}),
+}
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime 출력에서 ({모듈: 누적 시간(µs)}, 최상위 import 누적 시간 합계(µs))를 구합니다.
+    """
+    modules, top_level = {}, 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, raw = line[len('import time:'):].split('|')
+        name = raw.strip()
+        modules[name] = int(cumulative)
+        # 들여쓰기가 없는 줄이 최상위 import (하위 import는 두 칸씩 들여씀)
+        if len(raw) - len(raw.lstrip()) == 1:
+            top_level += int(cumulative)
+    return modules, top_level
+
+
+def run_path(args, env_overrides, cwd):
+    env = {k: v for k, v in os.environ.items() if k not in ENV_KEYS}
+    env.update(env_overrides)
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=cwd, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    # 최상위 import 합계가 전체 import 시간 (site 등 인터프리터 기본 import 포함)
+    modules, top_level = parse_importtime(proc.stderr)
+    return wall, top_level, sorted(m for m in HEAVY_MODULES if m in modules)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--paths', nargs='+', choices=sorted(PATHS), default=list(PATHS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="JSON 리포트 경로 (기본: .cache/bench/startup-<시각>.json)")
+    parser.add_argument('--compare', help="비교할 이전 JSON 리포트")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    report = {'run': {'started': started.isoformat(), 'git': _git_revision(), 'repeat': args.repeat}, 'paths': {}}
+
+    # .env가 측정에 섞이지 않도록 빈 작업 디렉터리에서 실행 (모듈은 PYTHONPATH로 찾음)
+    cwd = os.path.join(DEFAULT_REPORT_DIR, 'startup-cwd')
+    os.makedirs(cwd, exist_ok=True)
+    os.environ['PYTHONPATH'] = ROOT + os.pathsep + os.environ.get('PYTHONPATH', '')
+
+    print(f"{'path':<12} {'wall ms':>9} {'import ms':>10}  heavy modules")
+    for name in args.paths:
+        argv, env = PATHS[name]
+        argv = [os.path.join(ROOT, a) if a.endswith('.py') else a for a in argv]
+        runs = [run_path(argv, env, cwd) for _ in range(args.repeat)]
+        result = {
+            'wall_ms': round(statistics.median(r[0] for r in runs) * 1000, 1),
+            'import_ms': round(statistics.median(r[1] for r in runs) / 1000, 1),
+            'heavy_modules': runs[-1][2],
+        }
+        report['paths'][name] = result
+        print(f"{name:<12} {result['wall_ms']:>9.1f} {result['import_ms']:>10.1f}  "
+              f"{', '.join(result['heavy_modules']) or '-'}")
+
+    path = args.output or os.path.join(DEFAULT_REPORT_DIR, f"startup-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n리포트 저장: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n기준: {baseline['run'].get('started')} ({baseline['run'].get('git')})")
+        for name, current in report['paths'].items():
+            base = baseline['paths'].get(name)
+            if base:
+                print(f"{name:<12} wall {_delta(current['wall_ms'], base['wall_ms']):>8} "
+                      f"import {_delta(current['import_ms'], base['import_ms']):>8}")
+
+
+if __name__ == '__main__':
+    main()
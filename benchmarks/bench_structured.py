@@ -0,0 +1,64 @@
+"""
+구조화 리포트 벤치마크: 같은 글을 HTML 응답으로 받았을 때(정리 → 제목/태그 스캔 → 축소)와
+JSON 리포트로 받았을 때(파싱 → Blogger HTML 렌더링)의 후처리 시간, 응답/본문 크기, 출력 토큰 수를 비교하고
+같은 리포트를 AMP 문서로 렌더링하는 시간을 측정합니다. 녹화된 Gemini 응답(fixtures)을 사용합니다.
+
+렌더링 결과가 이미 축소된 형태인지(축소기를 다시 돌려도 줄지 않는지)와
+제목/태그가 리포트 필드와 같은지 확인합니다.
+
+실행: python -m benchmarks.bench_structured [--repeat 200]
+"""
+import time
+import argparse
+from benchmarks.fake_genai import FIXTURES_DIR, load_fixtures
+from src.html_minifier import HtmlMinifier
+from src.postprocess import process_post, scan
+from src.report_model import parse_report
+from src.report_render import render_post, render_amp
+
+
+def _usage(name_match):
+    for match, _, usage in load_fixtures():
+        if match == name_match:
+            return usage
+    return {}
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with open(f"{FIXTURES_DIR}/gemini_content.html", encoding='utf-8') as f:
+        raw_html = f.read()
+    with open(f"{FIXTURES_DIR}/report.json", encoding='utf-8') as f:
+        raw_json = f.read()
+
+    html_post, html_ms = timed(lambda: process_post(raw_html, 'x', HtmlMinifier()), args.repeat)
+    json_post, json_ms = timed(lambda: render_post(parse_report(raw_json)), args.repeat)
+    amp, amp_ms = timed(lambda: render_amp(json_post.report, 'https://example.blogspot.com/p.html'), args.repeat)
+
+    report = json_post.report
+    assert (json_post.title, json_post.tags) == (report.title, report.tags), "제목/태그가 리포트 필드와 다릅니다"
+    assert scan(json_post.body, 'x')[:2] == (report.title, report.tags), "본문의 제목/태그 div가 리포트와 다릅니다"
+    _, stats = HtmlMinifier().minify(json_post.body)
+    assert stats['saved_pct'] < 1.0, f"렌더링 결과가 축소 형태가 아닙니다 (-{stats['saved_pct']}%)"
+
+    html_tokens = _usage('').get('candidates_token_count', 0)
+    json_tokens = _usage('[구조화 리포트 작성]').get('candidates_token_count', 0)
+    print(f"{'path':<10} {'response B':>11} {'body B':>8} {'output tok':>11} {'post ms':>8}")
+    print(f"{'html':<10} {len(raw_html.encode()):>11} {len(html_post.body.encode()):>8} {html_tokens:>11} {html_ms:>8.3f}")
+    print(f"{'structured':<10} {len(raw_json.encode()):>11} {len(json_post.body.encode()):>8} {json_tokens:>11} {json_ms:>8.3f}")
+    print(f"{'amp':<10} {'':>11} {len(amp.encode()):>8} {'':>11} {amp_ms:>8.3f}")
+    print(f"\n렌더링 결과 재축소: {stats['bytes_before']} → {stats['bytes_after']} 바이트 (-{stats['saved_pct']}%)")
+
+
+if __name__ == '__main__':
+    main()
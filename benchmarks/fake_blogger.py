@@ -0,0 +1,247 @@
+"""
+로컬 가짜 Blogger API v3 서버 (테스트/벤치마크용).
+
+지원: posts.insert / posts.list / posts.get / posts.patch, HTTP 배치 엔드포인트(/batch)
+지연 시간과 오류율(429/500), 글을 만든 뒤 500을 돌려주는 비율(lost_rate)을 주입할 수 있습니다.
+
+실행: python -m benchmarks.fake_blogger --port 8765 --latency 0.05 --error-rate 0.1
+BloggerClient(..., api_endpoint='http://127.0.0.1:8765/') 또는 BLOGGER_API_ENDPOINT 환경 변수로 연결합니다.
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from email.parser import FeedParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timezone
+
+_POSTS_RE = re.compile(r'^/v3/blogs/([^/]+)/posts/?$')
+_POST_RE = re.compile(r'^/v3/blogs/([^/]+)/posts/([^/]+)$')
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class FakeBlogger:
+    """
+    메모리에 게시글을 보관하는 Blogger API 흉내. 서버와 분리되어 있어 요청 단위로 재사용됩니다.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=None, lost_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        # posts.insert를 처리한 뒤 응답만 500으로 돌려줄 확률 (서버에서 처리됐지만 결과를 모르는 경우)
+        self.lost_rate = lost_rate
+        self.rng = random.Random(seed)
+        self.posts = {}
+        self.requests = 0       # API 요청 수 (배치 안의 요청도 한 건씩)
+        self.http_requests = 0  # HTTP 왕복 수 (배치 요청은 한 번)
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._next_id = 1000
+
+    def handle(self, method, path, query, body):
+        """
+        단일 API 요청을 처리하고 (status, dict)를 반환합니다.
+        """
+        with self._lock:
+            self.requests += 1
+            fail = self.rng.random() < self.error_rate
+            status = self.rng.choice([429, 500, 503]) if fail else None
+            lost = not fail and self.lost_rate and self.rng.random() < self.lost_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if status:
+            return status, {'error': {'code': status, 'message': 'injected failure'}}
+
+        match = _POSTS_RE.match(path)
+        if match and method == 'POST':
+            post = self._insert(match.group(1), body, query)
+            if lost:
+                return 500, {'error': {'code': 500, 'message': 'injected failure after insert'}}
+            return 200, post
+        if match and method == 'GET':
+            return 200, self._list(match.group(1), query)
+        match = _POST_RE.match(path)
+        if match and method == 'GET':
+            post = self.posts.get(match.group(2))
+            return (200, post) if post else (404, {'error': {'code': 404, 'message': 'Not Found'}})
+        if match and method == 'PATCH':
+            return self._patch(match.group(2), body)
+        return 404, {'error': {'code': 404, 'message': f'Unknown endpoint {method} {path}'}}
+
+    def _insert(self, blog_id, body, query):
+        with self._lock:
+            self._next_id += 1
+            post_id = str(self._next_id)
+            now = _now()
+            post = {
+                'kind': 'blogger#post',
+                'id': post_id,
+                'blog': {'id': blog_id},
+                'title': body.get('title', ''),
+                'content': body.get('content', ''),
+                'labels': body.get('labels', []),
+                'published': now,
+                'updated': now,
+                'status': 'DRAFT' if query.get('isDraft', ['false'])[0] == 'true' else 'LIVE',
+                'url': f'http://fake-blogger.local/{blog_id}/{post_id}.html',
+            }
+            self.posts[post_id] = post
+            return post
+
+    def _patch(self, post_id, body):
+        with self._lock:
+            post = self.posts.get(post_id)
+            if post is None:
+                return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+            post.update({k: v for k, v in body.items() if k in ('title', 'content', 'labels')})
+            post['updated'] = _now()
+            return 200, post
+
+    def _list(self, blog_id, query):
+        order = query.get('orderBy', ['PUBLISHED'])[0].lower()
+        key = 'updated' if order == 'updated' else 'published'
+        fetch_bodies = query.get('fetchBodies', ['true'])[0] == 'true'
+        max_results = int(query.get('maxResults', ['20'])[0])
+        offset = int(query.get('pageToken', ['0'])[0])
+        with self._lock:
+            items = sorted(
+                (p for p in self.posts.values() if p['blog']['id'] == blog_id),
+                key=lambda p: (p[key], p['id']), reverse=True
+            )
+        page = items[offset:offset + max_results]
+        if not fetch_bodies:
+            page = [{k: v for k, v in p.items() if k != 'content'} for p in page]
+        result = {'kind': 'blogger#postList', 'items': page}
+        if offset + max_results < len(items):
+            result['nextPageToken'] = str(offset + max_results)
+        return result
+
+
+def _make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _body(self):
+            length = int(self.headers.get('content-length') or 0)
+            return self.rfile.read(length) if length else b''
+
+        def _send(self, status, payload, content_type='application/json'):
+            data = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _dispatch(self, method):
+            parsed = urlparse(self.path)
+            raw = self._body()
+            with fake._lock:
+                fake.http_requests += 1
+            if parsed.path.rstrip('/') == '/batch' and method == 'POST':
+                self._batch(raw)
+                return
+            body = json.loads(raw) if raw else {}
+            status, payload = fake.handle(method, parsed.path, parse_qs(parsed.query), body)
+            self._send(status, payload)
+
+        def _batch(self, raw):
+            with fake._lock:
+                fake.batches += 1
+            parser = FeedParser()
+            parser.feed(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n")
+            parser.feed(raw.decode('utf-8'))
+            message = parser.close()
+
+            boundary = f"batch_{random.getrandbits(64):016x}"
+            parts = []
+            for part in message.get_payload():
+                inner = part.get_payload()
+                request_line, rest = inner.split('\n', 1)
+                method, target, _ = request_line.split(' ', 2)
+                body_text = rest.split('\n\n', 1)[1] if '\n\n' in rest else ''
+                parsed = urlparse(target)
+                body = json.loads(body_text) if body_text.strip() else {}
+                status, payload = fake.handle(method, parsed.path, parse_qs(parsed.query), body)
+                content_id = part['Content-ID'][1:-1]
+                parts.append(
+                    f"--{boundary}\r\n"
+                    f"Content-Type: application/http\r\n"
+                    f"Content-ID: <response-{content_id}>\r\n\r\n"
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                    f"{json.dumps(payload)}\r\n"
+                )
+            data = (''.join(parts) + f"--{boundary}--\r\n").encode('utf-8')
+            self._send(200, data, f'multipart/mixed; boundary={boundary}')
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_PATCH(self):
+            self._dispatch('PATCH')
+
+    return Handler
+
+
+class FakeBloggerServer:
+    """
+    백그라운드 스레드에서 FakeBlogger를 HTTP로 제공합니다.
+    with FakeBloggerServer() as server: BloggerClient(..., api_endpoint=server.endpoint)
+    """
+
+    def __init__(self, fake=None, host='127.0.0.1', port=0):
+        self.fake = fake or FakeBlogger()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self.fake))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="요청당 지연 시간(초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="요청당 429/5xx 주입 확률")
+    args = parser.parse_args()
+    server = FakeBloggerServer(FakeBlogger(args.latency, args.error_rate), port=args.port)
+    print(f"가짜 Blogger 서버 실행 중: {server.endpoint}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
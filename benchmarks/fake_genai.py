@@ -0,0 +1,213 @@
+"""
+녹화된 Gemini 응답을 재생하는 가짜 google-genai 클라이언트 (테스트/벤치마크용).
+
+ContentEngine(..., client=FakeGenaiClient(...))로 주입하면 네트워크 없이 동기/비동기,
+일반/스트리밍 호출 경로를 모두 실행할 수 있습니다. 지연 시간과 429/404 오류율을 주입할 수 있습니다.
+응답은 benchmarks/fixtures/gemini_responses.json에 녹화되어 있습니다.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from google.genai import errors, types
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+DEFAULT_FIXTURES = os.path.join(FIXTURES_DIR, 'gemini_responses.json')
+
+
+def load_fixtures(path=DEFAULT_FIXTURES):
+    """
+    녹화 파일을 읽어 [(match, [text, ...], usage), ...] 목록으로 반환합니다.
+    file 항목은 같은 디렉터리의 파일 내용을 응답 본문으로 사용합니다.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    base = os.path.dirname(path)
+    fixtures = []
+    for entry in data['responses']:
+        if 'file' in entry:
+            with open(os.path.join(base, entry['file']), encoding='utf-8') as f:
+                texts = [f.read()]
+        else:
+            texts = entry['texts']
+        fixtures.append((entry.get('match', ''), texts, entry.get('usage') or {}))
+    return fixtures
+
+
+def _api_error(code):
+    if code == 429:
+        body = {'error': {'code': 429, 'message': 'Resource has been exhausted (e.g. check quota).',
+                          'status': 'RESOURCE_EXHAUSTED'}}
+    else:
+        body = {'error': {'code': 404, 'message': 'models/unknown is not found for API version v1beta.',
+                          'status': 'NOT_FOUND'}}
+    return errors.ClientError(code, body)
+
+
+def _response(text, usage, finish_reason=None):
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(
+            content=types.Content(role='model', parts=[types.Part(text=text)]),
+            finish_reason=finish_reason,
+        )],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(**usage) if usage else None,
+    )
+
+
+class FakeGenaiClient:
+    """
+    genai.Client의 models / aio.models 중 ContentEngine이 사용하는 메서드만 흉내 냅니다.
+    latency: 호출당 전체 응답 시간(초), ttft: 첫 청크까지의 시간(초)
+    rate_limit_rate / not_found_rate: 호출당 429 / 404 오류 확률
+    model_ttft: {모델: ttft} 특정 모델만 첫 청크가 늦게 오도록 설정 (헤지 요청 실험용)
+    output_rate: 초당 출력 글자 수. 설정하면 응답 시간이 ttft + 응답 길이 / output_rate가 됩니다 (latency 무시)
+    rpm_limit: 모델별로 rpm_window초 동안 받아 주는 요청 수. 넘으면 서버처럼 429를 반환합니다 (속도 제한 실험용)
+    """
+
+    def __init__(self, fixtures=None, latency=0.0, ttft=0.0, rate_limit_rate=0.0, not_found_rate=0.0,
+                 chunk_chars=400, seed=None, model_ttft=None, output_rate=None, rpm_limit=None, rpm_window=60.0):
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self.latency = latency
+        self.ttft = min(ttft, latency) if latency else ttft
+        self.rate_limit_rate = rate_limit_rate
+        self.not_found_rate = not_found_rate
+        self.chunk_chars = chunk_chars
+        self.model_ttft = model_ttft or {}
+        self.output_rate = output_rate
+        self.rpm_limit = rpm_limit
+        self.rpm_window = rpm_window
+        self._recent = {}
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = {429: 0, 404: 0}
+        self._lock = threading.Lock()
+        self.models = _Models(self)
+        self.aio = _Aio(self)
+
+    def _over_limit(self, model):
+        # 모델별 최근 요청 시각 (슬라이딩 윈도). 거절된 요청은 세지 않음
+        if not self.rpm_limit:
+            return False
+        now = time.monotonic()
+        recent = self._recent.setdefault(model, deque())
+        while recent and now - recent[0] >= self.rpm_window:
+            recent.popleft()
+        if len(recent) >= self.rpm_limit:
+            return True
+        recent.append(now)
+        return False
+
+    def _plan(self, contents, model=None):
+        """
+        호출 하나의 결과를 정합니다. (오류 코드 또는 None, 응답 텍스트, usage)
+        """
+        prompt = contents if isinstance(contents, str) else str(contents)
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+            roll = self.rng.random()
+            if self._over_limit(model):
+                code = 429
+            elif roll < self.rate_limit_rate:
+                code = 429
+            elif roll < self.rate_limit_rate + self.not_found_rate:
+                code = 404
+            else:
+                code = None
+            if code:
+                self.errors[code] += 1
+        for match, texts, usage in self.fixtures:
+            if match in prompt:
+                text = texts[n % len(texts)]
+                break
+        else:
+            raise ValueError("일치하는 녹화 응답이 없습니다")
+        if len(texts) == 1:
+            # 녹화본이 하나뿐이면 게시글마다 내용 해시가 달라지도록 응답 번호를 남깁니다
+            # (업로드 전 축소 단계에서 주석은 지워지므로 속성으로 남김, JSON 응답은 제목 끝에 번호를 붙임)
+            if text.lstrip().startswith('{'):
+                text = text.replace('",', f' #{n}",', 1)
+            else:
+                marked = text.replace('</h1>', f'</h1>\n<div data-replay="{n}"></div>', 1)
+                text = marked if marked != text else f'{text}\n<div data-replay="{n}"></div>'
+        return code, text, usage
+
+    def _ttft(self, model):
+        return self.model_ttft.get(model, self.ttft)
+
+    def _chunks(self, text):
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or ['']
+
+    def _latency(self, text):
+        if self.output_rate:
+            return self.ttft + len(text) / self.output_rate
+        return self.latency
+
+    def _chunk_delay(self, text, count):
+        return max(self._latency(text) - self.ttft, 0.0) / count
+
+
+class _Models:
+    def __init__(self, fake):
+        self._fake = fake
+
+    def generate_content(self, model, contents, config=None):
+        code, text, usage = self._fake._plan(contents, model)
+        if code:
+            time.sleep(self._fake.ttft)
+            raise _api_error(code)
+        time.sleep(self._fake._latency(text))
+        return _response(text, usage, 'STOP')
+
+    def generate_content_stream(self, model, contents, config=None):
+        code, text, usage = self._fake._plan(contents, model)
+        time.sleep(self._fake._ttft(model))
+        if code:
+            raise _api_error(code)
+        return self._stream(text, usage)
+
+    def _stream(self, text, usage):
+        chunks = self._fake._chunks(text)
+        delay = self._fake._chunk_delay(text, len(chunks))
+        for i, piece in enumerate(chunks):
+            last = i == len(chunks) - 1
+            yield _response(piece, usage if last else None, 'STOP' if last else None)
+            if not last and delay:
+                time.sleep(delay)
+
+
+class _AsyncModels:
+    def __init__(self, fake):
+        self._fake = fake
+
+    async def generate_content(self, model, contents, config=None):
+        code, text, usage = self._fake._plan(contents, model)
+        if code:
+            await asyncio.sleep(self._fake.ttft)
+            raise _api_error(code)
+        await asyncio.sleep(self._fake._latency(text))
+        return _response(text, usage, 'STOP')
+
+    async def generate_content_stream(self, model, contents, config=None):
+        code, text, usage = self._fake._plan(contents, model)
+        await asyncio.sleep(self._fake._ttft(model))
+        if code:
+            raise _api_error(code)
+        return self._stream(text, usage)
+
+    async def _stream(self, text, usage):
+        chunks = self._fake._chunks(text)
+        delay = self._fake._chunk_delay(text, len(chunks))
+        for i, piece in enumerate(chunks):
+            last = i == len(chunks) - 1
+            yield _response(piece, usage if last else None, 'STOP' if last else None)
+            if not last and delay:
+                await asyncio.sleep(delay)
+
+
+class _Aio:
+    def __init__(self, fake):
+        self.models = _AsyncModels(fake)
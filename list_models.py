@@ -1,5 +1,4 @@
 import os
-from google import genai
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,6 +7,8 @@ api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
 if not api_key:
     print("Error: No API key found in environment.")
 else:
+    # SDK는 키가 있을 때만 불러옵니다 (import 비용이 큼)
+    from google import genai
     client = genai.Client(api_key=api_key)
     print(f"Checking models (google-genai SDK) for key starting with: {api_key[:5]}...")
     try:
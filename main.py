@@ -1,15 +1,85 @@
 import os
 import sys
-import re
+import time
+import asyncio
+import argparse
+import functools
 from datetime import datetime
-from dotenv import load_dotenv
 from src.content_engine import ContentEngine
 from src.blogger_client import BloggerClient
+from src.batch_runner import load_topics, run_batch, print_summary
+from src.response_cache import ResponseCache
+from src.model_router import ModelRouter, DEFAULT_STATE_PATH
+from src.publish_ledger import PublishLedger
+from src.prompt_compiler import PromptCompiler, DEFAULT_CACHE_STATE_PATH
+from src.topic_pool import TopicPool
+from src.blog_mirror import BlogMirror, DEFAULT_MIRROR_PATH
+from src.hedging import HedgePolicy, DEFAULT_HEDGE_STATS_PATH
+from src.job_queue import JobQueue, DEFAULT_QUEUE_PATH
+from src.job_worker import run_workers, print_status
+from src.post_updater import PostUpdater
+from src.preflight import run_checks
+from src.quota import QuotaManager, quota_day
+from src.tenants import load_tenants, BloggerPool
+from src.fanout import plan_topics, run_fanout, print_fanout_summary
+from src import metrics
 
-# 환경 변수 로드
-load_dotenv()
+# SDK(google-genai, googleapiclient, google-auth)는 ContentEngine/BloggerClient를 만들 때 불러옵니다.
+# 설정 오류로 일찍 종료하는 실행이나 --check, 큐 관리 명령은 SDK를 불러오지 않습니다.
 
-def main():
+def load_env():
+    # .env 파일은 로컬 실행용 (CI에서는 환경 변수로 전달)
+    # 작업 디렉터리가 아니라 이 파일의 위치에서 위로 올라가며 .env를 찾으므로 다른 디렉터리에서 실행해도 읽힘
+    from dotenv import load_dotenv
+    load_dotenv()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gemini 투자분석 리포트 자동 포스팅")
+    parser.add_argument("topic", nargs="?", help="분석할 주제 (생략 시 AI가 추천)")
+    parser.add_argument("--topics-file", help="한 줄에 하나씩 주제가 적힌 파일 (배치 모드)")
+    parser.add_argument("--concurrency", type=int, default=4, help="배치 모드 동시 처리 개수 (기본값: 4)")
+    parser.add_argument("--stream", action="store_true", help="스트리밍 생성 + 점진적 HTML 검증 (규칙 위반 시 즉시 다음 모델)")
+    parser.add_argument("--sectioned", action="store_true", help="팩트 시트를 먼저 만든 뒤 본문 섹션을 병렬 생성해 조립 (실패 시 한 번에 생성)")
+    parser.add_argument("--structured", action="store_true", help="HTML 대신 스키마에 맞춘 JSON 리포트를 생성해 렌더링 (제목/태그를 필드에서 읽음, 실패 시 HTML 생성)")
+    parser.add_argument("--amp", metavar="PATH", help="--structured와 함께: 게시 후 같은 리포트의 AMP 문서를 PATH에 저장 (단일 모드)")
+    parser.add_argument("--context-cache", action="store_true", help="정적 프롬프트 섹션을 Gemini 컨텍스트 캐시로 전송 (배치 모드에서 유리)")
+    parser.add_argument("--check", action="store_true", help="클라이언트를 만들지 않고 설정/인증 정보만 확인하고 종료 (--offline과 함께 쓰면 형식만 확인)")
+    parser.add_argument("--offline", action="store_true", help="--check와 함께: 토큰 발급/API 키 확인 요청을 보내지 않음")
+    parser.add_argument("--prompt-report", action="store_true", help="모델별 프롬프트 섹션 토큰 수를 출력하고 종료")
+    parser.add_argument("--metrics", help="단계별 지연 시간/토큰 사용량을 JSON Lines로 기록할 파일 경로")
+    parser.add_argument("--openmetrics", help="실행 종료 시 OpenMetrics 텍스트 요약을 쓸 파일 경로 (--metrics와 함께 사용)")
+    parser.add_argument("--no-cache", action="store_true", help="Gemini 응답 캐시를 사용하지 않음")
+    parser.add_argument("--no-minify", action="store_true", help="업로드 전 HTML 축소(공백/인라인 style/속성 정리)를 하지 않음")
+    parser.add_argument("--hedge", action="store_true", help="첫 모델의 첫 토큰이 늦으면 다음 모델로 병렬 요청 (헤지 요청, 스트리밍 경로 사용)")
+    parser.add_argument("--hedge-budget", type=int, default=10, help="실행당 최대 헤지 요청 수, 워커 프로세스마다 적용 (기본값: 10)")
+    parser.add_argument("--hedge-stats", action="store_true", help="날짜별 헤지 요청 통계를 출력하고 종료")
+    parser.add_argument("--no-quota", action="store_true", help="호출 전 속도 제한/하루 한도 예약을 사용하지 않음")
+    parser.add_argument("--quota-report", action="store_true", help="오늘(태평양 시간 기준) 모델/Blogger API 사용량과 한도를 출력하고 종료")
+    parser.add_argument("--sync-mirror", action="store_true", help="블로그 게시글 로컬 사본(.cache/blog_mirror.sqlite)을 증분 동기화하고 종료")
+    parser.add_argument("--prune", action="store_true", help="--sync-mirror와 함께: 블로그에서 삭제된 글도 사본에서 제거")
+    parser.add_argument("--search", help="로컬 사본에서 제목/라벨/본문을 전문 검색하고 종료")
+    parser.add_argument("--enqueue", action="store_true", help="주제(또는 --topics-file, 생략 시 추천 작업)를 작업 큐에 추가하고 종료")
+    parser.add_argument("--work", action="store_true", help="작업 큐가 빌 때까지 워커로 처리")
+    parser.add_argument("--workers", type=int, default=4, help="워커 수 (기본값: 4)")
+    parser.add_argument("--worker-processes", action="store_true", help="워커를 스레드 대신 별도 프로세스로 실행")
+    parser.add_argument("--queue-status", action="store_true", help="작업 큐 현황을 출력하고 종료")
+    parser.add_argument("--retry-failed", action="store_true", help="실패한 작업을 실패한 단계부터 다시 대기열에 넣음")
+    parser.add_argument("--update", metavar="POST_ID_OR_TICKER", help="기존 글의 낡은 섹션(밸류에이션/재무)만 다시 생성해 수정 (posts.patch)")
+    parser.add_argument("--dry-run", action="store_true", help="--update와 함께: 수정 요청을 보내지 않고 바뀐 섹션만 출력")
+    parser.add_argument("--blogs", metavar="BLOGS_TOML", help="여러 블로그 설정 파일. 주제별로 한 번 생성해 모든 블로그(언어별 현지화)에 동시 게시")
+    args = parser.parse_args(argv)
+    if args.blogs:
+        # 여러 블로그 모드는 게시만 하므로, 확인/조회/갱신용 옵션과 함께 쓰면 게시가 실행되지 않도록 거부
+        conflicts = [flag for flag, value in (
+            ('--check', args.check), ('--sync-mirror', args.sync_mirror), ('--search', args.search),
+            ('--update', args.update), ('--dry-run', args.dry_run), ('--work', args.work),
+            ('--enqueue', args.enqueue), ('--queue-status', args.queue_status), ('--retry-failed', args.retry_failed),
+        ) if value]
+        if conflicts:
+            parser.error(f"--blogs는 {', '.join(conflicts)}와 함께 쓸 수 없습니다")
+    return args
+
+def load_config():
     # 1. 구성 확인
     # Standardize environment variable names
     gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -30,22 +100,336 @@ def main():
         print(f"누락된 키: {', '.join(missing)}")
         sys.exit(1)
 
+    return {
+        'gemini_key': gemini_key,
+        'client_id': client_id,
+        'client_secret': client_secret,
+        'refresh_token': refresh_token,
+        'blog_id': blog_id,
+    }
+
+def build_cache(args):
+    # 같은 날 같은 프롬프트의 재실행(업로드 실패 후 재시도 등)은 모델을 다시 호출하지 않음
+    if args.no_cache:
+        return None
+    return ResponseCache()
+
+def build_content_engine(config, args):
+    engine = ContentEngine(config['gemini_key'], cache=build_cache(args))
+    # 모델 상태(쿨다운, 지연 시간)를 실행 간에 공유
+    engine.router = ModelRouter(engine.models, state_path=DEFAULT_STATE_PATH)
+    if args.context_cache:
+        engine.prompts = PromptCompiler(state_path=DEFAULT_CACHE_STATE_PATH)
+        engine.use_context_cache = True
+    # 여러 블로그 모드(--blogs)는 블로그 하나의 게시 기록에 묶이지 않도록 backlog를 쓰지 않음
+    # 색인은 주제를 추천할 때 처음 한 번만 채움 (주제를 지정하면 읽지 않음)
+    if config.get('blog_id'):
+        engine.topics = TopicPool()
+        engine.topic_indexer = functools.partial(index_topic_pool, config=config)
+    engine.sectioned = args.sectioned
+    engine.structured = args.structured
+    engine.quota = build_quota(args)
+    if args.no_minify:
+        engine.minifier = None
+    if args.hedge:
+        engine.hedging = HedgePolicy(max_hedges=args.hedge_budget, state_path=DEFAULT_HEDGE_STATS_PATH)
+    return engine
+
+def save_amp(path, report, url):
+    # 구조화 리포트로 생성한 경우에만 가능 (HTML 응답은 다시 파싱하지 않음)
+    from src.report_render import render_amp
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_amp(report, url or ''))
+    print(f"AMP 문서 저장: {path}")
+
+def index_topic_pool(pool, config):
+    # 이미 다룬 기업 색인 (게시 원장은 매번, 블로그 전체 목록은 색인이 비어 있을 때만)
+    ledger = PublishLedger()
+    try:
+        pool.index_ledger(ledger, config['blog_id'])
+    finally:
+        ledger.close()
+    if os.path.exists(DEFAULT_MIRROR_PATH):
+        mirror = BlogMirror(config['blog_id'])
+        try:
+            pool.index_titles(mirror.titles(), 'mirror')
+        finally:
+            mirror.close()
+    if pool.covered_count() == 0:
+        try:
+            added = pool.index_blogger(build_blogger(config))
+            print(f"--- 블로그 게시글 제목에서 기업 {added}개를 색인했습니다 ---")
+        except Exception as e:
+            print(f"--- 블로그 게시글 목록을 가져오지 못했습니다 ({e}). 게시 원장 기록만 사용합니다 ---")
+
+def run_mirror_command(config, args):
+    mirror = BlogMirror(config['blog_id'])
+    try:
+        if args.sync_mirror:
+            blogger = build_blogger(config, args)
+            started = time.perf_counter()
+            changed = mirror.sync(blogger)
+            print(f"동기화 완료: 변경 {changed}건, 전체 {mirror.count()}건 ({time.perf_counter() - started:.1f}초)")
+            if args.prune:
+                print(f"삭제된 글 {mirror.prune(blogger)}건을 제거했습니다.")
+        if args.search:
+            started = time.perf_counter()
+            try:
+                results = mirror.search(args.search)
+            except ValueError as e:
+                print(f"검색 실패: {e}")
+                sys.exit(1)
+            print(f"검색 결과 {len(results)}건 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+            for post in results:
+                print(f"  {post['updated']}  {post['title']}  {post['url']}")
+    finally:
+        mirror.close()
+
+def run_check(config, args):
+    results = run_checks(config, online=not args.offline)
+    for result in results:
+        mark = 'OK  ' if result['ok'] else 'FAIL'
+        print(f"[{mark}] {result['name']}" + (f" - {result['detail']}" if result['detail'] else ''))
+    if not all(result['ok'] for result in results):
+        sys.exit(1)
+    print("설정 확인 완료.")
+
+def print_hedge_stats():
+    stats = HedgePolicy(state_path=DEFAULT_HEDGE_STATS_PATH).stats()
+    if not stats:
+        print("헤지 요청 기록이 없습니다.")
+        return
+    for date, day in sorted(stats.items()):
+        print(f"{date}: 경주 {day.get('races', 0)}회, 헤지 {day.get('hedges', 0)}회 "
+              f"(헤지 승 {day.get('hedge_won', 0)} / 1순위 승 {day.get('primary_won', 0)} / "
+              f"한도 소진 {day.get('budget_exhausted', 0)} / 전부 실패 {day.get('all_failed', 0)})")
+
+def print_prompt_report():
+    gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if not gemini_key:
+        print("누락된 키: GEMINI_API_KEY/GOOGLE_API_KEY")
+        sys.exit(1)
+    engine = ContentEngine(gemini_key)
+    for model in engine.models:
+        variant = engine.prompts.variant_for(model)
+        try:
+            report = engine.prompts.token_report(engine.client, model)
+        except Exception as e:
+            print(f"{model}: 토큰 계산 실패 ({e})")
+            continue
+        sections = ', '.join(f"{name}={count}" for name, count in report.items() if name != 'total')
+        print(f"{model} [{variant}] 총 {report['total']} 토큰: {sections}")
+
+def build_quota(args=None):
+    # 한도 상태는 .cache/quota.sqlite에 있으므로 엔진, Blogger 클라이언트, 워커 프로세스가 같은 한도를 나눠 씀
+    if args is not None and args.no_quota:
+        return None
+    return QuotaManager()
+
+def build_blogger(config, args=None):
+    # 게시 원장으로 재실행 시 같은 글의 중복 게시를 방지
+    blogger = BloggerClient(
+        config['client_id'], config['client_secret'], config['refresh_token'], config['blog_id'],
+        ledger=PublishLedger()
+    )
+    blogger.quota = build_quota(args)
+    return blogger
+
+def print_quota_report():
+    quota = QuotaManager()
+    try:
+        usage = quota.usage()
+    finally:
+        quota.close()
+    print(f"할당량 사용량 ({quota_day()}, 태평양 시간 기준)")
+    if not usage:
+        print("  기록이 없습니다.")
+        return
+    for key, day in usage.items():
+        limit = f"/{day['rpd']}" if day.get('rpd') else ''
+        print(f"  {key}: 요청 {day['requests']}{limit}, 입력 토큰 {day['tokens']}, "
+              f"429 {day['rate_limited']}회, 예약 대기 {day['waited']}초")
+
+def build_pipeline(config, args):
+    return build_content_engine(config, args), build_blogger(config, args)
+
+def run_queue_command(args):
+    # 큐 관리 명령은 인증 정보 없이 동작
+    queue = JobQueue(DEFAULT_QUEUE_PATH)
+    try:
+        if args.retry_failed:
+            print(f"실패한 작업 {queue.retry_failed()}건을 다시 대기열에 넣었습니다.")
+        if args.enqueue:
+            topics = load_topics(args.topics_file) if args.topics_file else [args.topic]
+            for topic in topics:
+                job_id = queue.enqueue(topic)
+                print(f"작업 #{job_id} 추가: {topic or '(주제 추천)'}")
+        print_status(queue)
+    finally:
+        queue.close()
+
+def run_worker_mode(config, args):
+    print(f"워커 모드: 워커 {args.workers}개 ({'프로세스' if args.worker_processes else '스레드'})")
+    _, failed = run_workers(
+        DEFAULT_QUEUE_PATH, functools.partial(build_pipeline, config, args),
+        workers=args.workers, processes=args.worker_processes, stream=args.stream
+    )
+    queue = JobQueue(DEFAULT_QUEUE_PATH)
+    try:
+        print_status(queue)
+    finally:
+        queue.close()
+    # 이전 실행에서 실패로 남은 작업이 아니라 이번 실행에서 실패한 작업만 종료 코드에 반영
+    if failed:
+        sys.exit(1)
+
+def run_update_mode(config, args):
+    content_engine = build_content_engine(config, args)
+    blogger = build_blogger(config, args)
+    # 로컬 사본이 있으면 먼저 증분 동기화해 최신 본문을 기준으로 비교
+    mirror = BlogMirror(config['blog_id']) if os.path.exists(DEFAULT_MIRROR_PATH) else None
+    try:
+        if mirror is not None:
+            mirror.sync(blogger)
+        result, post = PostUpdater(content_engine, blogger, mirror).update(args.update, dry_run=args.dry_run)
+    finally:
+        if mirror is not None:
+            mirror.close()
+    if result is None:
+        print("업데이트 단계에서 워크플로우 실패.")
+        sys.exit(1)
+
+    stats = result.stats
+    print(f"갱신 섹션: {', '.join(result.changed) or '없음'} "
+          f"(전체 {stats['sections']}개 중 {stats['regenerated']}개 재생성, 생성 {stats['generated_chars']}자)")
+    print(f"본문 길이: {stats['before_chars']} → {stats['after_chars']} 자, 수정 필드: {', '.join(result.patch) or '없음'}")
+    if args.dry_run:
+        return
+    if post is None:
+        print("업데이트 단계에서 워크플로우 실패.")
+        sys.exit(1)
+    print("워크플로우 완료.")
+
+def run_fanout_mode(args):
+    gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if not gemini_key:
+        print("누락된 키: GEMINI_API_KEY/GOOGLE_API_KEY")
+        sys.exit(1)
+    try:
+        tenants, base_language = load_tenants(args.blogs)
+    except (OSError, ValueError) as e:
+        print(f"블로그 설정 오류: {e}")
+        sys.exit(1)
+
+    # 블로그별 클라이언트는 실행 동안 재사용하고, 토큰 발급/서비스 생성은 생성 전에 미리 끝냄
+    pool = BloggerPool(tenants, ledger=PublishLedger(), quota=build_quota(args))
+    errors = pool.warm()
+    tenants = [t for t in tenants if not errors[t.name]]
+    if not tenants:
+        print("인증을 준비한 블로그가 없습니다.")
+        sys.exit(1)
+
+    content_engine = build_content_engine({'gemini_key': gemini_key}, args)
+    shared = load_topics(args.topics_file) if args.topics_file else [args.topic] if args.topic else []
+    plan = plan_topics(tenants, shared)
+    if not plan:
+        print("현재 트렌딩 주제를 검색(추천) 중입니다...")
+        plan = plan_topics(tenants, [content_engine.recommend_topic()])
+
+    print(f"여러 블로그 모드: 블로그 {len(tenants)}개, 주제 {len(plan)}개, 게시 {sum(len(v) for v in plan.values())}건")
+    started = time.perf_counter()
+    results = asyncio.run(run_fanout(content_engine, pool, plan, concurrency=args.concurrency,
+                                     base_language=base_language, stream=args.stream))
+    print_fanout_summary(results, time.perf_counter() - started)
+
+    failed = [name for name, error in errors.items() if error]
+    if failed:
+        print(f"인증 준비 실패로 건너뛴 블로그: {', '.join(failed)}")
+    if failed or not all(r['ok'] for r in results):
+        sys.exit(1)
+
+def run_batch_mode(config, args):
+    topics = load_topics(args.topics_file)
+    if not topics:
+        print(f"주제 파일이 비어 있습니다: {args.topics_file}")
+        sys.exit(1)
+
+    print(f"배치 모드: {len(topics)}개 주제, 동시 처리 {args.concurrency}개")
+    content_engine = build_content_engine(config, args)
+    blogger = build_blogger(config, args)
+
+    started = time.perf_counter()
+    results = asyncio.run(run_batch(content_engine, blogger, topics, concurrency=args.concurrency, stream=args.stream))
+    print_summary(results, time.perf_counter() - started)
+
+    if not all(r['ok'] for r in results):
+        sys.exit(1)
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_env()
+    if args.prompt_report:
+        print_prompt_report()
+        return
+    if args.hedge_stats:
+        print_hedge_stats()
+        return
+    if args.quota_report:
+        print_quota_report()
+        return
+    if args.enqueue or args.queue_status or args.retry_failed:
+        run_queue_command(args)
+        return
+    if args.blogs:
+        # 블로그별 인증 정보는 설정 파일에서 읽음
+        config = None
+    else:
+        config = load_config()
+        if args.check:
+            run_check(config, args)
+            return
+        if args.sync_mirror or args.search:
+            run_mirror_command(config, args)
+            return
+
+    if args.metrics:
+        recorder = metrics.enable(args.metrics, args.openmetrics)
+        print(f"--- [METRICS] run_id={recorder.run_id} → {args.metrics} ---")
+    try:
+        if args.blogs:
+            run_fanout_mode(args)
+        elif args.update:
+            run_update_mode(config, args)
+        elif args.work:
+            run_worker_mode(config, args)
+        elif args.topics_file:
+            run_batch_mode(config, args)
+        else:
+            run_single(config, args)
+    finally:
+        metrics.disable()
+
+def run_single(config, args):
     # 2. 시스템 초기화
-    content_engine = ContentEngine(gemini_key)
+    content_engine = build_content_engine(config, args)
 
     # 3. 주제 선택
-    if len(sys.argv) > 1:
-        topic = sys.argv[1]
+    if args.topic:
+        topic = args.topic
     else:
         print("현재 트렌딩 주제를 검색(추천) 중입니다...")
-        topic = content_engine.recommend_topic()
+        with metrics.span('recommend'):
+            topic = content_engine.recommend_topic()
 
     print(f"선정된 주제: {topic}")
 
     # 4. 콘텐츠 생성
     print("Gemini로 콘텐츠 생성 중...")
-    raw_content = content_engine.generate_content(topic)
-    
+    raw_content = content_engine.generate_content(topic, stream=args.stream)
+
     if not raw_content:
         print("\n" + "="*50)
         print("CRITICAL ERROR: 콘텐츠 생성에 실패했습니다.")
@@ -53,36 +437,26 @@ def main():
         print("도움말: 새 'google-genai' SDK와 최신 모델을 사용 중입니다. 쿼터 또는 안전 설정을 확인해주세요.")
         print("해결책: 수동 실행 시 주제를 직접 전달하여 추천 API 호출을 줄이거나, 다음 날 다시 시도하세요.")
         print("="*50 + "\n")
+        content_engine.release_topic(topic)
         sys.exit(1)
 
-    cleaned_content = content_engine.clean_html(raw_content)
-    tags = content_engine.extract_tags(cleaned_content)
-    
-    # 5. 제목 추출 루틴
-    # [우선순위 1] <h1> 태그 검색
-    title_match = re.search(r'<h1[^>]*>(.*?)</h1>', cleaned_content, re.IGNORECASE | re.DOTALL)
-    if title_match:
-        post_title = re.sub('<[^<]+?>', '', title_match.group(1)).strip()
-    else:
-        # [우선순위 2] 마크다운 스타일의 # 제목 (있다면) 또는 첫 번째 굵은 텍스트
-        alt_title_match = re.search(r'(?:^|\n)#\s*(.*?)(?:\n|$)', cleaned_content) or \
-                          re.search(r'<strong>(.*?)</strong>', cleaned_content, re.IGNORECASE) or \
-                          re.search(r'<b>(.*?)</b>', cleaned_content, re.IGNORECASE)
-        
-        if alt_title_match:
-            post_title = re.sub('<[^<]+?>', '', alt_title_match.group(1)).strip()
-        else:
-            # [최종] 주제를 제목으로 사용
-            post_title = topic
+    # 5. 정리 + 태그/제목 추출 (한 번의 스캔, 제목 우선순위: <h1> → # 제목 → 굵은 텍스트 → 주제)
+    post_result = content_engine.process(raw_content, topic)
+    cleaned_content = post_result.body
+    tags = post_result.tags
+    post_title = post_result.title
 
     print(f"제목: {post_title}")
     print(f"태그: {tags}")
     print(f"본문 길이: {len(cleaned_content)} 자")
+    if 'bytes_after' in post_result.stats:
+        stats = post_result.stats
+        print(f"본문 크기: {stats['bytes_before']} → {stats['bytes_after']} 바이트 (-{stats['saved_pct']}%)")
     print(f"본문 미리보기: {cleaned_content[:100]}...")
 
     # 6. Blogger에 업로드 (초안으로)
     print("Blogger에 업로드 중...")
-    blogger = BloggerClient(client_id, client_secret, refresh_token, blog_id)
+    blogger = build_blogger(config, args)
     result = blogger.create_post(
         title=post_title,
         content=cleaned_content,
@@ -91,9 +465,13 @@ def main():
     )
 
     if result:
+        content_engine.record_published(topic, post_title)
+        if args.amp and post_result.report is not None:
+            save_amp(args.amp, post_result.report, result.get('url'))
         print("워크플로우 완료.")
     else:
         print("업로드 단계에서 워크플로우 실패.")
+        content_engine.release_topic(topic)
         sys.exit(1)
 
 if __name__ == "__main__":
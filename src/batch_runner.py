@@ -0,0 +1,142 @@
+import asyncio
+import time
+from src import metrics
+
+
+def load_topics(path):
+    """
+    한 줄에 하나씩 주제가 적힌 파일을 읽습니다. 빈 줄과 '#'으로 시작하는 줄은 무시합니다.
+    """
+    topics = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            topic = line.strip()
+            if topic and not topic.startswith('#'):
+                topics.append(topic)
+    return topics
+
+
+async def prepare_topic(content_engine, topic, stream=False):
+    """
+    단일 주제에 대해 생성 → 정리 → 태그/제목 추출을 수행하고 (PostResult 또는 None, 오류)를 반환합니다.
+    """
+    try:
+        raw_content = await content_engine.generate_content_async(topic, stream=stream)
+        if not raw_content:
+            return None, "콘텐츠 생성 실패"
+
+        post_result = content_engine.process(raw_content, topic)
+        stats = post_result.stats
+        size = f" ({stats['bytes_before']} → {stats['bytes_after']} 바이트)" if 'bytes_after' in stats else ''
+        print(f"--- [{topic}] 제목: {post_result.title} / 태그 {len(post_result.tags)}개 / 본문 {len(post_result.body)} 자{size} ---")
+        return post_result, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def post_item(post_result, labels=()):
+    """
+    create_posts에 넘길 게시글 dict를 만듭니다. labels는 태그 뒤에 덧붙입니다. (중복 제거)
+    """
+    return {'title': post_result.title, 'content': post_result.body,
+            'labels': list(dict.fromkeys(list(post_result.tags) + list(labels)))}
+
+
+async def upload_posts(blogger, posts, is_draft=False):
+    """
+    게시글 dict 목록을 create_posts(HTTP 배치 요청)로 한 번에 업로드하고 항목별 결과를 반환합니다.
+    Blogger 클라이언트는 동기 API이므로 스레드에서 실행합니다. 요청 자체가 실패하면 모든 항목을 실패로 돌려줍니다.
+    """
+    if not posts:
+        return []
+    try:
+        return await asyncio.to_thread(blogger.create_posts, posts, is_draft=is_draft)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return [{'ok': False, 'post': None, 'error': error, 'skipped': False} for _ in posts]
+
+
+async def run_uploader(blogger, queue, is_draft=False, batch_size=20):
+    """
+    queue에 들어오는 (게시글 dict, future)를 모아 배치 요청으로 업로드하고 항목별 결과로 future를 완료합니다.
+    None을 받으면 끝냅니다. 업로드하는 동안 준비된 글은 다음 배치로 묶이므로,
+    생성과 업로드가 겹치면서 요청 수는 글 수보다 적어집니다.
+    """
+    finished = False
+    while not finished:
+        item = await queue.get()
+        if item is None:
+            return
+        items = [item]
+        while len(items) < batch_size and not queue.empty():
+            item = queue.get_nowait()
+            if item is None:
+                finished = True
+                break
+            items.append(item)
+        with metrics.span('batch_upload', posts=len(items)):
+            uploads = await upload_posts(blogger, [post for post, _ in items], is_draft=is_draft)
+        for (_, future), upload in zip(items, uploads):
+            if not future.done():
+                future.set_result(upload)
+
+
+async def submit(queue, post, result, started):
+    """
+    게시글 하나를 업로더 큐에 넣고 업로드가 끝날 때까지 기다린 뒤 result의 ok/url/error/elapsed를 채웁니다.
+    """
+    uploaded = asyncio.get_running_loop().create_future()
+    await queue.put((post, uploaded))
+    upload = await uploaded
+    result['elapsed'] = time.perf_counter() - started
+    if upload['ok']:
+        result['ok'] = True
+        result['url'] = upload['post'].get('url')
+    else:
+        result['error'] = f"업로드 실패: {upload['error']}"
+    return result['ok']
+
+
+async def run_batch(content_engine, blogger, topics, concurrency=4, is_draft=False, stream=False):
+    """
+    여러 주제를 최대 concurrency개까지 동시에 생성하고, 준비된 글은 배치 요청으로 묶어 업로드합니다.
+    전체 소요 시간은 합계가 아니라 가장 느린 게시글에 의해 결정됩니다.
+    게시 원장으로 이미 게시된 글은 건너뛰므로, 일부가 실패한 배치를 다시 실행하면 실패한 글만 올라갑니다.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    queue = asyncio.Queue()
+    uploader = asyncio.create_task(run_uploader(blogger, queue, is_draft=is_draft))
+
+    async def worker(topic):
+        started = time.perf_counter()
+        result = {'topic': topic, 'ok': False, 'url': None, 'error': None, 'elapsed': 0.0}
+        async with semaphore:
+            post_result, result['error'] = await prepare_topic(content_engine, topic, stream=stream)
+        if post_result is None:
+            result['elapsed'] = time.perf_counter() - started
+        elif await submit(queue, post_item(post_result), result, started):
+            content_engine.record_published(topic, post_result.title)
+        if not result['ok']:
+            content_engine.release_topic(topic)
+        return result
+
+    try:
+        return await asyncio.gather(*(worker(topic) for topic in topics))
+    finally:
+        await queue.put(None)
+        await uploader
+
+
+def print_summary(results, elapsed):
+    """
+    주제별 성공/실패 요약을 출력합니다.
+    """
+    succeeded = [r for r in results if r['ok']]
+    print("\n" + "=" * 50)
+    print(f"배치 결과: 성공 {len(succeeded)} / 전체 {len(results)} (총 {elapsed:.1f}초)")
+    for r in results:
+        if r['ok']:
+            print(f"  [OK]   {r['topic']} ({r['elapsed']:.1f}초) {r['url']}")
+        else:
+            print(f"  [FAIL] {r['topic']} ({r['elapsed']:.1f}초) {r['error']}")
+    print("=" * 50 + "\n")
@@ -0,0 +1,248 @@
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from src.topic_pool import ticker_from_title
+
+DEFAULT_MIRROR_PATH = os.path.join('.cache', 'blog_mirror.sqlite')
+
+# posts.list 필드 마스크: 증분 동기화는 본문까지, 삭제 확인은 id만 받습니다
+SYNC_FIELDS = 'nextPageToken,items(id,title,labels,url,status,published,updated,content)'
+ID_FIELDS = 'nextPageToken,items(id)'
+
+
+def _parse_time(value):
+    """
+    Blogger의 RFC 3339 시각('2024-05-01T09:00:00-07:00', '...Z')을 UTC datetime으로 바꿉니다.
+    블로그 시간대(서머타임 포함)가 섞여도 비교할 수 있도록 문자열 대신 시각으로 비교합니다.
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(timezone.utc)
+
+
+class BlogMirror:
+    """
+    블로그 게시글의 로컬 사본(SQLite + FTS5 색인).
+    posts.list를 orderBy=UPDATED(최신 수정순)로 읽다가 마지막 동기화 시점보다 오래된 글이 나오면 멈추므로,
+    최초 동기화 이후의 비용은 블로그 크기가 아니라 변경된 글 수에 비례합니다.
+    posts.list는 삭제된 글을 알려 주지 않으므로 삭제 반영은 prune()(id만 조회)으로 따로 합니다.
+    """
+
+    def __init__(self, blog_id, path=DEFAULT_MIRROR_PATH):
+        self.blog_id = blog_id
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                id TEXT NOT NULL,
+                blog_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                content TEXT NOT NULL,
+                url TEXT,
+                status TEXT,
+                published TEXT,
+                updated TEXT,
+                updated_ts REAL,
+                PRIMARY KEY (blog_id, id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_posts_updated ON posts(blog_id, updated_ts);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                blog_id TEXT PRIMARY KEY,
+                cursor_ts REAL,
+                synced_at REAL NOT NULL
+            );
+            """
+        )
+        self.fts = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self):
+        """
+        제목/라벨/본문 FTS5 색인(외부 콘텐츠 테이블 + 트리거). FTS5가 없는 SQLite에서는 LIKE 검색으로 대신합니다.
+        """
+        try:
+            self._conn.executescript(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                    title, labels, content, content='posts', content_rowid='rowid'
+                );
+                CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+                    INSERT INTO posts_fts(rowid, title, labels, content)
+                    VALUES (new.rowid, new.title, new.labels, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+                    INSERT INTO posts_fts(posts_fts, rowid, title, labels, content)
+                    VALUES ('delete', old.rowid, old.title, old.labels, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+                    INSERT INTO posts_fts(posts_fts, rowid, title, labels, content)
+                    VALUES ('delete', old.rowid, old.title, old.labels, old.content);
+                    INSERT INTO posts_fts(rowid, title, labels, content)
+                    VALUES (new.rowid, new.title, new.labels, new.content);
+                END;
+                """
+            )
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"--- [MIRROR] FTS5를 사용할 수 없습니다 ({e}). LIKE 검색을 사용합니다 ---")
+            return False
+
+    def _cursor(self):
+        row = self._conn.execute("SELECT cursor_ts FROM sync_state WHERE blog_id = ?", (self.blog_id,)).fetchone()
+        return row[0] if row else None
+
+    def _upsert(self, item):
+        updated = _parse_time(item.get('updated'))
+        self._conn.execute(
+            "INSERT INTO posts (id, blog_id, title, labels, content, url, status, published, updated, updated_ts) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(blog_id, id) DO UPDATE SET title = excluded.title, labels = excluded.labels, "
+            "content = excluded.content, url = excluded.url, status = excluded.status, "
+            "published = excluded.published, updated = excluded.updated, updated_ts = excluded.updated_ts",
+            (item['id'], self.blog_id, item.get('title') or '', ', '.join(item.get('labels') or []),
+             item.get('content') or '', item.get('url'), item.get('status'), item.get('published'),
+             item.get('updated'), updated.timestamp() if updated else None)
+        )
+        return updated
+
+    def sync(self, blogger, page_size=None):
+        """
+        마지막 동기화 이후 수정된 글만 받아 반영하고, 반영한 글 수를 반환합니다.
+        처음에는 블로그 전체를 받습니다.
+        """
+        with self._lock:
+            cursor_ts = self._cursor()
+        # 증분 동기화는 변경된 글이 보통 몇 개뿐이므로 작은 페이지로 시작
+        page_size = page_size or (10 if cursor_ts else 100)
+        started = time.time()
+        newest = cursor_ts
+        changed = 0
+        for item in blogger.iter_posts(fields=SYNC_FIELDS, order_by='UPDATED', fetch_bodies=True,
+                                       page_size=page_size):
+            updated = _parse_time(item.get('updated'))
+            ts = updated.timestamp() if updated else None
+            # 같은 초에 수정된 글을 놓치지 않도록 커서와 같은 시각까지는 다시 반영
+            if cursor_ts is not None and ts is not None and ts < cursor_ts:
+                break
+            with self._lock:
+                self._upsert(item)
+            changed += 1
+            if ts is not None and (newest is None or ts > newest):
+                newest = ts
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sync_state (blog_id, cursor_ts, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(blog_id) DO UPDATE SET cursor_ts = excluded.cursor_ts, synced_at = excluded.synced_at",
+                (self.blog_id, newest, started)
+            )
+            self._conn.commit()
+        return changed
+
+    def prune(self, blogger):
+        """
+        블로그에서 삭제된 글을 사본에서도 지우고, 지운 글 수를 반환합니다. (id만 조회하므로 전송량이 작음)
+        """
+        live = {item['id'] for item in blogger.iter_posts(fields=ID_FIELDS, page_size=500)}
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM posts WHERE blog_id = ?", (self.blog_id,))]
+            removed = [(self.blog_id, post_id) for post_id in ids if post_id not in live]
+            self._conn.executemany("DELETE FROM posts WHERE blog_id = ? AND id = ?", removed)
+            self._conn.commit()
+        return len(removed)
+
+    def record(self, post):
+        """
+        방금 게시/수정한 글(API 응답)을 바로 반영합니다. 다음 sync에서 다시 받아도 결과는 같습니다.
+        """
+        with self._lock:
+            self._upsert(post)
+            self._conn.commit()
+
+    def search(self, query, limit=20):
+        """
+        제목/라벨/본문 전문 검색. 공백으로 나눈 단어를 모두 포함하는 글을 찾습니다.
+        단어는 FTS5 문자열로 감싸므로 괄호, 하이픈, 따옴표가 들어 있어도 질의 문법으로 해석되지 않습니다. (예: 'Ford (F)')
+        검색할 수 없는 질의면 ValueError를 발생시킵니다.
+        """
+        with self._lock:
+            if self.fts:
+                match = ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+                if not match:
+                    return []
+                try:
+                    rows = self._conn.execute(
+                        "SELECT p.id, p.title, p.url, p.updated FROM posts_fts f JOIN posts p ON p.rowid = f.rowid "
+                        "WHERE posts_fts MATCH ? AND p.blog_id = ? ORDER BY bm25(posts_fts, 10.0, 5.0, 1.0) LIMIT ?",
+                        (match, self.blog_id, limit)
+                    ).fetchall()
+                except sqlite3.OperationalError as e:
+                    raise ValueError(f"검색어를 처리할 수 없습니다: {query!r} ({e})")
+            else:
+                like = f"%{query}%"
+                rows = self._conn.execute(
+                    "SELECT id, title, url, updated FROM posts WHERE blog_id = ? "
+                    "AND (title LIKE ? OR labels LIKE ? OR content LIKE ?) ORDER BY updated_ts DESC LIMIT ?",
+                    (self.blog_id, like, like, like, limit)
+                ).fetchall()
+        return [dict(zip(('id', 'title', 'url', 'updated'), row)) for row in rows]
+
+    def get(self, post_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, title, labels, content, url, status, published, updated FROM posts "
+                "WHERE blog_id = ? AND id = ?", (self.blog_id, post_id)
+            ).fetchone()
+        if row is None:
+            return None
+        post = dict(zip(('id', 'title', 'labels', 'content', 'url', 'status', 'published', 'updated'), row))
+        post['labels'] = [label.strip() for label in post['labels'].split(',') if label.strip()]
+        return post
+
+    def find_by_ticker(self, ticker):
+        """
+        제목 괄호에 ticker가 있는 가장 최근 글의 id를 반환합니다. 없으면 None.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title FROM posts WHERE blog_id = ? AND title LIKE ? ORDER BY updated_ts DESC",
+                (self.blog_id, f"%({ticker}%")
+            ).fetchall()
+        for post_id, title in rows:
+            if ticker_from_title(title) == ticker:
+                return post_id
+        return None
+
+    def titles(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT title FROM posts WHERE blog_id = ?", (self.blog_id,))]
+
+    def labels(self):
+        """
+        사용 중인 라벨과 글 수를 많이 쓰인 순서로 반환합니다.
+        """
+        counts = {}
+        with self._lock:
+            for (labels,) in self._conn.execute("SELECT labels FROM posts WHERE blog_id = ?", (self.blog_id,)):
+                for label in labels.split(','):
+                    label = label.strip()
+                    if label:
+                        counts[label] = counts.get(label, 0) + 1
+        return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts WHERE blog_id = ?", (self.blog_id,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,14 +1,52 @@
 import os
 import json
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+import time
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from src.publish_ledger import content_key, PUBLISHED, PENDING
+from src import metrics
+from src.quota import BLOGGER, QuotaExceeded
+
+DEFAULT_API_ENDPOINT = 'https://blogger.googleapis.com/'
+# 일시적인 오류로 보고 재시도하는 HTTP 상태 코드
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 서버가 요청을 처리했는지 알 수 없는 상태 코드 (5xx여도 글이 만들어졌을 수 있으므로 재전송 전에 대조)
+UNKNOWN_OUTCOME_STATUS = {500, 502, 503, 504}
+# 게시 여부를 대조할 때 서버 시각과 로컬 시각의 차이를 감안해 더 거슬러 올라가는 시간(초)
+RECONCILE_SLACK = 600
+
+
+def _fingerprint(post):
+    # 게시 여부 대조용: 제목, 라벨 집합, 공백을 정리한 본문이 모두 같아야 같은 글로 봄
+    content = ' '.join((post.get('content') or '').split())
+    return post.get('title') or '', tuple(sorted(post.get('labels') or [])), content
+
+
+def _timestamp(value):
+    # Blogger의 RFC 3339 시각 → epoch 초 (없거나 형식이 다르면 None)
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
 
 class BloggerClient:
-    def __init__(self, client_id, client_secret, refresh_token, blog_id):
+    def __init__(self, client_id, client_secret, refresh_token, blog_id, api_endpoint=None, ledger=None):
         self.blog_id = blog_id
+        # API 루트 URL (로컬 가짜 Blogger 서버로 테스트할 때 변경)
+        self.api_endpoint = api_endpoint or os.getenv("BLOGGER_API_ENDPOINT") or DEFAULT_API_ENDPOINT
+        # 업로드 멱등성 원장 (PublishLedger, 선택 사항)
+        self.ledger = ledger
+        # API 할당량 (QuotaManager, 선택 사항). 있으면 모든 요청이 'blogger' 한도 안에서 간격을 두고 실행됨
+        self.quota = None
         self.scopes = ['https://www.googleapis.com/auth/blogger']
-        
+        # 만료 몇 초 전에 미리 토큰을 갱신할지
+        self.refresh_margin = 300
+        # HTTP 요청 타임아웃(초)
+        self.http_timeout = 60
+        # create_posts에서 429/5xx 항목을 다시 보내기 전 첫 대기 시간(초, 지수 백오프)
+        self.batch_backoff = 2.0
+
         # Validation
         if not all([client_id, client_secret, refresh_token]):
             missing = []
@@ -17,7 +55,8 @@ class BloggerClient:
             if not refresh_token: missing.append("REFRESH_TOKEN")
             print(f"--- [AUTH ERROR] Missing credentials: {', '.join(missing)} ---")
 
-        # 토큰에서 직접 자격 증명 객체 생성
+        # 토큰에서 직접 자격 증명 객체 생성 (google-auth/googleapiclient는 import 비용이 커서 클라이언트를 만들 때 불러옴)
+        from google.oauth2.credentials import Credentials
         self.creds = Credentials(
             None, 
             refresh_token=refresh_token,
@@ -27,30 +66,96 @@ class BloggerClient:
             scopes=self.scopes
         )
 
-    def get_service(self):
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                try:
-                    print("--- [AUTH] Attempting to refresh access token... ---")
+        # 서비스 객체는 한 번만 만들고, HTTP 연결(keep-alive)은 스레드별로 재사용
+        self._service = None
+        self._service_lock = threading.Lock()
+        self._auth_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _token_expiring(self):
+        if not self.creds.token or self.creds.expiry is None:
+            return True
+        # google-auth는 expiry를 naive UTC로 저장
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return self.creds.expiry - now < timedelta(seconds=self.refresh_margin)
+
+    def ensure_token(self):
+        """
+        액세스 토큰이 없거나 곧 만료되면 첫 요청 전에 미리 갱신합니다.
+        """
+        if not self._token_expiring():
+            return
+        with self._auth_lock:
+            if not self._token_expiring() or not self.creds.refresh_token:
+                return
+            try:
+                print("--- [AUTH] Attempting to refresh access token... ---")
+                from google.auth.transport.requests import Request
+                with metrics.span('auth_refresh'):
                     self.creds.refresh(Request())
-                    print("--- [AUTH] Token refreshed successfully. ---")
-                except Exception as e:
-                    print(f"--- [AUTH ERROR] Token refresh failed: {e} ---")
-                    print("\n" + "!" * 50)
-                    print("CRITICAL: Blogger 인증에 실패했습니다 (invalid_grant).")
-                    print("원인: 리프레시 토큰이 만료되었거나 취소되었습니다.")
-                    print("해결 방법:")
-                    print("  1. 로컬에서 'python get_token.py'를 실행하여 새 토큰을 얻으세요.")
-                    print("  2. 새 토큰을 .env 파일이나 GitHub Secrets에 업데이트하세요.")
-                    print("  3. (권장) Google Cloud Console에서 'OAuth 동의 화면' -> '앱 게시'를 수행하여 7일 제한을 해제하세요.")
-                    print("!" * 50 + "\n")
-                    raise
-        
-        return build('blogger', 'v3', credentials=self.creds)
+                print("--- [AUTH] Token refreshed successfully. ---")
+            except Exception as e:
+                print(f"--- [AUTH ERROR] Token refresh failed: {e} ---")
+                print("\n" + "!" * 50)
+                print("CRITICAL: Blogger 인증에 실패했습니다 (invalid_grant).")
+                print("원인: 리프레시 토큰이 만료되었거나 취소되었습니다.")
+                print("해결 방법:")
+                print("  1. 로컬에서 'python get_token.py'를 실행하여 새 토큰을 얻으세요.")
+                print("  2. 새 토큰을 .env 파일이나 GitHub Secrets에 업데이트하세요.")
+                print("  3. (권장) Google Cloud Console에서 'OAuth 동의 화면' -> '앱 게시'를 수행하여 7일 제한을 해제하세요.")
+                print("!" * 50 + "\n")
+                raise
 
-    def create_post(self, title, content, labels=None, is_draft=True):
-        service = self.get_service()
-        
+    def _http(self):
+        """
+        스레드별 인증 HTTP 세션. httplib2.Http는 스레드 안전하지 않으므로 스레드마다 하나씩 두고 재사용합니다.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            import httplib2
+            import google_auth_httplib2
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.creds, http=httplib2.Http(timeout=self.http_timeout)
+            )
+            self._local.http = http
+        return http
+
+    def get_service(self):
+        self.ensure_token()
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    # 라이브러리에 포함된 discovery 문서를 사용하여 네트워크 요청 생략
+                    from googleapiclient.discovery import build
+                    with metrics.span('discovery_build'):
+                        self._service = build(
+                            'blogger', 'v3',
+                            http=self._http(),
+                            static_discovery=True,
+                            cache_discovery=False,
+                            client_options={'api_endpoint': self.api_endpoint}
+                        )
+        return self._service
+
+    def _execute(self, request, cost=1):
+        """
+        현재 스레드의 keep-alive 세션으로 요청을 실행합니다.
+        quota가 있으면 요청 cost건을 예약하고 자리가 날 때까지 기다립니다. (하루 한도 초과 시 QuotaExceeded)
+        """
+        if self.quota is not None and cost:
+            self.quota.acquire(BLOGGER, requests=cost)
+        self.ensure_token()
+        try:
+            return request.execute(http=self._http())
+        except Exception as e:
+            self._record_rate_limited(getattr(getattr(e, 'resp', None), 'status', None))
+            raise
+
+    def _record_rate_limited(self, status):
+        if self.quota is not None and status == 429:
+            self.quota.record_rate_limited(BLOGGER)
+
+    def _post_body(self, title, content, labels=None):
         body = {
             'kind': 'blogger#post',
             'blog': {'id': self.blog_id},
@@ -60,6 +165,27 @@ class BloggerClient:
         
         if labels:
             body['labels'] = labels
+        return body
+
+    def create_post(self, title, content, labels=None, is_draft=True):
+        service = self.get_service()
+        body = self._post_body(title, content, labels)
+
+        key = content_key(self.blog_id, title, content, labels, is_draft)
+        if self.ledger:
+            entry = self.ledger.get(key)
+            if entry and entry['status'] == PUBLISHED:
+                print(f"--- 이미 게시된 글입니다 (원장 기록): {entry['url']} ---")
+                return entry['result']
+            if entry and entry['status'] == PENDING:
+                # 이전 실행에서 응답을 받지 못한 글: 실제 게시 여부를 먼저 확인
+                results = [None]
+                if not self._reconcile([body], [key], [0], results, since=entry['updated_at']):
+                    if results[0]['ok']:
+                        return results[0]['post']
+                    # 확인하지 못했으면 중복 게시를 피하기 위해 보내지 않고 pending으로 남김 (다음 실행에서 다시 대조)
+                    return None
+            self.ledger.mark_pending(key, self.blog_id, title)
 
         print(f"--- [DEBUG] Blogger API 요청 데이터 구성 완료 ---")
         print(f"--- [DEBUG] Title: {body.get('title')} ---")
@@ -69,9 +195,246 @@ class BloggerClient:
             posts = service.posts()
             # is_draft가 True이면 초안으로 저장됩니다 (기본 동작은 보통 명시적인 게시 작업이나 상태가 필요함)
             # insert 메서드에는 'isDraft' 매개변수가 있습니다.
-            result = posts.insert(blogId=self.blog_id, body=body, isDraft=is_draft).execute()
+            with metrics.span('insert', blog_id=self.blog_id, content_chars=len(content)):
+                result = self._execute(posts.insert(blogId=self.blog_id, body=body, isDraft=is_draft))
             print(f"게시글 생성 성공: {result.get('url')}")
+            if self.ledger:
+                self.ledger.mark_published(key, result)
             return result
         except Exception as e:
             print(f"게시글 생성 중 오류 발생: {e}")
+            # 응답을 받지 못한 경우(타임아웃 등)와 5xx는 pending으로 남겨 다음 실행에서 대조
+            from googleapiclient.errors import HttpError
+            unknown = isinstance(e, HttpError) and e.resp.status in UNKNOWN_OUTCOME_STATUS
+            if self.ledger and isinstance(e, (HttpError, QuotaExceeded)) and not unknown:
+                self.ledger.mark_failed(key, e)
+            return None
+
+    def get_post(self, post_id, fields='id,title,labels,content,url,status,published,updated'):
+        service = self.get_service()
+        with metrics.span('get_post', blog_id=self.blog_id):
+            return self._execute(service.posts().get(blogId=self.blog_id, postId=post_id, view='ADMIN', fields=fields))
+
+    def patch_post(self, post_id, title=None, content=None, labels=None):
+        """
+        posts.patch로 넘겨받은 필드만 수정합니다. (None인 필드는 보내지 않음)
+        응답에서는 본문을 빼고 받으므로 수정 결과의 content는 호출자가 가진 값을 사용해야 합니다.
+        같은 내용으로 다시 보내도 결과가 같으므로 게시 원장을 거치지 않습니다.
+        """
+        body = {}
+        if title is not None:
+            body['title'] = title
+        if content is not None:
+            body['content'] = content
+        if labels is not None:
+            body['labels'] = labels
+        if not body:
+            return None
+
+        service = self.get_service()
+        try:
+            with metrics.span('patch', blog_id=self.blog_id, fields=','.join(sorted(body)),
+                              content_chars=len(content or '')):
+                result = self._execute(service.posts().patch(
+                    blogId=self.blog_id, postId=post_id, body=body, fetchBody=False,
+                    fields='id,title,labels,url,status,published,updated'
+                ))
+            print(f"게시글 수정 성공: {result.get('url')}")
+            return result
+        except Exception as e:
+            print(f"게시글 수정 중 오류 발생: {e}")
             return None
+
+    def create_posts(self, posts, is_draft=True, batch_size=20, max_retries=3, backoff=None):
+        """
+        여러 게시글을 Blogger HTTP 배치 요청으로 묶어 업로드합니다.
+        posts: [{'title':..., 'content':..., 'labels':[...]}, ...]
+        반환: 입력 순서대로 {'ok', 'post', 'error', 'skipped'} dict 목록
+
+        ledger가 있으면 내용 해시로 이미 게시된 글은 건너뛰고, 결과를 모르는(pending, 5xx) 글은
+        재전송 전에 블로그의 최근 글 목록과 대조하여 중복 게시를 막습니다.
+        """
+        service = self.get_service()
+        backoff = self.batch_backoff if backoff is None else backoff
+        results = [None] * len(posts)
+        keys = [
+            content_key(self.blog_id, p['title'], p['content'], p.get('labels'), is_draft)
+            for p in posts
+        ]
+
+        todo = []
+        unknown = []
+        since = None
+        for i, key in enumerate(keys):
+            entry = self.ledger.get(key) if self.ledger else None
+            if entry and entry['status'] == PUBLISHED:
+                print(f"--- [BATCH] 이미 게시됨, 건너뜀: {posts[i]['title']} ---")
+                results[i] = {'ok': True, 'post': entry['result'], 'error': None, 'skipped': True}
+            elif entry and entry['status'] == PENDING:
+                unknown.append(i)
+                since = entry['updated_at'] if since is None else min(since, entry['updated_at'])
+            else:
+                todo.append(i)
+        # 이전 실행에서 결과를 받지 못한 글
+        todo += self._reconcile(posts, keys, unknown, results, since=since)
+
+        for attempt in range(max_retries + 1):
+            if not todo:
+                break
+            if attempt:
+                delay = backoff * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+                print(f"--- [BATCH] {len(todo)}개 재시도 ({attempt}/{max_retries}), {delay:.1f}초 대기 ---")
+                time.sleep(delay)
+
+            retry = []
+            for start in range(0, len(todo), batch_size):
+                chunk = todo[start:start + batch_size]
+                retry += self._send_batch(service, posts, keys, chunk, results, is_draft)
+            todo = retry
+
+        for i in todo:
+            if results[i] is None or not results[i]['ok']:
+                error = results[i]['error'] if results[i] else "재시도 횟수 초과"
+                results[i] = {'ok': False, 'post': None, 'error': error, 'skipped': False}
+                if self.ledger:
+                    self.ledger.mark_failed(keys[i], error)
+
+        succeeded = sum(1 for r in results if r['ok'])
+        print(f"--- [BATCH] 업로드 완료: 성공 {succeeded} / 전체 {len(posts)} ---")
+        return results
+
+    def _send_batch(self, service, posts, keys, chunk, results, is_draft):
+        """
+        배치 하나를 전송하고, 다시 보내야 하는 항목의 인덱스 목록을 반환합니다.
+        """
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import BatchHttpRequest
+        retry = []
+        unknown = []
+
+        if self.quota is not None:
+            # 배치 안의 요청도 한 건씩 할당량을 쓰므로 보내기 전에 chunk 크기만큼 예약
+            try:
+                self.quota.acquire(BLOGGER, requests=len(chunk))
+            except QuotaExceeded as e:
+                print(f"--- [BATCH] 할당량 부족으로 전송하지 않음: {e} ---")
+                for i in chunk:
+                    results[i] = {'ok': False, 'post': None, 'error': str(e), 'skipped': False}
+                return []
+
+        def callback(request_id, response, exception):
+            i = int(request_id)
+            if exception is None:
+                print(f"게시글 생성 성공: {response.get('url')}")
+                results[i] = {'ok': True, 'post': response, 'error': None, 'skipped': False}
+                if self.ledger:
+                    self.ledger.mark_published(keys[i], response)
+                return
+            status = exception.resp.status if isinstance(exception, HttpError) else None
+            self._record_rate_limited(status)
+            results[i] = {'ok': False, 'post': None, 'error': str(exception), 'skipped': False}
+            if status in UNKNOWN_OUTCOME_STATUS:
+                # 5xx여도 글이 만들어졌을 수 있으므로 pending으로 두고 대조한 뒤에만 다시 보냄
+                unknown.append(i)
+            elif status in RETRYABLE_STATUS:
+                retry.append(i)
+            else:
+                print(f"--- [BATCH] 게시 실패 (재시도 안 함): {posts[i]['title']} - {exception} ---")
+                if self.ledger:
+                    self.ledger.mark_failed(keys[i], exception)
+
+        batch = BatchHttpRequest(callback=callback, batch_uri=f"{self.api_endpoint.rstrip('/')}/batch")
+        for i in chunk:
+            post = posts[i]
+            body = self._post_body(post['title'], post['content'], post.get('labels'))
+            batch.add(service.posts().insert(blogId=self.blog_id, body=body, isDraft=is_draft), request_id=str(i))
+            if self.ledger:
+                self.ledger.mark_pending(keys[i], self.blog_id, post['title'])
+
+        sent_at = time.time()
+        try:
+            with metrics.span('batch_insert', blog_id=self.blog_id, items=len(chunk)) as sp:
+                self._execute(batch, cost=0)
+                sp.set(retry=len(retry), unknown=len(unknown))
+        except Exception as e:
+            # 배치 응답을 받지 못하면 서버에서 처리됐는지 알 수 없으므로 대조 후 재시도
+            print(f"--- [BATCH] 배치 요청 오류: {e} ---")
+            for i in chunk:
+                if results[i] is None:
+                    results[i] = {'ok': False, 'post': None, 'error': str(e), 'skipped': False}
+            unknown = [i for i in chunk if not results[i]['ok'] and i not in retry]
+        return retry + self._reconcile(posts, keys, unknown, results, since=sent_at)
+
+    def _reconcile(self, posts, keys, indexes, results, since=None):
+        """
+        결과를 알 수 없는 글이 실제로 게시됐는지 since(마지막 전송 시각) 이후 수정된 글 목록과 대조합니다.
+        제목, 라벨, 본문이 모두 같은 글을 찾으면 성공으로 기록하고, 나머지 인덱스(다시 보내야 하는 글)를 반환합니다.
+        """
+        if not indexes:
+            return []
+        try:
+            published = self._find_published({_fingerprint(posts[i]) for i in indexes}, since)
+        except Exception as e:
+            # 대조할 수 없으면 중복 위험을 피하기 위해 재전송하지 않음
+            print(f"--- [BATCH] 게시 여부 확인 실패, 재전송하지 않음: {e} ---")
+            for i in indexes:
+                results[i] = {'ok': False, 'post': None, 'error': f"게시 여부 확인 실패: {e}", 'skipped': False}
+            return []
+
+        resend = []
+        for i in indexes:
+            post = published.get(_fingerprint(posts[i]))
+            if post:
+                print(f"--- [BATCH] 이미 게시된 것으로 확인됨: {posts[i]['title']} ---")
+                results[i] = {'ok': True, 'post': post, 'error': None, 'skipped': True}
+                if self.ledger:
+                    self.ledger.mark_published(keys[i], post)
+            else:
+                resend.append(i)
+        return resend
+
+    def _find_published(self, fingerprints, since=None, page_size=50):
+        """
+        최근 수정된 글부터 페이지를 넘기며 fingerprints와 같은 글을 찾아 {fingerprint: 게시글}로 반환합니다.
+        모두 찾았거나 since(epoch 초)보다 RECONCILE_SLACK 이상 이전에 수정된 글에 닿으면 멈춥니다. (since가 없으면 전체)
+        """
+        cutoff = None if since is None else since - RECONCILE_SLACK
+        found = {}
+        for item in self.iter_posts(fields='nextPageToken,items(id,title,content,labels,url,published,updated,status)',
+                                    order_by='UPDATED', fetch_bodies=True, page_size=page_size):
+            updated = _timestamp(item.get('updated'))
+            if cutoff is not None and updated is not None and updated < cutoff:
+                break
+            fingerprint = _fingerprint(item)
+            if fingerprint in fingerprints and fingerprint not in found:
+                # 원장에는 본문을 빼고 기록
+                found[fingerprint] = {k: v for k, v in item.items() if k != 'content'}
+                if len(found) == len(fingerprints):
+                    break
+        return found
+
+    def iter_posts(self, fields='nextPageToken,items(id,title,labels,url,published)', order_by='PUBLISHED',
+                   fetch_bodies=False, page_size=100, **params):
+        """
+        posts.list를 페이지 단위로 넘기며 게시글을 하나씩 반환합니다 (최신순).
+        fields 마스크로 필요한 필드만 받으며, 호출자가 순회를 멈추면 다음 페이지는 요청하지 않습니다.
+        """
+        service = self.get_service()
+        page_token = None
+        while True:
+            response = self._execute(service.posts().list(
+                blogId=self.blog_id,
+                fetchBodies=fetch_bodies,
+                maxResults=page_size,
+                orderBy=order_by,
+                status=['LIVE', 'DRAFT', 'SCHEDULED'],
+                view='ADMIN',
+                fields=fields,
+                pageToken=page_token,
+                **params
+            ))
+            for item in response.get('items', []):
+                yield item
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
@@ -1,300 +1,873 @@
 import os
-import re
+import time
+import random
+import asyncio
+import functools
+import threading
 from datetime import datetime
-from google import genai
-from google.genai import types
+from src.response_cache import ResponseCache
+from src.model_router import ModelRouter, FATAL, RATE_LIMITED
+from src.quota import QuotaExceeded, estimate_tokens
+from src.html_stream import HtmlStreamValidator, StreamViolation
+from src import postprocess
+from src.html_minifier import HtmlMinifier
+from src.prompt_compiler import PromptCompiler, REPORT_HEADER, REPORT_SECTIONS
+from src.report_assembler import assemble
+from src.report_model import RESPONSE_SCHEMA, parse_report
+from src.report_render import render_post
+from src.topic_pool import FALLBACK_TOPICS, ticker_from_title
+from src.hedging import PRIMARY_WON, HEDGE_WON, NOT_HEDGED, BUDGET_EXHAUSTED, ALL_FAILED
+from src import metrics
+
+TOPIC_PROMPT = """
+        당신은 금융 시장 트렌드 스카우터입니다.
+        다음 조건에 맞는 **단 하나의 상장 기업**을 찾아 추천해주세요. (S&P 500 지수 포함 기업 위주)
+
+        **조건**:
+        1. 최근 주요 금융 뉴스나 Reddit에서 화제가 되고 있는 기업.
+        2. 메이저 빅테크(NVDA, AAPL 등) 제외.
+        
+        **결과물**: 오직 **기업명(티커)** 만 출력하세요. (예: Ford Motor (F))
+        """
+
+
+class _StreamState:
+    """
+    스트리밍 시도 하나의 상태. 조각마다 종료 사유/사용량을 모으고, 첫 토큰 시간을 기록한 뒤 HTML 검증기에 넣습니다.
+    """
+
+    def __init__(self, router, model, span, first_token=None):
+        self.router = router
+        self.model = model
+        self.span = span
+        self.first_token = first_token
+        self.validator = HtmlStreamValidator()
+        self.started = time.perf_counter()
+        self.ttft = None
+        self.finish_reason = None
+        self.usage = None
+
+    def feed(self, chunk):
+        if chunk.candidates and chunk.candidates[0].finish_reason:
+            self.finish_reason = chunk.candidates[0].finish_reason
+        self.usage = getattr(chunk, 'usage_metadata', None) or self.usage
+        self.span.usage(chunk)
+        if not chunk.text:
+            return
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+            print(f"--- {self.model} 첫 토큰까지 {self.ttft:.2f}초 ---")
+            self.span.set(ttft_ms=round(self.ttft * 1000, 1))
+            self.router.record_ttft(self.model, self.ttft)
+            if self.first_token is not None:
+                self.first_token.set()
+        self.validator.feed(chunk.text)
+
+    def finish(self):
+        return self.validator.finish(self.finish_reason)
+
 
 class ContentEngine:
-    def __init__(self, api_key):
-        # google-genai SDK 사용
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key, cache=None, router=None, client=None):
+        # google-genai SDK 사용 (벤치마크에서는 같은 인터페이스의 가짜 클라이언트를 주입)
+        # SDK는 import 비용이 커서 엔진을 만들 때 불러옵니다
+        if client is None:
+            from google import genai
+            client = genai.Client(api_key=api_key)
+        self.client = client
         # 호출 우선순위 모델 리스트
         self.models = ['gemini-3-flash', 'gemini-2.5-flash', 'gemini-2.5-flash-lite']
+        # 응답 캐시 (ResponseCache, 선택 사항)
+        self.cache = cache
+        # 모델 상태 기반 라우터 (state_path 없이 만들면 프로세스 내에서만 상태 유지)
+        self.router = router or ModelRouter(self.models)
+        # 섹션 단위 프롬프트 조립기와 컨텍스트 캐시 사용 여부
+        self.prompts = PromptCompiler()
+        self.use_context_cache = False
+        # 헤지 요청 정책 (HedgePolicy, 선택 사항). 설정하면 콘텐츠 생성이 헤지 스트리밍 경로를 사용
+        self.hedging = None
+        # 추천 후보 backlog와 이미 다룬 기업 색인 (TopicPool, 선택 사항)
+        self.topics = None
+        # 이미 다룬 기업 색인을 채우는 함수 (topics를 인자로 받음, 선택 사항). 주제를 추천할 때 처음 한 번만 실행
+        self.topic_indexer = None
+        self._topic_index_lock = threading.Lock()
+        # True이면 팩트 시트 → 섹션별 병렬 생성 → 조립 경로 사용 (실패 시 한 번에 생성하는 경로로 대체)
+        self.sectioned = False
+        # True이면 HTML 대신 response_schema에 맞춘 JSON 리포트를 먼저 생성 (실패 시 HTML 생성 경로로 대체)
+        self.structured = False
+        # 모델별 속도 제한/하루 한도 (QuotaManager, 선택 사항). 호출 전에 자리를 예약해 429를 받기 전에 간격을 둠
+        self.quota = None
+        # 업로드 전 HTML 축소 (공백, 인라인 style 중복 선언, 빈/중복 속성 정리). None이면 정리된 본문을 그대로 사용
+        self.minifier = HtmlMinifier()
+        # 모든 모델이 쿨다운 중일 때 최대 대기 시간(초)과 재시도 라운드 수
+        self.max_wait = 90.0
+        self.max_rounds = 3
 
     def recommend_topic(self):
         """
         Gemini를 사용하여 최근 시장 트렌드에 맞는 기업을 추천받습니다.
+        topics(TopicPool)가 있으면 backlog에서 아직 다루지 않은 후보를 꺼내고,
+        backlog가 비었을 때만 후보 여러 개를 한 번에 추천받습니다.
         """
-        prompt = """
-        당신은 금융 시장 트렌드 스카우터입니다.
-        다음 조건에 맞는 **단 하나의 상장 기업**을 찾아 추천해주세요. (S&P 500 지수 포함 기업 위주)
+        if self.topics is None:
+            text = self._generate(TOPIC_PROMPT, self._topic_config(), "주제 추천", call_class='topic')
+            if text:
+                return text.strip()
+        else:
+            self._index_topics()
+            topic = self.topics.take()
+            if topic is None:
+                text = self._generate(self.topics.batch_prompt(), self._topic_config(), "주제 후보 추천",
+                                      call_class='topic')
+                topic = self._refill_topics(text)
+            if topic:
+                return topic
 
-        **조건**:
-        1. 최근 주요 금융 뉴스나 Reddit에서 화제가 되고 있는 기업.
-        2. 메이저 빅테크(NVDA, AAPL 등) 제외.
-        
-        **결과물**: 오직 **기업명(티커)** 만 출력하세요. (예: Ford Motor (F))
+        print("--- 모든 모델 호출 실패. 기본값 반환 ---")
+        return self._fallback_topic()
+
+    def generate_content(self, topic, stream=False):
         """
-        
+        [투자분석 블로그 통합 프롬프트 시스템 v3.0]을 온전히 적용하여 콘텐츠를 생성합니다.
+        stream=True이면 스트리밍으로 받으면서 HTML 규칙 위반 시 즉시 중단하고 다음 모델로 넘어갑니다.
+        hedging이 설정되어 있으면 항상 스트리밍 헤지 경로(_generate_hedged_async)를 사용합니다.
+        sectioned=True이면 섹션 분할 생성(_generate_sectioned_async)을 먼저 시도합니다.
+        structured=True이면 구조화 리포트(JSON)를 가장 먼저 시도합니다. (스트리밍/헤지 없이 한 번에 받음)
+        """
+        if self.structured:
+            text = self._generate(*self._report_request(topic), "구조화 리포트 생성", call_class='structured',
+                                  validate=self._valid_report)
+            if self._check_report(text, topic):
+                return text
+        if self.sectioned:
+            text = asyncio.run(self._generate_sectioned_async(topic, stream))
+            if text:
+                return text
+        prompt_for, contents_for = self._content_request(topic)
+        if self.hedging is not None:
+            text = asyncio.run(
+                self._generate_hedged_async(prompt_for, self._generation_config(), "콘텐츠 생성", contents_for)
+            )
+        else:
+            generate = self._generate_stream if stream else self._generate
+            text = generate(prompt_for, self._generation_config(), "콘텐츠 생성", contents_for)
+        if text:
+            return text
+
+        print("--- 모든 모델 호출 실패 ---")
+        return None
+
+    async def recommend_topic_async(self):
+        """
+        recommend_topic의 비동기 버전 (배치 모드용, google-genai aio 클라이언트 사용).
+        """
+        if self.topics is None:
+            text = await self._generate_async(TOPIC_PROMPT, self._topic_config(), "주제 추천", call_class='topic')
+            if text:
+                return text.strip()
+        else:
+            await asyncio.to_thread(self._index_topics)
+            topic = await asyncio.to_thread(self.topics.take)
+            if topic is None:
+                text = await self._generate_async(self.topics.batch_prompt(), self._topic_config(), "주제 후보 추천",
+                                                  call_class='topic')
+                topic = await asyncio.to_thread(self._refill_topics, text)
+            if topic:
+                return topic
+
+        print("--- 모든 모델 호출 실패. 기본값 반환 ---")
+        return self._fallback_topic()
+
+    def _index_topics(self):
+        # 주제를 지정한 실행에서는 색인(게시 원장, mirror, 블로그 전체 목록)을 읽지 않도록 추천 직전에 채움
+        with self._topic_index_lock:
+            indexer, self.topic_indexer = self.topic_indexer, None
+            if indexer is not None:
+                indexer(self.topics)
+
+    def _refill_topics(self, text):
+        if not text:
+            return None
+        added = self.topics.add_candidates(text)
+        print(f"--- 주제 후보 {added}개를 backlog에 추가 ---")
+        return self.topics.take()
+
+    def _fallback_topic(self):
+        # 프롬프트가 제외하는 빅테크 대신, 아직 다루지 않은 기본 후보를 사용
+        if self.topics is not None:
+            return self.topics.fallback()
+        return random.choice(FALLBACK_TOPICS)
+
+    def record_published(self, topic, title):
+        """
+        게시 완료된 주제를 색인에 기록해 다음 추천에서 제외합니다.
+        """
+        if self.topics is not None:
+            self.topics.mark_covered(ticker_from_title(topic) or ticker_from_title(title), title)
+
+    def release_topic(self, topic):
+        """
+        게시하지 못한 주제의 예약을 풀어 다음 추천에서 다시 꺼낼 수 있게 합니다.
+        """
+        if self.topics is not None:
+            self.topics.release(ticker_from_title(topic))
+
+    async def generate_content_async(self, topic, stream=False):
+        """
+        generate_content의 비동기 버전. 여러 주제를 동시에 생성할 때 사용합니다.
+        """
+        if self.structured:
+            text = await self._generate_async(*self._report_request(topic), f"[{topic}] 구조화 리포트 생성",
+                                             call_class='structured', validate=self._valid_report)
+            if self._check_report(text, topic):
+                return text
+        if self.sectioned:
+            text = await self._generate_sectioned_async(topic, stream)
+            if text:
+                return text
+        if self.hedging is not None:
+            generate = self._generate_hedged_async
+        else:
+            generate = self._generate_stream_async if stream else self._generate_async
+        prompt_for, contents_for = self._content_request(topic)
+        text = await generate(prompt_for, self._generation_config(), f"[{topic}] 콘텐츠 생성", contents_for)
+        if text:
+            return text
+
+        print(f"--- [{topic}] 모든 모델 호출 실패 ---")
+        return None
+
+    async def _generate_sectioned_async(self, topic, stream=False):
+        """
+        팩트 시트를 먼저 만든 뒤 Phase 1 헤더와 Phase 3 섹션을 동시에 생성해 하나의 본문으로 조립합니다.
+        출력 토큰 생성은 호출 안에서 순차적이므로, 완료 시간이 가장 긴 섹션 하나 + 팩트 시트 수준으로 줄어듭니다.
+        팩트 시트나 섹션 하나라도 실패하면 None을 반환합니다.
+        """
+        date = datetime.now().strftime('%Y-%m-%d')
+        config = self._generation_config()
+        with metrics.span('sectioned', topic=topic, sections=len(REPORT_SECTIONS)) as sp:
+            fact_sheet = await self._generate_async(
+                self.prompts.compile_fact_sheet(topic, date), config, f"[{topic}] 팩트 시트", call_class='section'
+            )
+            if not fact_sheet:
+                sp.set(outcome='fact_sheet_failed')
+                print(f"--- [{topic}] 팩트 시트 생성 실패. 한 번에 생성하는 경로로 전환 ---")
+                return None
+
+            generate = self._generate_stream_async if stream else self._generate_async
+            units = [REPORT_HEADER] + REPORT_SECTIONS
+            texts = await asyncio.gather(*(
+                generate(self.prompts.compile_section(topic, fact_sheet, name, spec, date), config,
+                         f"[{topic}] {name}", call_class='section')
+                for _, name, spec in units
+            ))
+            failed = [name for (_, name, _), text in zip(units, texts) if not text]
+            if failed:
+                sp.set(outcome='section_failed')
+                print(f"--- [{topic}] 섹션 생성 실패 ({', '.join(failed)}). 한 번에 생성하는 경로로 전환 ---")
+                return None
+            return assemble(texts[0], [(key, name, text) for (key, name, _), text in zip(REPORT_SECTIONS, texts[1:])],
+                            date)
+
+    def _report_request(self, topic):
+        """
+        구조화 리포트 요청의 (모델별 프롬프트 함수, JSON 모드 config)를 반환합니다.
+        """
+        date = datetime.now().strftime('%Y-%m-%d')
+
+        def prompt_for(model):
+            return self.prompts.compile_structured(topic, date, self.prompts.variant_for(model))
+
+        return prompt_for, self._structured_config()
+
+    @staticmethod
+    def _valid_report(text):
+        try:
+            parse_report(text)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _check_report(text, topic):
+        # 스키마를 지정해도 잘린 응답은 JSON이 아닐 수 있으므로 파싱되는지 확인하고, 아니면 HTML 경로로 넘어감
+        if not text:
+            return False
+        try:
+            parse_report(text)
+            return True
+        except ValueError as e:
+            print(f"--- [{topic}] 구조화 리포트 사용 불가 ({e}). HTML 생성 경로로 전환 ---")
+            return False
+
+    def update_sections(self, title, sections):
+        """
+        기존 글의 낡은 섹션만 다시 생성합니다. (sections: `<!-- section:N -->`으로 구분된 기존 HTML)
+        글 전체 대신 해당 섹션만 출력하므로 생성 토큰이 섹션 분량에 비례합니다.
+        """
+        date = datetime.now().strftime('%Y-%m-%d')
+        prompt = self.prompts.compile_update(title, sections, date)
+        text = self._generate(prompt, self._generation_config(), "섹션 갱신", call_class='update')
+        if text:
+            return text
+
+        print("--- 모든 모델 호출 실패 ---")
+        return None
+
+    async def localize_async(self, html, language):
+        """
+        생성된 글(HTML)을 language 블로그용으로 옮깁니다. 여러 블로그에 게시할 때 언어별로 한 번만 호출합니다.
+        """
+        prompt = self.prompts.compile_localize(html, language)
+        text = await self._generate_async(prompt, self._generation_config(), f"현지화({language})",
+                                         call_class='localize')
+        if text:
+            return text
+
+        print("--- 모든 모델 호출 실패 ---")
+        return None
+
+    def build_prompt(self, topic, model=None):
+        """
+        콘텐츠 생성용 통합 프롬프트를 구성합니다. lite 모델에는 축약 변형을 사용합니다.
+        """
+        variant = self.prompts.variant_for(model) if model else 'full'
+        return self.prompts.compile(topic, variant=variant)
+
+    def _content_request(self, topic):
+        """
+        모델별 (캐시 키용 전체 프롬프트, 실제 전송 contents, config)를 만드는 함수를 반환합니다.
+        컨텍스트 캐시를 쓰면 정적 섹션은 캐시로 참조하고 주제/날짜만 전송합니다.
+        """
+        date = datetime.now().strftime('%Y-%m-%d')
+
+        def prompt_for(model):
+            return self.prompts.compile(topic, date, self.prompts.variant_for(model))
+
+        def contents_for(model, prompt, config):
+            if self.use_context_cache:
+                name = self.prompts.cached_content(self.client, model)
+                if name:
+                    return self.prompts.topic_text(topic, date), config.model_copy(update={'cached_content': name})
+            return prompt, config
+
+        return prompt_for, contents_for
+
+    def _topic_config(self):
+        from google.genai import types
+        return types.GenerateContentConfig(
+            temperature=0.7
+        )
+
+    def _generation_config(self):
+        from google.genai import types
+        return types.GenerateContentConfig(
+            temperature=0.7,
+            safety_settings=[
+                types.SafetySetting(
+                    category='HARM_CATEGORY_HATE_SPEECH',
+                    threshold='BLOCK_NONE'
+                ),
+                types.SafetySetting(
+                    category='HARM_CATEGORY_HARASSMENT',
+                    threshold='BLOCK_NONE'
+                ),
+                types.SafetySetting(
+                    category='HARM_CATEGORY_SEXUALLY_EXPLICIT',
+                    threshold='BLOCK_NONE'
+                ),
+                types.SafetySetting(
+                    category='HARM_CATEGORY_DANGEROUS_CONTENT',
+                    threshold='BLOCK_NONE'
+                ),
+            ]
+        )
+
+    def _structured_config(self):
+        return self._generation_config().model_copy(update={
+            'response_mime_type': 'application/json',
+            'response_schema': RESPONSE_SCHEMA,
+        })
+
+    @staticmethod
+    def _prompt_text(prompt_for, model):
+        return prompt_for(model) if callable(prompt_for) else prompt_for
+
+    @staticmethod
+    def _prepare_request(model, prompt, config, contents_for):
+        if contents_for is None:
+            return prompt, config
+        return contents_for(model, prompt, config)
+
+    def _cache_lookup(self, prompt_for, config):
+        """
+        어떤 모델이든 오늘 같은 프롬프트로 생성한 응답이 있으면 모델 호출 없이 반환합니다.
+        """
+        if self.cache is None:
+            return None
+        date = datetime.now().strftime('%Y-%m-%d')
         for model in self.models:
+            prompt = self._prompt_text(prompt_for, model)
+            key = ResponseCache.make_key(model, prompt, config.temperature, date)
+            with metrics.span('cache_lookup', model=model) as sp:
+                cached = self.cache.get(key)
+                sp.set(hit=cached is not None)
+            if cached is not None:
+                print(f"--- 캐시 적중: {model} (모델 호출 생략) ---")
+                return cached
+        return None
+
+    def _cache_store(self, model, prompt, config, text):
+        if self.cache is None:
+            return
+        date = datetime.now().strftime('%Y-%m-%d')
+        key = ResponseCache.make_key(model, prompt, config.temperature, date)
+        self.cache.set(key, model, text)
+
+    def _next_candidates(self, label, call_class='report'):
+        """
+        라우터가 허용하는 모델 목록을 반환합니다. 모두 쿨다운 중이면 (None, 대기 초)를 반환합니다.
+        call_class: 지연 시간을 따로 비교할 호출 종류 (topic, report, structured, section, update, localize)
+        """
+        candidates = self.router.candidates(call_class)
+        if candidates:
+            return candidates, 0.0
+        wait = self.router.next_available_in()
+        if wait is None or wait > self.max_wait:
+            print(f"--- {label}: 사용 가능한 모델이 없습니다 (대기 필요 {wait}초) ---")
+            return None, None
+        print(f"--- {label}: 모든 모델 쿨다운 중. {wait:.1f}초 후 재시도 ---")
+        return None, wait
+
+    def _quota_reserve(self, model, prompt, label):
+        """
+        모델 호출 전에 한도 안의 자리를 예약하고 (대기 초, 추정 토큰 수)를 반환합니다.
+        하루 한도가 끝났거나 max_wait 안에 자리가 나지 않으면 None을 반환합니다. (다음 모델로 넘어감)
+        """
+        if self.quota is None:
+            return 0.0, 0
+        estimate = estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+        try:
+            return self.quota.reserve(model, tokens=estimate, max_wait=self.max_wait), estimate
+        except QuotaExceeded as e:
+            return self._quota_skipped(model, label, e)
+
+    async def _quota_reserve_async(self, model, prompt, label):
+        """
+        _quota_reserve의 비동기 버전. 예약(SQLite 잠금 대기 포함)은 스레드에서 실행해 다른 섹션/헤지 요청을 막지 않습니다.
+        """
+        if self.quota is None:
+            return 0.0, 0
+        estimate = estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+        try:
+            return await self.quota.reserve_async(model, tokens=estimate, max_wait=self.max_wait), estimate
+        except QuotaExceeded as e:
+            return self._quota_skipped(model, label, e)
+
+    def _quota_skipped(self, model, label, error):
+        print(f"--- {label}: {model} 건너뜀 ({error}) ---")
+        # 시험 호출 몫을 맡았다면 다른 작업이 시험할 수 있도록 돌려줌
+        self.router.release(model)
+        return None
+
+    def _quota_record(self, model, usage, estimate):
+        if self.quota is not None and usage is not None and getattr(usage, 'prompt_token_count', None):
+            self.quota.record(model, usage.prompt_token_count, estimate)
+
+    async def _quota_record_async(self, model, usage, estimate):
+        if self.quota is not None:
+            await asyncio.to_thread(self._quota_record, model, usage, estimate)
+
+    def _quota_failed(self, model, kind):
+        # 예약했는데도 429를 받았다면 설정한 한도가 실제보다 높은 것이므로 분당 버킷을 비움
+        if self.quota is not None and kind == RATE_LIMITED:
+            self.quota.record_rate_limited(model)
+
+    @staticmethod
+    def _response_text(response):
+        if not response.text:
+            if response.candidates:
+                print(f"--- [DEBUG] Finish Reason: {response.candidates[0].finish_reason} ---")
+            raise ValueError("Response text is empty")
+        return response.text
+
+    def _attempt_failed(self, model, error, sp):
+        """
+        호출 실패를 라우터/할당량/지표에 기록하고 분류를 반환합니다. (모든 생성 경로 공통)
+        """
+        kind = self.router.record_failure(model, error)
+        self._quota_failed(model, kind)
+        sp.set(outcome=kind, error=str(error)[:300])
+        if kind == FATAL:
+            print(f"--- {model} 예상치 못한 오류 발생: {error} ---")
+        else:
+            print(f"--- {model} 실패 (에러: {error}). 다음 모델 시도 ---")
+        return kind
+
+    def _attempt_succeeded(self, model, prompt, config, text, started, call_class, validate=None):
+        """
+        성공한 호출의 지연 시간을 기록하고, 검증을 통과한 응답만 캐시에 저장합니다. (모든 생성 경로 공통)
+        validate(text)가 False인 응답은 그대로 반환하되 캐시에 저장하지 않습니다. (같은 날 재실행에서 다시 생성)
+        """
+        self.router.record_success(model, time.perf_counter() - started, call_class)
+        if validate is None or validate(text):
+            self._cache_store(model, prompt, config, text)
+        return text
+
+    def _stream_violated(self, model, violation, stream_state, sp):
+        # 출력 검증 실패는 모델 상태와 무관하므로 시험 호출 표시만 해제
+        self.router.release(model)
+        sp.set(outcome='violation', reason=violation.reason, received_chars=len(stream_state.validator.text))
+        print(f"--- {model} 출력 중단 ({violation}, {len(stream_state.validator.text)}자 수신 후). 다음 모델 시도 ---")
+
+    def _attempt(self, model, prompt, config, label, contents_for=None, call_class='report', validate=None):
+        """
+        모델 하나에 요청을 보내고 (텍스트 또는 None, 실패 분류)를 반환합니다.
+        """
+        reserved = self._quota_reserve(model, prompt, label)
+        if reserved is None:
+            return None, 'quota'
+        quota_wait, estimate = reserved
+        if quota_wait:
+            time.sleep(quota_wait)
+        self.router.begin(model)
+        with metrics.span('model_attempt', model=model, stage=label) as sp:
+            started = time.perf_counter()
             try:
-                print(f"--- 주제 추천 시도 중: {model} ---")
+                print(f"--- {label} 시도 중: {model} ---")
+                contents, model_config = self._prepare_request(model, prompt, config, contents_for)
                 response = self.client.models.generate_content(
                     model=model,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        temperature=0.7
-                    )
+                    contents=contents,
+                    config=model_config
                 )
-                if response.text:
-                    return response.text.strip()
-                else:
-                    raise ValueError("Response text is empty")
+                sp.usage(response)
+                self._quota_record(model, getattr(response, 'usage_metadata', None), estimate)
+                text = self._response_text(response)
+                return self._attempt_succeeded(model, prompt, config, text, started, call_class, validate), None
             except Exception as e:
-                err_msg = str(e)
-                if "404" in err_msg or "429" in err_msg or "NotFound" in err_msg or "TooManyRequests" in err_msg:
-                    print(f"--- {model} 실패 (에러: {err_msg}). 다음 모델 시도 ---")
-                    continue
-                else:
-                    print(f"--- {model} 예상치 못한 오류 발생: {e} ---")
-                    break
-        
-        print("--- 모든 모델 호출 실패. 기본값 반환 ---")
-        return "NVIDIA (NVDA)"
+                return None, self._attempt_failed(model, e, sp)
 
-    def generate_content(self, topic):
+    async def _attempt_async(self, model, prompt, config, label, contents_for=None, call_class='report',
+                             validate=None):
         """
-        [투자분석 블로그 통합 프롬프트 시스템 v3.0]을 온전히 적용하여 콘텐츠를 생성합니다.
+        _attempt의 비동기 버전.
         """
-        full_prompt = f"""
-[투자분석 블로그 통합 프롬프트 시스템 v3.0]을 온전히 적용하여 다음 주제에 대한 전문적인 분석 리포트를 작성하십시오.
-
----
+        reserved = await self._quota_reserve_async(model, prompt, label)
+        if reserved is None:
+            return None, 'quota'
+        quota_wait, estimate = reserved
+        if quota_wait:
+            await asyncio.sleep(quota_wait)
+        self.router.begin(model)
+        with metrics.span('model_attempt', model=model, stage=label) as sp:
+            started = time.perf_counter()
+            try:
+                print(f"--- {label} 시도 중 (async): {model} ---")
+                contents, model_config = await asyncio.to_thread(
+                    self._prepare_request, model, prompt, config, contents_for
+                )
+                response = await self.client.aio.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=model_config
+                )
+                sp.usage(response)
+                await self._quota_record_async(model, getattr(response, 'usage_metadata', None), estimate)
+                text = self._response_text(response)
+                return self._attempt_succeeded(model, prompt, config, text, started, call_class, validate), None
+            except Exception as e:
+                return None, self._attempt_failed(model, e, sp)
 
-## 2. Layer 1: Advanced Design System
-
-### 2.3 디자인 가이드라인 (Design System Reference)
-```css
-:root {{
-  /* Font Stack */
-  --font-primary: -apple-system, "Noto Sans KR", sans-serif;
-  --font-mono: "SF Mono", Monaco, monospace;
-  
-  /* Font Sizes */
-  --text-base: 1rem;     /* 16px */
-  --text-lg: 1.125rem;   /* 18px */
-  --text-xl: 1.5rem;     /* 24px */
-}}
-```
-
-### 2.4 컴포넌트 정의
-- `.tst-stock-info` - 종목 정보 헤더
-- `.key-points-list` - 핵심 포인트 리스트
-- `.rating` - 투자 등급 배지
-- `.tst-financial-table` - 재무 테이블
-- `.trend-{{up|down|neutral}}` - 트렌드 인디케이터
-- `.metric-card` - 지표 카드
-
----
-
-## 3. Layer 2: HTML Structure Framework
-
-### 3.1 구조 설계 철학
-
-#### 📋 구조 설계 4대 원칙
-1. **Platform Awareness**
-   - 스킨 시스템 충돌 방지
-   - 에디터 자동 변환 대응
-
-2. **EEAT 준수**
-   - 작성자 푸터 포함 (작성자: 우디(Woody), 실전 투자 분석가)
-   - 면책조항 필수 포함
-
-### 3.2 5-Phase 템플릿 구조
-```
-Phase 1: Meta Header (메타데이터)
-    ├─ 기업 식별 정보
-    ├─ 핵심 투자 포인트
-    └─ 투자 등급 배지
-
-Phase 2: Navigation (목차)
-    └─ 조건부 자동 생성
-
-Phase 3: Main Content (본문)
-    ├─ Executive Summary
-    ├─ 재무 분석
-    ├─ 밸류에이션
-    └─ 리스크 요인
-
-Phase 4: Compliance Footer (푸터)
-    ├─ 면책조항
-    └─ 업데이트 정보
-
-Phase 5: Inline Styles (스타일)
-    └─ 스코프 한정 CSS
-```
-
-### 3.3 티스토리 및 블로거 제약사항 대응
-
-#### ⚠️ 필수 금지사항
-| 항목 | 이유 | 대안 |
-|------|------|------|
-| `!important` 남용 | 스킨 충돌 | 특정성 높은 선택자 |
-| 전역 선택자 | 페이지 영향 | `.tst-` 접두사 |
-| `<script>` 태그 | 보안 제거 | 순수 CSS |
-| 고정 픽셀값 | 반응형 깨짐 | rem, % 단위 |
-
-### 3.4 HTML 형식 요구사항 (Blogger 최적화)
-
-#### 📋 필수 준수사항
-1. **HTML 구조**
-   - `<body>` 태그 내의 콘텐츠만 작성
-   - `<html>`, `<head>`, `<body>` 태그는 작성하지 않음
-
-2. **CSS 처리 (Inline CSS ONLY)**
-   - 모든 스타일은 각 태그 내의 **인라인 'style' 속성**으로만 작성
-   - `<head>` 내의 `<style>` 태그 사용 **절대 금지**
-   - 모든 스타일 선언은 개별 요소에 직접 적용
-
-3. **제약 사항**
-   - JavaScript (`<script>`) 사용 금지
-   - 외부 iFrame 사용 금지
-   - Deprecated 태그 및 속성 사용 금지 (`bgcolor`, `font`, `center` 등)
-   - 모든 스타일링은 CSS를 활용
-
----
-
-## 4. Layer 3: Content Generation Engine
-
-### 4.1 역할 정의
-
-#### 👤 페르소나
-**'Prudent Contrarian'** - 20년 경력 가치투자 애널리스트
-
-#### 🧠 3중 사고 모드
-```
-Primary Mode: 보수적 가치투자자 (자본 보존)
-     ↓↑
-Shadow Mode: 성장투자자 관점 (기회비용)
-     ↓↑
-Meta Mode: 통합적 지혜
-```
-
-### 4.2 콘텐츠 내용
-- 사용자가 입력한 주제를 기반으로 전문적인 데이터 분석 및 통찰을 제공
-
-### 4.3 출력 규격
-
-#### 📏 섹션별 분량 기준
-| 섹션 | 최소 분량 | 필수 요소 |
-|------|----------|----------|
-| Summary | 300-500자 | 3줄 요약 |
-| 재무분석 | 1,500자+ | 3년 데이터 |
-| 밸류에이션 | 1,500자+ | DCF, Multiple |
-| 리스크 | 1,000자+ | 매트릭스 |
-| 전략 | 800자+ | 진입/출구 |
-
-#### 📊 필수 시각화 요소
-- 테이블: 5개+
-- 차트: 3개+ (HTML/CSS로 구현)
-- 메트릭카드: 4개+
-- 트렌드지표: 10개+
-
----
-
-## 5. 통합 실행 매뉴얼
-
-### 5.1 Phase 1: 준비 (Preparation)
-```
-□ 기업 선정 및 티커 확인
-□ 3개년 재무제표 수집
-□ 경쟁사 3개 선정
-□ 최근 공시/뉴스 수집
-```
-
-### 5.2 Phase 2: 실행 (Execution)
-```
-□ Layer 1: 디자인 시스템 적용 (인라인 스타일링)
-□ Layer 2: HTML 구조 생성
-□ Layer 3: 6단계 정밀 분석 실행
-□ 데이터 검증
-```
-
-### 5.3 Phase 3: 검증 (Validation)
-```
-□ 기술 검증 (HTML/CSS 호환성)
-□ 콘텐츠 검증 (정확성 및 EEAT)
-□ 품질 검증 (가독성 및 편집디자인)
-□ 법무 검증 (면책조항 포함)
-```
-
-**주제**: {topic}
-**날짜**: {datetime.now().strftime('%Y-%m-%d')}
-**결과물 언어**: 한국어
-"""
+    def _run_rounds(self, prompt_for, config, label, call_class, attempt):
+        """
+        캐시 → 라우터가 고른 모델 순서로 attempt(model, prompt)를 호출합니다.
+        실패한 모델은 쿨다운되고 다음 모델로 넘어가며, 모두 쿨다운 중이면 기다렸다가 max_rounds까지 다시 시도합니다.
+        """
+        cached = self._cache_lookup(prompt_for, config)
+        if cached is not None:
+            return cached
+
+        for _ in range(self.max_rounds):
+            candidates, wait = self._next_candidates(label, call_class)
+            if candidates is None:
+                if wait is None:
+                    return None
+                time.sleep(wait)
+                continue
+
+            for model in candidates:
+                text, kind = attempt(model, self._prompt_text(prompt_for, model))
+                if text is not None:
+                    return text
+                if kind == FATAL:
+                    return None
+        return None
 
-        for model in self.models:
+    async def _run_rounds_async(self, prompt_for, config, label, call_class, attempt):
+        """
+        _run_rounds의 비동기 버전. (attempt는 코루틴 함수)
+        """
+        cached = self._cache_lookup(prompt_for, config)
+        if cached is not None:
+            return cached
+
+        for _ in range(self.max_rounds):
+            candidates, wait = self._next_candidates(label, call_class)
+            if candidates is None:
+                if wait is None:
+                    return None
+                await asyncio.sleep(wait)
+                continue
+
+            for model in candidates:
+                text, kind = await attempt(model, self._prompt_text(prompt_for, model))
+                if text is not None:
+                    return text
+                if kind == FATAL:
+                    return None
+        return None
+
+    def _generate(self, prompt_for, config, label, contents_for=None, call_class='report', validate=None):
+        """
+        캐시 → 라우터가 고른 모델 순서로 호출합니다. 실패한 모델은 쿨다운되고 다음 모델로 넘어갑니다.
+        validate(text)가 False인 응답은 그대로 반환하되 캐시에 저장하지 않습니다. (같은 날 재실행에서 다시 생성)
+        """
+        attempt = functools.partial(self._attempt, config=config, label=label, contents_for=contents_for,
+                                    call_class=call_class, validate=validate)
+        return self._run_rounds(prompt_for, config, label, call_class, attempt)
+
+    async def _generate_async(self, prompt_for, config, label, contents_for=None, call_class='report',
+                              validate=None):
+        """
+        _generate의 비동기 버전.
+        """
+        attempt = functools.partial(self._attempt_async, config=config, label=label, contents_for=contents_for,
+                                    call_class=call_class, validate=validate)
+        return await self._run_rounds_async(prompt_for, config, label, call_class, attempt)
+
+    def _generate_stream(self, prompt_for, config, label, contents_for=None, call_class='report'):
+        """
+        generate_content_stream으로 받으면서 HtmlStreamValidator로 검사합니다.
+        규칙 위반이 확인되면 남은 출력을 기다리지 않고 다음 모델로 넘어갑니다.
+        """
+        attempt = functools.partial(self._stream_attempt, config=config, label=label, contents_for=contents_for,
+                                    call_class=call_class)
+        return self._run_rounds(prompt_for, config, label, call_class, attempt)
+
+    async def _generate_stream_async(self, prompt_for, config, label, contents_for=None, call_class='report'):
+        """
+        _generate_stream의 비동기 버전.
+        """
+        attempt = functools.partial(self._stream_attempt_async, config=config, label=label,
+                                    contents_for=contents_for, call_class=call_class)
+        return await self._run_rounds_async(prompt_for, config, label, call_class, attempt)
+
+    def _stream_attempt(self, model, prompt, config, label, contents_for=None, call_class='report'):
+        """
+        모델 하나에 스트리밍 요청을 보내고 (검증된 텍스트 또는 None, 실패 분류)를 반환합니다.
+        """
+        reserved = self._quota_reserve(model, prompt, label)
+        if reserved is None:
+            return None, 'quota'
+        quota_wait, estimate = reserved
+        if quota_wait:
+            time.sleep(quota_wait)
+        self.router.begin(model)
+        with metrics.span('model_attempt', model=model, stage=label) as sp:
+            state = _StreamState(self.router, model, sp)
+            stream = None
             try:
-                print(f"--- 콘텐츠 생성 시도 중: {model} ---")
-                response = self.client.models.generate_content(
+                print(f"--- {label} 스트리밍 시도 중: {model} ---")
+                contents, model_config = self._prepare_request(model, prompt, config, contents_for)
+                stream = self.client.models.generate_content_stream(
                     model=model,
-                    contents=full_prompt,
-                    config=types.GenerateContentConfig(
-                        temperature=0.7,
-                        safety_settings=[
-                            types.SafetySetting(
-                                category='HARM_CATEGORY_HATE_SPEECH',
-                                threshold='BLOCK_NONE'
-                            ),
-                            types.SafetySetting(
-                                category='HARM_CATEGORY_HARASSMENT',
-                                threshold='BLOCK_NONE'
-                            ),
-                            types.SafetySetting(
-                                category='HARM_CATEGORY_SEXUALLY_EXPLICIT',
-                                threshold='BLOCK_NONE'
-                            ),
-                            types.SafetySetting(
-                                category='HARM_CATEGORY_DANGEROUS_CONTENT',
-                                threshold='BLOCK_NONE'
-                            ),
-                        ]
-                    )
+                    contents=contents,
+                    config=model_config
                 )
-                
-                if not response.text:
-                    if response.candidates:
-                        print(f"--- [DEBUG] Finish Reason: {response.candidates[0].finish_reason} ---")
-                    raise ValueError("Response text is empty")
-                    
-                return response.text
+                for chunk in stream:
+                    state.feed(chunk)
+                self._quota_record(model, state.usage, estimate)
+                text = state.finish()
+                return self._attempt_succeeded(model, prompt, config, text, state.started, call_class), None
+            except StreamViolation as v:
+                self._stream_violated(model, v, state, sp)
+                return None, 'violation'
             except Exception as e:
-                err_msg = str(e)
-                if "404" in err_msg or "429" in err_msg or "NotFound" in err_msg or "TooManyRequests" in err_msg:
-                    print(f"--- {model} 실패 (에러: {err_msg}). 다음 모델 시도 ---")
-                    continue
-                else:
-                    print(f"--- {model} 예상치 못한 오류 발생: {e} ---")
-                    break
-        
-        print("--- 모든 모델 호출 실패 ---")
+                return None, self._attempt_failed(model, e, sp)
+            finally:
+                if stream is not None and hasattr(stream, 'close'):
+                    stream.close()
+
+    async def _stream_attempt_async(self, model, prompt, config, label, contents_for=None, first_token=None,
+                                    call_class='report'):
+        """
+        _stream_attempt의 비동기 버전.
+        first_token(asyncio.Event)이 주어지면 첫 토큰을 받았을 때 알립니다.
+        헤지 경주에서 취소되면 모델 상태는 바꾸지 않고 CancelledError를 그대로 전달합니다.
+        """
+        reserved = await self._quota_reserve_async(model, prompt, label)
+        if reserved is None:
+            return None, 'quota'
+        quota_wait, estimate = reserved
+        if quota_wait:
+            await asyncio.sleep(quota_wait)
+        self.router.begin(model)
+        with metrics.span('model_attempt', model=model, stage=label) as sp:
+            state = _StreamState(self.router, model, sp, first_token)
+            stream = None
+            try:
+                print(f"--- {label} 스트리밍 시도 중 (async): {model} ---")
+                contents, model_config = await asyncio.to_thread(
+                    self._prepare_request, model, prompt, config, contents_for
+                )
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=contents,
+                    config=model_config
+                )
+                async for chunk in stream:
+                    state.feed(chunk)
+                await self._quota_record_async(model, state.usage, estimate)
+                text = state.finish()
+                return self._attempt_succeeded(model, prompt, config, text, state.started, call_class), None
+            except StreamViolation as v:
+                self._stream_violated(model, v, state, sp)
+                return None, 'violation'
+            except asyncio.CancelledError:
+                self.router.release(model)
+                if state.ttft is None:
+                    # 첫 토큰 전에 취소된 요청은 적어도 이만큼 걸렸다는 하한값으로 기록 (백분위수가 낮아지지 않도록)
+                    self.router.record_ttft(model, time.perf_counter() - state.started)
+                sp.set(outcome='cancelled', received_chars=len(state.validator.text))
+                raise
+            except Exception as e:
+                return None, self._attempt_failed(model, e, sp)
+            finally:
+                if stream is not None and hasattr(stream, 'aclose'):
+                    await stream.aclose()
+
+    async def _generate_hedged_async(self, prompt_for, config, label, contents_for=None, call_class='report'):
+        """
+        헤지 요청 모드. 첫 모델이 임계값(TTFT 백분위수) 안에 첫 토큰을 내지 못하면 다음 모델로 병렬 요청을 보내고,
+        먼저 검증을 통과한 응답을 사용한 뒤 나머지 요청은 취소합니다.
+        """
+        cached = self._cache_lookup(prompt_for, config)
+        if cached is not None:
+            return cached
+
+        for _ in range(self.max_rounds):
+            candidates, wait = self._next_candidates(label, call_class)
+            if candidates is None:
+                if wait is None:
+                    return None
+                await asyncio.sleep(wait)
+                continue
+
+            text, fatal = await self._race(list(candidates), prompt_for, config, label, contents_for, call_class)
+            if text is not None:
+                return text
+            if fatal:
+                return None
         return None
 
+    async def _race(self, queue, prompt_for, config, label, contents_for, call_class='report'):
+        """
+        queue 순서대로 모델을 시도하되, 1순위 요청이 늦으면 다음 모델을 함께 실행합니다.
+        반환: (텍스트 또는 None, FATAL 여부)
+        """
+        loop = asyncio.get_running_loop()
+        running = {}       # task -> (model, first_token)
+        hedge_tasks = set()
+        budget_blocked = False
+
+        def start(model):
+            first_token = asyncio.Event()
+            prompt = self._prompt_text(prompt_for, model)
+            task = asyncio.ensure_future(
+                self._stream_attempt_async(model, prompt, config, label, contents_for, first_token, call_class)
+            )
+            running[task] = (model, first_token)
+            return task
+
+        primary = queue.pop(0)
+        primary_task = start(primary)
+        delay = self.hedging.delay_for(self.router, primary)
+        deadline = loop.time() + delay
+        try:
+            while running:
+                timeout = None
+                waiting_first_token = primary_task in running and not running[primary_task][1].is_set()
+                if queue and not hedge_tasks and not budget_blocked and waiting_first_token:
+                    timeout = max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if not running[primary_task][1].is_set():
+                        if self.hedging.try_acquire():
+                            model = queue.pop(0)
+                            print(f"--- {primary} {delay:.1f}초 동안 첫 토큰 없음. {model}로 헤지 요청 ---")
+                            hedge_tasks.add(start(model))
+                        else:
+                            budget_blocked = True
+                            print(f"--- {primary} 첫 토큰 지연, 헤지 한도({self.hedging.max_hedges}회) 소진 ---")
+                    continue
+
+                for task in done:
+                    model, _ = running.pop(task)
+                    text, kind = task.result()
+                    if text is not None:
+                        if hedge_tasks:
+                            outcome = HEDGE_WON if task in hedge_tasks else PRIMARY_WON
+                        else:
+                            outcome = BUDGET_EXHAUSTED if budget_blocked else NOT_HEDGED
+                        self.hedging.record(outcome)
+                        if outcome == HEDGE_WON:
+                            print(f"--- 헤지 요청 {model}이(가) 먼저 완료 ---")
+                        return text, False
+                    if kind == FATAL:
+                        self.hedging.record(ALL_FAILED)
+                        return None, True
+
+                if not running and queue:
+                    # 진행 중인 요청이 모두 실패하면 다음 모델을 새 1순위로 시작
+                    primary = queue.pop(0)
+                    primary_task = start(primary)
+                    delay = self.hedging.delay_for(self.router, primary)
+                    deadline = loop.time() + delay
+                    hedge_tasks.clear()
+            self.hedging.record(ALL_FAILED)
+            return None, False
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
     def extract_tags(self, html_content):
         """
         숨겨진 div 및 본문 내 해시태그에서 태그를 추출합니다.
         """
-        tags = []
-        # 1. 숨겨진 Div
-        match = re.search(r'<div id="tags"[^>]*>(.*?)</div>', html_content, re.DOTALL)
-        if match:
-            tags_str = match.group(1)
-            for t in tags_str.split(','):
-                tag = t.strip()
-                if tag and not re.match(r'^[0-9a-fA-F]{3,6}$', tag):
-                    tags.append(tag)
-
-        # 2. 해시태그
-        hashtags = re.findall(r'(?:^|\s)#(\w+)', html_content)
-        for ht in hashtags:
-            if not re.match(r'^[0-9a-fA-F]{3,6}$', ht):
-                tags.append(ht)
-
-        unique_tags = list(dict.fromkeys([t for t in tags if t]))
-        return unique_tags[:20]
+        return postprocess.scan(html_content, None)[1]
 
     def clean_html(self, html_content):
-        cleaned = html_content.strip()
-        cleaned = re.sub(r'^```html\s*', '', cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r'\s*```$', '', cleaned)
-        return cleaned.strip()
+        return postprocess.clean_html(html_content)
+
+    def extract_title(self, html_content, fallback):
+        """
+        <h1> → 마크다운 # 제목 → 첫 번째 굵은 텍스트 순으로 제목을 추출합니다.
+        """
+        return postprocess.scan(html_content, fallback)[0]
+
+    def process(self, raw_content, fallback_title):
+        """
+        정리/태그/제목 추출을 한 번의 스캔으로 처리하고 본문을 업로드용으로 축소합니다. (postprocess.PostResult 반환)
+        구조화 리포트(JSON)이면 HTML을 다시 훑지 않고 리포트 필드에서 제목/태그를 읽어 바로 렌더링합니다.
+        """
+        head = raw_content.lstrip()[:7]
+        if head[:1] == '{' or head == '```json':
+            try:
+                return render_post(parse_report(raw_content), raw_chars=len(raw_content))
+            except ValueError:
+                pass
+        return postprocess.process_post(raw_content, fallback_title, self.minifier)
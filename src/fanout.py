@@ -0,0 +1,111 @@
+import asyncio
+import time
+from src import metrics
+from src.batch_runner import post_item, run_uploader, submit
+
+
+def plan_topics(tenants, shared_topics=()):
+    """
+    주제 → 게시할 블로그 목록을 만듭니다. shared_topics는 모든 블로그에, 블로그별 topics는 그 블로그에만 게시합니다.
+    같은 주제는 블로그가 여러 개여도 한 번만 생성하므로 생성 횟수는 서로 다른 주제 수와 같습니다.
+    """
+    plan = {}
+    for topic in shared_topics:
+        plan.setdefault(topic, list(tenants))
+    for tenant in tenants:
+        for topic in tenant.topics:
+            targets = plan.setdefault(topic, [])
+            if tenant not in targets:
+                targets.append(tenant)
+    return plan
+
+
+async def prepare_fanout(content_engine, topic, tenants, base_language='ko', stream=False):
+    """
+    주제 하나를 한 번 생성하고, 기준 언어가 아닌 블로그용으로는 언어별로 한 번씩 현지화합니다.
+    반환: ({언어: PostResult} 또는 None, 오류)
+    """
+    try:
+        raw_content = await content_engine.generate_content_async(topic, stream=stream)
+        if not raw_content:
+            return None, "콘텐츠 생성 실패"
+        base = content_engine.process(raw_content, topic)
+        variants = {base_language: base}
+
+        languages = sorted({t.language for t in tenants} - {base_language})
+        if languages:
+            # 언어별 현지화는 서로 독립적이므로 동시에 요청
+            with metrics.span('localize', topic=topic, languages=len(languages)):
+                texts = await asyncio.gather(*(content_engine.localize_async(base.body, lang) for lang in languages))
+            for language, text in zip(languages, texts):
+                if text:
+                    variants[language] = content_engine.process(text, base.title)
+        print(f"--- [{topic}] 생성 1회, 현지화 {len(variants) - 1}/{len(languages)}개 → 블로그 {len(tenants)}개에 게시 ---")
+        return variants, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+async def run_fanout(content_engine, pool, plan, concurrency=4, base_language='ko', stream=False):
+    """
+    계획(주제 → 블로그 목록)의 주제를 최대 concurrency개까지 동시에 생성/현지화하고 블로그별 결과를 모두 반환합니다.
+    블로그마다 업로더가 하나씩 있어, 그 블로그에 올릴 준비된 글을 배치 요청(create_posts)으로 묶어 보냅니다.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tenants = {t.name: t for targets in plan.values() for t in targets}
+    queues = {name: asyncio.Queue() for name in tenants}
+    # 블로그별로 따로 준비된 클라이언트 사용
+    uploaders = [asyncio.create_task(run_uploader(pool.get(t), queues[name], is_draft=t.draft))
+                 for name, t in tenants.items()]
+
+    async def worker(topic, targets):
+        started = time.perf_counter()
+        results = [{'topic': topic, 'blog': t.name, 'ok': False, 'url': None, 'error': None, 'elapsed': 0.0}
+                   for t in targets]
+        async with semaphore:
+            variants, error = await prepare_fanout(content_engine, topic, targets, base_language, stream)
+
+        async def publish(tenant, result):
+            post_result = variants.get(tenant.language)
+            if post_result is None:
+                result['error'] = f"현지화 실패 ({tenant.language})"
+                return
+            await submit(queues[tenant.name], post_item(post_result, tenant.labels), result, started)
+
+        if variants is None:
+            for result in results:
+                result['error'] = error
+        else:
+            await asyncio.gather(*(publish(t, r) for t, r in zip(targets, results)))
+            if any(r['ok'] for r in results):
+                content_engine.record_published(topic, variants[base_language].title)
+        if not any(r['ok'] for r in results):
+            content_engine.release_topic(topic)
+        for result in results:
+            if not result['elapsed']:
+                result['elapsed'] = time.perf_counter() - started
+        return results
+
+    try:
+        grouped = await asyncio.gather(*(worker(topic, targets) for topic, targets in plan.items()))
+    finally:
+        for queue in queues.values():
+            await queue.put(None)
+        await asyncio.gather(*uploaders)
+    return [result for results in grouped for result in results]
+
+
+def print_fanout_summary(results, elapsed):
+    """
+    블로그별 성공/실패 요약을 출력합니다.
+    """
+    succeeded = [r for r in results if r['ok']]
+    topics = len({r['topic'] for r in results})
+    print("\n" + "=" * 50)
+    print(f"여러 블로그 게시 결과: 성공 {len(succeeded)} / 전체 {len(results)} (주제 {topics}개, 총 {elapsed:.1f}초)")
+    for r in results:
+        if r['ok']:
+            print(f"  [OK]   {r['blog']} · {r['topic']} ({r['elapsed']:.1f}초) {r['url']}")
+        else:
+            print(f"  [FAIL] {r['blog']} · {r['topic']} ({r['elapsed']:.1f}초) {r['error']}")
+    print("=" * 50 + "\n")
@@ -0,0 +1,115 @@
+import os
+import json
+import threading
+import contextlib
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 다시 읽기/병합만 수행
+    fcntl = None
+
+DEFAULT_HEDGE_STATS_PATH = os.path.join('.cache', 'hedge_stats.json')
+
+# 경주(race) 결과 분류
+PRIMARY_WON = 'primary_won'        # 헤지를 시작했지만 첫 모델이 먼저 끝남
+HEDGE_WON = 'hedge_won'            # 헤지 요청이 먼저 끝남
+NOT_HEDGED = 'not_hedged'          # 임계값 안에 첫 토큰이 와서 헤지하지 않음
+BUDGET_EXHAUSTED = 'budget_exhausted'  # 헤지가 필요했지만 실행당 한도를 다 씀
+ALL_FAILED = 'all_failed'
+
+
+class HedgePolicy:
+    """
+    헤지 요청(hedged request) 정책.
+    첫 모델이 TTFT 백분위수(percentile) 안에 첫 토큰을 내지 못하면 다음 모델로 병렬 요청을 보냅니다.
+    추가 요청 수는 실행당 max_hedges로 제한하고, 날짜별 결과 통계를 JSON 파일에 남깁니다.
+    한도는 프로세스마다 따로 셉니다 (--worker-processes로 워커 N개를 띄우면 최대 N배). 통계는 여러 프로세스가 함께 누적합니다.
+    """
+
+    def __init__(self, percentile=90, default_delay=10.0, min_delay=1.0, max_hedges=10, state_path=None):
+        self.percentile = percentile
+        # TTFT 표본이 부족할 때 사용할 임계값(초)과 임계값 하한
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_hedges = max_hedges
+        self.state_path = state_path
+        self.hedges_used = 0
+        self._lock = threading.Lock()
+        self._stats = self._load()
+
+    def delay_for(self, router, model):
+        """
+        model의 첫 토큰을 기다릴 시간(초)을 반환합니다.
+        """
+        observed = router.ttft_percentile(model, self.percentile)
+        if observed is None:
+            return self.default_delay
+        return max(self.min_delay, observed)
+
+    def try_acquire(self):
+        """
+        헤지 요청 한 건을 예산에서 차감합니다. 한도를 넘으면 False.
+        """
+        with self._lock:
+            if self.hedges_used >= self.max_hedges:
+                return False
+            self.hedges_used += 1
+            with self._update() as day:
+                day['hedges'] = day.get('hedges', 0) + 1
+            return True
+
+    def record(self, outcome):
+        """
+        경주 결과를 오늘 날짜 통계에 더합니다.
+        """
+        with self._lock, self._update() as day:
+            day['races'] = day.get('races', 0) + 1
+            day[outcome] = day.get(outcome, 0) + 1
+
+    def stats(self, date=None):
+        with self._lock:
+            if date:
+                return dict(self._stats.get(date, {}))
+            return json.loads(json.dumps(self._stats))
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"--- [HEDGE] 통계 파일을 읽지 못했습니다 ({e}). 새로 시작합니다. ---")
+            return {}
+
+    def _save(self):
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._stats, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    @contextlib.contextmanager
+    def _update(self):
+        """
+        오늘 날짜 통계를 고치고 저장합니다. (self._lock 안에서 사용)
+        통계 파일을 잠근 채 다시 읽은 뒤 고치므로 다른 워커 프로세스가 그사이 더한 횟수를 덮어쓰지 않습니다.
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        if not self.state_path:
+            yield self._stats.setdefault(today, {})
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.state_path}.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._stats = self._load()
+            yield self._stats.setdefault(today, {})
+            self._save()
@@ -0,0 +1,214 @@
+import re
+
+# 업로드 전 HTML 축소: 공백 정리, 인라인 style 선언 정규화/중복 제거, 빈 속성과 중복 속성 제거.
+# 프롬프트가 인라인 style만 허용하므로(<style> 블록은 피드/모바일 보기에서 빠짐) 선언을 클래스로 옮기지는 않습니다.
+# 본문은 '<' 위치를 따라 한 번만 훑고, 같은 style 문자열은 한 번만 정규화합니다.
+
+# 태그 하나. 속성 부분은 따옴표 안의 '>'를 건너뛰며, 반복 분기들이 첫 글자로 갈리므로 되돌아가며 다시 시도하지 않습니다.
+_TAG_RE = re.compile(r'<(/?)([a-zA-Z][\w:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+_ATTR_RE = re.compile(r'([^\s=/>"\']+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>"\']+))?')
+# HTML 공백 문자 (\s는 &nbsp;에 해당하는 U+00A0까지 포함하므로 쓰지 않음)
+_WS_RE = re.compile(r'[ \t\n\r\f]+')
+_STYLE_SPLIT_RE = re.compile(r'"[^"]*"|\'[^\']*\'|[();]')
+_COMMA_RE = re.compile(r'\s*,\s*')
+_QUOTED_RE = re.compile(r'("[^"]*"|\'[^\']*\')')
+_IMPORTANT_RE = re.compile(r'\s*!\s*important$', re.IGNORECASE)
+
+# 내용을 그대로 두는 요소
+RAW_TAGS = frozenset({'pre', 'textarea', 'script', 'style'})
+_RAW_END_RE = {tag: re.compile(f'</{tag}', re.IGNORECASE) for tag in RAW_TAGS}
+# 앞뒤 공백이 화면에 영향을 주지 않는 블록 요소
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'col', 'colgroup', 'dd', 'details', 'div',
+    'dl', 'dt', 'figcaption', 'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li',
+    'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+})
+# 값이 비어 있으면 지워도 되는 속성 (alt=""처럼 빈 값에 의미가 있는 속성은 남김)
+EMPTY_DROPPABLE = frozenset({'style', 'class', 'id'})
+# Blogger가 쓰는 주석: <!--more--> (점프 나누기), 조건부 주석
+_KEEP_COMMENTS = ('<!--more', '<!--[if', '<!--<![endif]')
+
+
+def _split_declarations(style):
+    # 괄호(url(), rgba())와 따옴표 안의 ';'는 구분자가 아님
+    parts, start, depth = [], 0, 0
+    for m in _STYLE_SPLIT_RE.finditer(style):
+        token = m.group()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth = max(depth - 1, 0)
+        elif token == ';' and depth == 0:
+            parts.append(style[start:m.start()])
+            start = m.end()
+    parts.append(style[start:])
+    return parts
+
+
+def _normalize_unquoted(value):
+    value = _WS_RE.sub(' ', value)
+    return _COMMA_RE.sub(',', value).replace('( ', '(').replace(' )', ')')
+
+
+def _normalize_value(value):
+    if '"' not in value and "'" not in value:
+        return _normalize_unquoted(value)
+    # 따옴표 안(글꼴 이름 등)은 건드리지 않음 (split 결과의 홀수 번째가 따옴표 문자열)
+    parts = _QUOTED_RE.split(value)
+    return ''.join(part if i % 2 else _normalize_unquoted(part) for i, part in enumerate(parts))
+
+
+def normalize_style(style):
+    """
+    인라인 style 값을 정규화합니다. 속성 이름은 소문자로, 공백과 끝의 ';'는 줄이고,
+    같은 속성이 여러 번 나오면 실제로 적용되는 선언(!important 우선, 그다음 마지막 선언)만 그 자리에 남깁니다.
+    """
+    declarations = []
+    for part in _split_declarations(style):
+        name, sep, value = part.partition(':')
+        name = name.strip().lower()
+        value = value.strip()
+        if not sep or not name or not value:
+            # 브라우저가 무시하는 선언
+            continue
+        important = _IMPORTANT_RE.search(value) is not None
+        if important:
+            value = _IMPORTANT_RE.sub('', value) + '!important'
+        declarations.append((name, _normalize_value(value), important))
+
+    winners = {}
+    for i, (name, _, important) in enumerate(declarations):
+        current = winners.get(name)
+        if current is None or important or not declarations[current][2]:
+            winners[name] = i
+    return ';'.join(f"{name}:{value}" for i, (name, value, _) in enumerate(declarations) if winners[name] == i)
+
+
+class HtmlMinifier:
+    """
+    Blogger 업로드 전 HTML 축소기. minify()는 (축소한 HTML, 통계)를 반환합니다.
+    같은 인스턴스로 여러 글을 처리하면 정규화한 style 문자열을 재사용합니다. (max_styles개가 넘으면 비움)
+    """
+
+    def __init__(self, max_styles=4096):
+        self.max_styles = max_styles
+        self._styles = {}
+
+    def _style(self, value):
+        normalized = self._styles.get(value)
+        if normalized is None:
+            if len(self._styles) >= self.max_styles:
+                self._styles = {}
+            normalized = self._styles[value] = normalize_style(value)
+        return normalized
+
+    def _attributes(self, raw, stats):
+        seen = set()
+        out = []
+        for m in _ATTR_RE.finditer(raw):
+            name, value = m.group(1), m.group(2)
+            key = name.lower()
+            if key in seen:
+                # 브라우저는 첫 번째 속성만 사용
+                stats['attrs_removed'] += 1
+                continue
+            seen.add(key)
+            if value is None:
+                out.append(name)
+                continue
+            quote = value[0] if value[0] in '"\'' else ''
+            if quote:
+                value = value[1:-1]
+            if key == 'style':
+                value = self._style(value)
+            elif key == 'class':
+                value = _WS_RE.sub(' ', value).strip()
+            if not value and key in EMPTY_DROPPABLE:
+                stats['attrs_removed'] += 1
+                continue
+            quote = "'" if '"' in value else '"'
+            out.append(f'{name}={quote}{value}{quote}')
+        return out
+
+    def _tag(self, m, stats):
+        closing, name, raw = m.group(1), m.group(2), m.group(3)
+        if closing:
+            return f'</{name}>'
+        raw = raw.rstrip()
+        self_closing = raw.endswith('/')
+        if self_closing:
+            raw = raw[:-1]
+        attrs = self._attributes(raw, stats) if raw.strip() else []
+        return '<' + ' '.join([name] + attrs) + ('/>' if self_closing else '>')
+
+    def minify(self, html):
+        stats = {'bytes_before': len(html.encode('utf-8')), 'attrs_removed': 0, 'comments_removed': 0}
+        out = []
+        text = []          # 아직 내보내지 않은 텍스트 조각 (다음 태그가 블록이면 끝 공백 제거)
+        after_block = True  # 직전 태그가 블록 요소이거나 문서 시작
+        pos, n = 0, len(html)
+
+        def flush(next_is_block):
+            if not text:
+                return
+            chunk = _WS_RE.sub(' ', ''.join(text))
+            text.clear()
+            if after_block:
+                chunk = chunk.lstrip(' ')
+            if next_is_block:
+                chunk = chunk.rstrip(' ')
+            if chunk:
+                out.append(chunk)
+
+        while pos < n:
+            lt = html.find('<', pos)
+            if lt == -1:
+                text.append(html[pos:])
+                break
+            if lt > pos:
+                text.append(html[pos:lt])
+
+            if html.startswith('<!--', lt):
+                end = html.find('-->', lt + 4)
+                end = n if end == -1 else end + 3
+                comment = html[lt:end]
+                if comment.startswith(_KEEP_COMMENTS):
+                    flush(False)
+                    out.append(comment)
+                    after_block = False
+                else:
+                    stats['comments_removed'] += 1
+                pos = end
+                continue
+
+            m = _TAG_RE.match(html, lt)
+            if m is None:
+                # 태그가 아닌 '<' (본문의 부등호 등)
+                text.append('<')
+                pos = lt + 1
+                continue
+
+            name = m.group(2).lower()
+            is_block = name in BLOCK_TAGS
+            flush(is_block)
+            out.append(self._tag(m, stats))
+            after_block = is_block
+            pos = m.end()
+
+            if name in RAW_TAGS and not m.group(1):
+                # 닫는 태그까지 원문 그대로
+                end_match = _RAW_END_RE[name].search(html, pos)
+                end = end_match.start() if end_match else n
+                out.append(html[pos:end])
+                pos = end
+                after_block = False
+        flush(True)
+
+        minified = ''.join(out)
+        stats['bytes_after'] = len(minified.encode('utf-8'))
+        stats['saved_pct'] = round(100 * (1 - stats['bytes_after'] / stats['bytes_before']), 1) if stats['bytes_before'] else 0.0
+        return minified, stats
+
+
+def minify_html(html):
+    return HtmlMinifier().minify(html)
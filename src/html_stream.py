@@ -0,0 +1,121 @@
+import re
+
+# 프롬프트 규칙상 절대 나오면 안 되는 태그
+FORBIDDEN_TAGS = {'script', 'iframe', 'style'}
+# 닫는 태그가 없는 요소
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+# 끝까지 닫히지 않으면 응답이 잘린 것으로 보는 블록 요소
+BLOCK_TAGS = {'div', 'table', 'section', 'article', 'ul', 'ol'}
+
+_FENCE_RE = re.compile(r'```html\s*', re.IGNORECASE)
+_TAG_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^<>]*?(/?)>')
+
+
+class StreamViolation(Exception):
+    """
+    스트리밍 중 프롬프트 규칙 위반이 확인되었을 때 발생합니다.
+    """
+
+    def __init__(self, reason, detail=''):
+        self.reason = reason
+        self.detail = detail
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+
+
+class HtmlStreamValidator:
+    """
+    스트리밍 청크를 받아 ```html 펜스를 제거하고, 태그 균형과 금지 태그를 점진적으로 검사합니다.
+    """
+
+    def __init__(self, max_mismatches=20, refusal_window=400):
+        self.max_mismatches = max_mismatches
+        self.refusal_window = refusal_window
+        self.parts = []
+        self.stack = []
+        self.mismatches = 0
+        self.tag_count = 0
+        self._head = ''          # 펜스 판단 전까지 보류한 앞부분
+        self._head_done = False
+        self._pending = ''       # 아직 '>'를 받지 못한 태그 조각
+        self._content_chars = 0
+
+    @property
+    def text(self):
+        return ''.join(self.parts)
+
+    def feed(self, chunk):
+        """
+        청크를 추가하고 규칙 위반이 보이면 StreamViolation을 발생시킵니다.
+        """
+        if not self._head_done:
+            self._head += chunk
+            stripped = self._head.lstrip()
+            # 펜스 여부를 판단할 만큼 받을 때까지 보류
+            if len(stripped) < 8 and '<' not in stripped:
+                return
+            self._head_done = True
+            match = _FENCE_RE.match(stripped)
+            chunk = stripped[match.end():] if match else stripped
+            self._head = ''
+
+        self.parts.append(chunk)
+        self._content_chars += len(chunk)
+        self._scan(self._pending + chunk)
+
+    def _scan(self, text):
+        last = 0
+        for match in _TAG_RE.finditer(text):
+            last = match.end()
+            self._handle_tag(match.group(1) == '/', match.group(2).lower(), match.group(3) == '/')
+
+        # 마지막 '<' 이후가 아직 닫히지 않았다면 다음 청크와 이어서 검사
+        tail = text[last:]
+        lt = tail.rfind('<')
+        self._pending = tail[lt:] if lt != -1 and '>' not in tail[lt:] else ''
+        if len(self._pending) > 4096:
+            self._pending = ''
+
+        if self.tag_count == 0 and self._content_chars >= self.refusal_window:
+            raise StreamViolation('no_html', f"{self.refusal_window}자 동안 HTML 태그가 없습니다 (거절 또는 형식 오류)")
+
+    def _handle_tag(self, closing, name, self_closing):
+        self.tag_count += 1
+        if name in FORBIDDEN_TAGS:
+            raise StreamViolation('forbidden_tag', f"<{name}> 태그 사용")
+        if name in VOID_TAGS or self_closing:
+            return
+        if not closing:
+            self.stack.append(name)
+            return
+        if name in self.stack:
+            # 생략 가능한 닫는 태그(p, li 등)는 함께 정리
+            while self.stack:
+                if self.stack.pop() == name:
+                    break
+        else:
+            self.mismatches += 1
+            if self.mismatches > self.max_mismatches:
+                raise StreamViolation('unbalanced', f"짝이 맞지 않는 닫는 태그 {self.mismatches}개")
+
+    def finish(self, finish_reason=None):
+        """
+        스트림 종료 시 호출합니다. 잘린 응답이면 StreamViolation을 발생시키고, 아니면 전체 텍스트를 반환합니다.
+        """
+        if not self._head_done and self._head:
+            head, self._head = self._head, ''
+            self._head_done = True
+            stripped = head.lstrip()
+            match = _FENCE_RE.match(stripped)
+            self.parts.append(stripped[match.end():] if match else stripped)
+
+        reason = str(finish_reason or '')
+        if 'MAX_TOKENS' in reason:
+            raise StreamViolation('truncated', "최대 토큰 수에 도달")
+        if reason and 'STOP' not in reason and 'FINISH_REASON_UNSPECIFIED' not in reason:
+            raise StreamViolation('blocked', reason)
+        if self.tag_count == 0:
+            raise StreamViolation('no_html', "HTML 태그가 없습니다")
+        unclosed = [name for name in self.stack if name in BLOCK_TAGS]
+        if unclosed:
+            raise StreamViolation('truncated', f"닫히지 않은 태그: {', '.join(unclosed[-5:])}")
+        return self.text
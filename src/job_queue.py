@@ -0,0 +1,256 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+
+DEFAULT_QUEUE_PATH = os.path.join('.cache', 'jobs.sqlite')
+
+# 게시 파이프라인 단계. 각 단계가 끝날 때마다 결과를 저장하므로 실패 시 그 단계부터 다시 시작합니다.
+STAGE_TOPIC = 'topic'
+STAGE_GENERATE = 'generate'
+STAGE_POSTPROCESS = 'postprocess'
+STAGE_UPLOAD = 'upload'
+STAGES = [STAGE_TOPIC, STAGE_GENERATE, STAGE_POSTPROCESS, STAGE_UPLOAD]
+
+READY = 'ready'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_COLUMNS = ('id', 'stage', 'status', 'payload', 'is_draft', 'attempts', 'max_attempts',
+            'lease_owner', 'lease_until', 'next_run_at', 'error', 'created_at', 'updated_at')
+
+
+def next_stage(stage):
+    index = STAGES.index(stage)
+    return STAGES[index + 1] if index + 1 < len(STAGES) else None
+
+
+class JobQueue:
+    """
+    SQLite 기반 영속 작업 큐. 작업 하나가 게시글 하나이며 topic → generate → postprocess → upload 순으로 진행됩니다.
+
+    - 작업은 임대(lease)해서 처리합니다. 임대 시간이 지나도록 완료되지 않으면(프로세스 종료 등) 다른 워커가 가져갑니다.
+    - 단계가 끝날 때마다 결과(payload)와 다음 단계를 저장하므로, 업로드 실패는 업로드만 다시 시도합니다.
+    - 실패한 단계는 지수 백오프 후 재시도하고, max_attempts를 넘으면 failed로 남깁니다.
+    여러 스레드(연결 공유)와 여러 프로세스(각자 연결)에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, max_attempts=5, base_backoff=30.0, max_backoff=3600.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 임대는 BEGIN IMMEDIATE 트랜잭션으로 직접 묶으므로 autocommit 모드로 엽니다
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                is_draft INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                lease_owner TEXT,
+                lease_until REAL,
+                next_run_at REAL NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, next_run_at)")
+
+    def _row(self, row):
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        job['payload'] = json.loads(job['payload'])
+        job['is_draft'] = bool(job['is_draft'])
+        return job
+
+    def enqueue(self, topic=None, is_draft=False):
+        """
+        게시 작업을 추가하고 id를 반환합니다. topic이 없으면 주제 추천 단계부터 시작합니다.
+        """
+        now = time.time()
+        stage = STAGE_GENERATE if topic else STAGE_TOPIC
+        payload = {'topic': topic} if topic else {}
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (stage, status, payload, is_draft, max_attempts, next_run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (stage, READY, json.dumps(payload, ensure_ascii=False), int(is_draft), self.max_attempts,
+                 now, now, now)
+            )
+            return cursor.lastrowid
+
+    def lease(self, owner, lease_seconds=900.0):
+        """
+        실행 가능한 작업 하나를 owner 이름으로 임대합니다. 없으면 None.
+        대기 중(ready)이면서 재시도 시각이 지난 작업과, 임대가 만료된 작업이 대상입니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE (status = ? AND next_run_at <= ?) OR (status = ? AND lease_until < ?) "
+                    "ORDER BY next_run_at, id LIMIT 1",
+                    (READY, now, LEASED, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (LEASED, owner, now + lease_seconds, now, row[0])
+                )
+                job = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (row[0],)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._row(job)
+
+    def advance(self, job_id, owner, payload, lease_seconds=900.0):
+        """
+        현재 단계를 완료로 기록하고 결과를 저장합니다. 다음 단계가 있으면 임대를 연장한 채 그 단계 이름을,
+        마지막 단계였으면 작업을 done으로 표시하고 DONE을 반환합니다. 임대를 잃은 경우(다른 워커가 가져감) False.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, lease_owner FROM jobs WHERE id = ? AND status = ?", (job_id, LEASED)
+            ).fetchone()
+            if row is None or row[1] != owner:
+                return False
+            stage = next_stage(row[0])
+            # 다른 프로세스가 그 사이 만료된 임대를 가져갔을 수 있으므로 조건부로 갱신
+            cursor = self._conn.execute(
+                "UPDATE jobs SET stage = ?, status = ?, payload = ?, attempts = 0, error = NULL, "
+                "lease_until = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (stage or row[0], LEASED if stage else DONE, json.dumps(payload, ensure_ascii=False),
+                 now + lease_seconds if stage else None, now, job_id, LEASED, owner)
+            )
+            if cursor.rowcount == 0:
+                return False
+            return stage or DONE
+
+    def renew(self, job_id, owner, lease_seconds=900.0):
+        """
+        진행 중인 단계의 임대를 지금부터 lease_seconds만큼 연장합니다. 임대를 잃은 경우(다른 워커가 가져감) False.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + lease_seconds, now, job_id, LEASED, owner)
+            )
+            return cursor.rowcount > 0
+
+    def fail(self, job_id, owner, error):
+        """
+        현재 단계의 실패를 기록합니다. 시도 횟수가 남아 있으면 백오프 후 같은 단계를 다시 실행합니다.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts, lease_owner FROM jobs WHERE id = ? AND status = ?", (job_id, LEASED)
+            ).fetchone()
+            if row is None or row[2] != owner:
+                return None
+            attempts = row[0] + 1
+            if attempts >= row[1]:
+                status, next_run_at = FAILED, now
+            else:
+                delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+                status, next_run_at = READY, now + delay * random.uniform(0.8, 1.2)
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, error = ?, next_run_at = ?, lease_owner = NULL, "
+                "lease_until = NULL, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (status, attempts, str(error)[:2000], next_run_at, now, job_id, LEASED, owner)
+            )
+            return status if cursor.rowcount else None
+
+    def release(self, job_id, owner):
+        """
+        시도 횟수를 늘리지 않고 임대를 반납합니다. (워커 종료 시)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_until = NULL, next_run_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (READY, now, now, job_id, LEASED, owner)
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def pending(self):
+        """
+        아직 끝나지 않은(ready 또는 leased) 작업 수를 반환합니다.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (READY, LEASED)
+            ).fetchone()[0]
+
+    def next_run_in(self):
+        """
+        가장 빨리 실행 가능해지는 작업까지 남은 초를 반환합니다. (대기 작업이 없으면 None)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(CASE WHEN status = ? THEN next_run_at ELSE lease_until END) FROM jobs "
+                "WHERE status IN (?, ?)", (READY, READY, LEASED)
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - now)
+
+    def counts(self):
+        """
+        {(stage, status): 개수} 형태의 현황을 반환합니다.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, status, COUNT(*) FROM jobs GROUP BY stage, status").fetchall()
+        return {(stage, status): count for stage, status, count in rows}
+
+    def failed(self):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status = ? ORDER BY id", (FAILED,)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def retry_failed(self):
+        """
+        failed 작업을 실패한 단계부터 다시 대기열에 넣고 개수를 반환합니다.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, next_run_at = ?, updated_at = ? WHERE status = ?",
+                (READY, now, now, FAILED)
+            )
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
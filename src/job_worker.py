@@ -0,0 +1,225 @@
+import os
+import socket
+import threading
+import contextlib
+import multiprocessing
+from src.job_queue import (
+    JobQueue, STAGE_TOPIC, STAGE_GENERATE, STAGE_POSTPROCESS, STAGE_UPLOAD, DONE, FAILED
+)
+from src import metrics
+
+
+class StageError(Exception):
+    """
+    단계가 결과를 만들지 못한 경우 (재시도 대상)
+    """
+
+
+def run_stage(stage, payload, is_draft, content_engine, blogger, stream=False):
+    """
+    단계 하나를 실행하고 갱신된 payload를 반환합니다.
+    """
+    payload = dict(payload)
+    if stage == STAGE_TOPIC:
+        payload['topic'] = content_engine.recommend_topic()
+    elif stage == STAGE_GENERATE:
+        raw_content = content_engine.generate_content(payload['topic'], stream=stream)
+        if not raw_content:
+            raise StageError("콘텐츠 생성 실패")
+        payload['raw'] = raw_content
+    elif stage == STAGE_POSTPROCESS:
+        post_result = content_engine.process(payload['raw'], payload['topic'])
+        payload.update(title=post_result.title, tags=post_result.tags, body=post_result.body)
+    elif stage == STAGE_UPLOAD:
+        # 게시 원장이 같은 글의 중복 게시를 막으므로 재시도해도 안전
+        post = blogger.create_post(
+            title=payload['title'], content=payload['body'], labels=payload['tags'], is_draft=is_draft
+        )
+        if not post:
+            raise StageError("업로드 실패")
+        payload.update(post_id=post.get('id'), url=post.get('url'))
+        content_engine.record_published(payload['topic'], payload['title'])
+    else:
+        raise ValueError(f"알 수 없는 단계: {stage}")
+    return payload
+
+
+class Worker:
+    """
+    큐에서 작업을 임대해 남은 단계를 차례로 실행합니다. 단계가 끝날 때마다 결과를 큐에 저장합니다.
+    drain=True이면 남은 작업이 없을 때 종료합니다.
+    """
+
+    def __init__(self, queue, content_engine, blogger, name, stream=False, lease_seconds=900.0,
+                 poll_interval=5.0, drain=True, stop_event=None):
+        self.queue = queue
+        self.content_engine = content_engine
+        self.blogger = blogger
+        self.name = name
+        self.stream = stream
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.drain = drain
+        self.stop_event = stop_event or threading.Event()
+        self.completed = 0
+        self.failed = 0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            job = self.queue.lease(self.name, self.lease_seconds)
+            if job is None:
+                if self.drain and self.queue.pending() == 0:
+                    break
+                wait = self.queue.next_run_in()
+                self.stop_event.wait(self.poll_interval if wait is None else min(max(wait, 0.1), self.poll_interval))
+                continue
+            status = self.process(job)
+            if status == DONE:
+                self.completed += 1
+            elif status == FAILED:
+                self.failed += 1
+
+    def process(self, job):
+        """
+        임대한 작업을 끝까지(또는 실패할 때까지) 진행하고 최종 상태를 반환합니다.
+        """
+        job_id, stage, payload = job['id'], job['stage'], job['payload']
+        while stage != DONE:
+            if self.stop_event.is_set():
+                # 완료된 단계까지는 저장되어 있으므로 임대만 반납
+                self.queue.release(job_id, self.name)
+                return None
+            label = payload.get('topic') or '주제 추천'
+            print(f"--- [WORKER {self.name}] #{job_id} {label}: {stage} (시도 {job['attempts'] + 1}) ---")
+            try:
+                with self._heartbeat(job_id), metrics.span('job_stage', stage=stage, job_id=job_id):
+                    payload = run_stage(stage, payload, job['is_draft'], self.content_engine, self.blogger,
+                                        stream=self.stream)
+            except Exception as e:
+                status = self.queue.fail(job_id, self.name, f"{type(e).__name__}: {e}")
+                print(f"--- [WORKER {self.name}] #{job_id} {stage} 실패 ({e}) → {status} ---")
+                if status == FAILED and payload.get('topic'):
+                    # 재시도를 모두 소진한 주제는 예약을 풀어 다음 추천에서 다시 꺼낼 수 있게 함
+                    self.content_engine.release_topic(payload['topic'])
+                return status
+            stage = self.queue.advance(job_id, self.name, payload, self.lease_seconds)
+            if stage is False:
+                print(f"--- [WORKER {self.name}] #{job_id} 임대가 만료되어 다른 워커에 넘어갔습니다 ---")
+                return None
+            # advance가 다음 단계의 시도 횟수를 초기화함
+            job['attempts'] = 0
+        print(f"--- [WORKER {self.name}] #{job_id} 완료: {payload.get('url')} ---")
+        return DONE
+
+    @contextlib.contextmanager
+    def _heartbeat(self, job_id):
+        """
+        단계가 실행되는 동안 임대 시간의 1/3마다 임대를 연장합니다.
+        섹션 분할 생성, 헤지 요청, 할당량 대기로 단계가 임대 시간보다 길어져도 다른 워커가 같은 작업을 가져가지 않습니다.
+        """
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                if not self.queue.renew(job_id, self.name, self.lease_seconds):
+                    print(f"--- [WORKER {self.name}] #{job_id} 임대 연장 실패 (다른 워커가 가져감) ---")
+                    return
+
+        thread = threading.Thread(target=beat, name=f"{self.name}:heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+
+def _worker_name(index):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def _process_main(queue_path, build, index, stream, lease_seconds, drain, completed, failed):
+    # 프로세스마다 자체 SQLite 연결과 클라이언트를 만듭니다
+    content_engine, blogger = build()
+    queue = JobQueue(queue_path)
+    worker = Worker(queue, content_engine, blogger, _worker_name(index), stream=stream,
+                    lease_seconds=lease_seconds, drain=drain)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close()
+        with completed.get_lock():
+            completed.value += worker.completed
+        with failed.get_lock():
+            failed.value += worker.failed
+
+
+def run_workers(queue_path, build, workers=4, processes=False, stream=False, lease_seconds=900.0, drain=True):
+    """
+    워커 workers개로 큐를 처리합니다.
+    build()는 (content_engine, blogger)를 반환하는 함수입니다.
+    processes=False이면 한 프로세스의 스레드들이 클라이언트를 공유하고(생성 대기는 대부분 I/O),
+    True이면 워커마다 별도 프로세스를 띄웁니다 (build는 pickle 가능해야 함).
+    이번 실행에서 (완료, 실패) 처리한 작업 수를 반환합니다.
+    """
+    workers = max(1, workers)
+    if processes:
+        completed, failed = multiprocessing.Value('i', 0), multiprocessing.Value('i', 0)
+        procs = [
+            multiprocessing.Process(target=_process_main,
+                                    args=(queue_path, build, i, stream, lease_seconds, drain, completed, failed))
+            for i in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        try:
+            for p in procs:
+                p.join()
+        except KeyboardInterrupt:
+            for p in procs:
+                p.join()
+        print(f"--- [WORKER] 완료 {completed.value}건, 실패 {failed.value}건 ---")
+        return completed.value, failed.value
+
+    content_engine, blogger = build()
+    queue = JobQueue(queue_path)
+    stop_event = threading.Event()
+    pool = [
+        Worker(queue, content_engine, blogger, _worker_name(i), stream=stream,
+               lease_seconds=lease_seconds, drain=drain, stop_event=stop_event)
+        for i in range(workers)
+    ]
+    threads = [threading.Thread(target=w.run, name=w.name) for w in pool]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(0.5)
+    except KeyboardInterrupt:
+        # 진행 중인 단계는 끝까지 실행하고 멈춥니다. 남은 단계는 다음 실행에서 이어서 처리됩니다.
+        print("--- [WORKER] 중단 요청: 진행 중인 단계가 끝나면 종료합니다 ---")
+        stop_event.set()
+        for t in threads:
+            t.join()
+    finally:
+        queue.close()
+    completed, failed = sum(w.completed for w in pool), sum(w.failed for w in pool)
+    print(f"--- [WORKER] 완료 {completed}건, 실패 {failed}건 ---")
+    return completed, failed
+
+
+def print_status(queue):
+    """
+    단계/상태별 작업 수와 실패한 작업의 마지막 오류를 출력합니다.
+    """
+    counts = queue.counts()
+    if not counts:
+        print("큐가 비어 있습니다.")
+        return
+    for (stage, status), count in sorted(counts.items()):
+        print(f"  {stage:<12} {status:<8} {count}")
+    for job in queue.failed():
+        print(f"  [FAILED] #{job['id']} {job['payload'].get('topic') or '-'} ({job['stage']}): {job['error']}")
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timezone
+
+# 활성화된 기록기. None이면 span()은 아무 일도 하지 않는 공용 객체를 반환합니다.
+_recorder = None
+
+
+class _NullSpan:
+    """
+    계측이 꺼져 있을 때 사용하는 빈 span. 모든 메서드가 즉시 반환합니다.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def usage(self, response):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ('recorder', 'name', 'attrs', 'started', 'outcome')
+
+    def __init__(self, recorder, name, attrs):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = attrs
+        self.started = 0.0
+        self.outcome = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.outcome = self.outcome or 'error'
+            self.attrs.setdefault('error', f"{exc_type.__name__}: {exc}"[:500])
+        self.recorder.record(self.name, duration, self.outcome or 'ok', self.attrs)
+        return False
+
+    def set(self, outcome=None, **attrs):
+        if outcome is not None:
+            self.outcome = outcome
+        self.attrs.update(attrs)
+
+    def usage(self, response):
+        """
+        Gemini 응답의 usage_metadata 토큰 수를 기록합니다.
+        """
+        meta = getattr(response, 'usage_metadata', None)
+        if meta is None:
+            return
+        for field in ('prompt_token_count', 'candidates_token_count', 'cached_content_token_count',
+                      'thoughts_token_count', 'total_token_count'):
+            value = getattr(meta, field, None)
+            if value:
+                self.attrs[field] = value
+
+
+class MetricsRecorder:
+    """
+    span을 JSON Lines 파일에 한 줄씩 기록하고, 종료 시 OpenMetrics 텍스트 요약을 선택적으로 씁니다.
+    """
+
+    def __init__(self, path, openmetrics_path=None, run_id=None):
+        self.path = path
+        self.openmetrics_path = openmetrics_path
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._totals = {}   # (name, outcome) -> [count, duration_sum]
+        self._tokens = {}   # (model, kind) -> tokens
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def record(self, name, duration, outcome, attrs):
+        line = {
+            'run_id': self.run_id,
+            'ts': datetime.now(timezone.utc).isoformat(),
+            'span': name,
+            'duration_ms': round(duration * 1000, 3),
+            'outcome': outcome,
+        }
+        line.update(attrs)
+        data = json.dumps(line, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(data + '\n')
+            self._file.flush()
+            total = self._totals.setdefault((name, outcome), [0, 0.0])
+            total[0] += 1
+            total[1] += duration
+            model = attrs.get('model')
+            if model:
+                for kind in ('prompt_token_count', 'candidates_token_count', 'cached_content_token_count'):
+                    if attrs.get(kind):
+                        key = (model, kind.replace('_token_count', ''))
+                        self._tokens[key] = self._tokens.get(key, 0) + attrs[kind]
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            if self.openmetrics_path:
+                self._write_openmetrics()
+
+    def _write_openmetrics(self):
+        lines = [
+            '# TYPE woody_stage_duration_seconds summary',
+            '# HELP woody_stage_duration_seconds Pipeline stage latency.',
+        ]
+        for (name, outcome), (count, total) in sorted(self._totals.items()):
+            labels = f'stage="{name}",outcome="{outcome}",run_id="{self.run_id}"'
+            lines.append(f'woody_stage_duration_seconds_count{{{labels}}} {count}')
+            lines.append(f'woody_stage_duration_seconds_sum{{{labels}}} {total:.6f}')
+        lines.append('# TYPE woody_tokens counter')
+        lines.append('# HELP woody_tokens Gemini tokens by model and kind.')
+        for (model, kind), tokens in sorted(self._tokens.items()):
+            lines.append(f'woody_tokens_total{{model="{model}",kind="{kind}",run_id="{self.run_id}"}} {tokens}')
+        lines.append('# EOF')
+        directory = os.path.dirname(self.openmetrics_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.openmetrics_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def enable(path, openmetrics_path=None, run_id=None):
+    global _recorder
+    _recorder = MetricsRecorder(path, openmetrics_path, run_id)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+
+
+def enabled():
+    return _recorder is not None
+
+
+def span(name, **attrs):
+    """
+    with metrics.span('insert', blog_id=...) as sp: ... 형태로 구간을 기록합니다.
+    """
+    if _recorder is None:
+        return _NULL_SPAN
+    return Span(_recorder, name, attrs)
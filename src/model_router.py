@@ -0,0 +1,287 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 다시 읽기/병합만 수행
+    fcntl = None
+
+DEFAULT_STATE_PATH = os.path.join('.cache', 'model_health.json')
+
+# 서킷 상태
+CLOSED = 'closed'        # 정상 호출
+OPEN = 'open'            # 쿨다운 중 (호출 생략)
+HALF_OPEN = 'half_open'  # 쿨다운 종료 후 시험 호출 1회 허용
+
+# 실패 분류
+RATE_LIMITED = 'rate_limited'  # 429 / RESOURCE_EXHAUSTED
+NOT_FOUND = 'not_found'        # 404 / 모델 없음
+TRANSIENT = 'transient'        # 5xx, 타임아웃, 연결 오류
+FATAL = 'fatal'                # 재시도해도 소용없는 오류 (잘못된 요청, 빈 응답 등)
+
+_RETRY_DELAY_RE = re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s")
+_STATUS_CODE_RE = re.compile(r'\b(4\d\d|5\d\d)\b')
+
+
+def classify_error(e):
+    """
+    예외를 (분류, retry_after 초) 튜플로 변환합니다.
+    """
+    code = getattr(e, 'code', None)
+    if not isinstance(code, int):
+        match = _STATUS_CODE_RE.search(str(e))
+        code = int(match.group(1)) if match else None
+    err_msg = str(e)
+
+    if code == 429 or "TooManyRequests" in err_msg or "RESOURCE_EXHAUSTED" in err_msg:
+        return RATE_LIMITED, _retry_after(e)
+    if code == 404 or "NotFound" in err_msg:
+        return NOT_FOUND, None
+    if (code is not None and code >= 500) or isinstance(e, (TimeoutError, ConnectionError)):
+        return TRANSIENT, _retry_after(e)
+    return FATAL, None
+
+
+def _retry_after(e):
+    """
+    Retry-After 헤더 또는 google.rpc.RetryInfo의 retryDelay 값을 초 단위로 찾습니다.
+    """
+    response = getattr(e, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers:
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    match = _RETRY_DELAY_RE.search(str(getattr(e, 'details', None) or e))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class ModelRouter:
+    """
+    모델별 상태(지연 시간, 429/404 횟수, 쿨다운)를 기억하는 서킷 브레이커 기반 라우터.
+    state_path를 지정하면 상태가 JSON 파일로 저장되어 프로세스 간에도 유지됩니다.
+    여러 프로세스(워커, 여러 블로그 게시)가 같은 파일을 쓰므로, 기록할 때는 파일을 잠그고 다시 읽은 뒤
+    바뀐 모델 항목만 고쳐 저장하고, 후보를 고를 때는 파일이 바뀌었으면 다시 읽습니다.
+    """
+
+    def __init__(self, models, state_path=None, base_cooldown=5.0, max_cooldown=3600.0,
+                 not_found_cooldown=24 * 3600.0, max_samples=50, probe_poll=1.0, latency_tolerance=0.2,
+                 probe_timeout=600.0):
+        self.models = list(models)
+        self.state_path = state_path
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.not_found_cooldown = not_found_cooldown
+        self.max_samples = max_samples
+        # 다른 작업의 시험 호출 결과를 기다릴 때 다시 확인하기까지의 간격(초)
+        self.probe_poll = probe_poll
+        # 시험 호출을 맡았다가 결과를 알리지 않은 작업(호출 전에 다른 모델이 성공하는 등)의 몫은 이 시간 뒤에 풀림
+        self.probe_timeout = probe_timeout
+        # 가장 빠른 모델보다 이 비율 안쪽으로 느린 모델은 같은 속도로 보고 우선순위를 유지
+        self.latency_tolerance = latency_tolerance
+        self._lock = threading.Lock()
+        # 시험 호출을 맡은 모델 → 맡은 시각
+        self._probing = {}
+        self._state = {}
+        self._mtime = None
+        self._load()
+
+    def _new_entry(self):
+        return {
+            'state': CLOSED,
+            # 호출 종류(주제 추천, 전체 리포트, 섹션 등)별 지연 시간 EWMA. 응답 길이가 달라 서로 비교하지 않음
+            'latency_by_class': {},
+            'latencies': [],
+            'ttfts': [],
+            'successes': 0,
+            'rate_limited': 0,
+            'not_found': 0,
+            'consecutive_failures': 0,
+            'cooldown_until': 0.0,
+        }
+
+    def _entry(self, model):
+        if model not in self._state:
+            self._state[model] = self._new_entry()
+        return self._state[model]
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            self._mtime = os.stat(self.state_path).st_mtime_ns
+            with open(self.state_path, encoding='utf-8') as f:
+                data = json.load(f)
+            for model, entry in data.items():
+                merged = self._new_entry()
+                merged.update(entry)
+                merged.pop('latency_ewma', None)  # 호출 종류 구분 전 상태 파일의 값
+                self._state[model] = merged
+        except (OSError, ValueError) as e:
+            print(f"--- [ROUTER] 상태 파일을 읽지 못했습니다 ({e}). 초기 상태로 시작합니다. ---")
+
+    def _save(self):
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+        self._mtime = os.stat(self.state_path).st_mtime_ns
+
+    def _refresh(self):
+        # 다른 프로세스가 상태 파일을 고쳤으면 다시 읽음 (쿨다운을 공유하기 위해)
+        if self.state_path and os.path.exists(self.state_path) \
+                and os.stat(self.state_path).st_mtime_ns != self._mtime:
+            self._load()
+
+    @contextlib.contextmanager
+    def _update(self, model):
+        """
+        모델 항목 하나를 고치고 저장합니다. (self._lock 안에서 사용)
+        상태 파일을 잠근 채 다시 읽은 뒤 고치므로 다른 프로세스가 그사이 기록한 내용을 덮어쓰지 않습니다.
+        """
+        if not self.state_path:
+            yield self._entry(model)
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.state_path}.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._load()
+            yield self._entry(model)
+            self._save()
+
+    def candidates(self, call_class='report'):
+        """
+        지금 호출해도 되는 모델 목록을 반환합니다. 정상 모델 다음에 시험 호출(half-open) 모델이 옵니다.
+        정상 모델은 우선순위 순이며, 모두 call_class 지연 시간이 측정된 뒤에만 빠른 순으로 바꿉니다.
+        (가장 빠른 모델과 latency_tolerance 이내로 차이 나는 모델끼리는 우선순위 순 유지)
+        """
+        now = time.time()
+        healthy, probes = [], []
+        with self._lock:
+            self._refresh()
+            for priority, model in enumerate(self.models):
+                entry = self._entry(model)
+                if entry['state'] == CLOSED:
+                    healthy.append((entry['latency_by_class'].get(call_class), priority, model))
+                elif now >= entry['cooldown_until'] and not self._probe_claimed(model, now):
+                    # 시험 호출은 한 작업만: 돌려주는 순간 같은 잠금 안에서 몫을 차지함
+                    entry['state'] = HALF_OPEN
+                    self._probing[model] = now
+                    probes.append(model)
+        if healthy and all(latency is not None for latency, _, _ in healthy):
+            fastest = min(latency for latency, _, _ in healthy) * (1 + self.latency_tolerance)
+            healthy.sort(key=lambda h: (0.0 if h[0] <= fastest else h[0], h[1]))
+        return [model for _, _, model in healthy] + probes
+
+    def next_available_in(self):
+        """
+        쿨다운 중인 모델 중 가장 빨리 풀리는 시점까지 남은 초를 반환합니다. (없으면 None)
+        쿨다운이 끝났지만 다른 작업이 시험 호출 중인 모델은 probe_poll 후에 다시 확인합니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._refresh()
+            waits = [
+                max(self.probe_poll if self._probe_claimed(m, now) else 0.0, self._entry(m)['cooldown_until'] - now)
+                for m in self.models if self._entry(m)['state'] != CLOSED
+            ]
+        return min(waits) if waits else None
+
+    def _probe_claimed(self, model, now):
+        claimed = self._probing.get(model)
+        return claimed is not None and now - claimed < self.probe_timeout
+
+    def begin(self, model):
+        # 시험 호출 몫은 candidates()에서 이미 차지함. 실제 호출 시작 시각으로 갱신
+        with self._lock:
+            if model in self._probing:
+                self._probing[model] = time.time()
+
+    def release(self, model):
+        """
+        상태 변화 없이 시험 호출 표시만 해제합니다. (출력 검증 실패처럼 모델 상태와 무관한 중단)
+        """
+        with self._lock:
+            self._probing.pop(model, None)
+
+    def record_success(self, model, latency, call_class='report'):
+        with self._lock:
+            self._probing.pop(model, None)
+            with self._update(model) as entry:
+                entry['state'] = CLOSED
+                entry['successes'] += 1
+                entry['consecutive_failures'] = 0
+                entry['cooldown_until'] = 0.0
+                prev = entry['latency_by_class'].get(call_class)
+                entry['latency_by_class'][call_class] = latency if prev is None else 0.7 * prev + 0.3 * latency
+                entry['latencies'] = (entry['latencies'] + [round(latency, 3)])[-self.max_samples:]
+
+    def record_ttft(self, model, ttft):
+        """
+        스트리밍 첫 토큰까지의 시간을 기록합니다. (헤징 임계값 계산용)
+        """
+        with self._lock, self._update(model) as entry:
+            entry['ttfts'] = (entry['ttfts'] + [round(ttft, 3)])[-self.max_samples:]
+
+    def ttft_percentile(self, model, q, min_samples=5):
+        """
+        최근 TTFT의 q 백분위수(초). 표본이 min_samples보다 적으면 None.
+        """
+        with self._lock:
+            samples = sorted(self._entry(model)['ttfts'])
+        if len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(round((len(samples) - 1) * q / 100)))
+        return samples[index]
+
+    def record_failure(self, model, error):
+        """
+        실패를 기록하고 분류 결과를 반환합니다. FATAL이 아니면 다음 모델로 넘어가면 됩니다.
+        """
+        kind, retry_after = classify_error(error)
+        if kind == FATAL:
+            with self._lock:
+                self._probing.pop(model, None)
+            return kind
+
+        with self._lock:
+            self._probing.pop(model, None)
+            with self._update(model) as entry:
+                entry['consecutive_failures'] += 1
+                if kind == NOT_FOUND:
+                    entry['not_found'] += 1
+                    cooldown = self.not_found_cooldown
+                else:
+                    if kind == RATE_LIMITED:
+                        entry['rate_limited'] += 1
+                    # 지터가 포함된 지수 백오프, Retry-After 힌트가 있으면 그 이상 대기
+                    backoff = self.base_cooldown * (2 ** (entry['consecutive_failures'] - 1))
+                    cooldown = min(self.max_cooldown, backoff) * random.uniform(0.8, 1.2)
+                    if retry_after:
+                        cooldown = max(cooldown, retry_after)
+                entry['state'] = OPEN
+                entry['cooldown_until'] = time.time() + cooldown
+        print(f"--- [ROUTER] {model}: {kind}, {cooldown:.1f}초 쿨다운 ---")
+        return kind
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._state))
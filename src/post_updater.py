@@ -0,0 +1,240 @@
+import re
+from dataclasses import dataclass, field
+from src import postprocess
+from src.topic_pool import normalize_ticker, ticker_from_title
+from src import metrics
+
+# Phase 3 본문 섹션은 <h2>로 시작합니다 (5-Phase 구조)
+_H2_RE = re.compile(r'<h2[\s>]', re.IGNORECASE)
+_H2_TEXT_RE = re.compile(r'<h2[^>]*>(.*?)</h2>', re.IGNORECASE | re.DOTALL)
+_STRIP_TAGS_RE = re.compile('<[^<]+?>')
+# Phase 4 푸터(면책조항) 시작 위치: 마지막 섹션 뒤의 면책 문구 블록
+_FOOTER_RE = re.compile(r'<(?:p|div|footer)\b[^>]*>\s*(?:<[^>]+>\s*)*[^<]*(?:면책|투자 권유|Disclaimer)', re.IGNORECASE)
+_MARKER_RE = re.compile(r'<!--\s*section:(\d+)\s*-->')
+
+# 시간이 지나면 낡는 섹션: 제목 키워드 또는 재무 테이블 포함 여부로 판단
+STALE_KEYWORDS = ('밸류에이션', 'valuation', '재무', '실적', 'financial', '주가', '목표가', '배당')
+FINANCIAL_TABLE_MARKER = 'tst-financial-table'
+
+
+@dataclass
+class Section:
+    heading: str
+    html: str
+    stale: bool = False
+
+
+@dataclass
+class UpdateResult:
+    post_id: str
+    title: str
+    content: str
+    patch: dict
+    changed: list = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
+
+
+def split_sections(html_content):
+    """
+    본문을 [머리(Phase 1~2), <h2> 섹션..., 푸터(Phase 4~)]로 나눕니다.
+    이어 붙이면 원문과 정확히 같으며, 머리와 푸터는 heading이 빈 문자열입니다.
+    """
+    starts = [m.start() for m in _H2_RE.finditer(html_content)]
+    if not starts:
+        return [Section('', html_content)]
+    footer = _FOOTER_RE.search(html_content, starts[-1])
+    end = footer.start() if footer else len(html_content)
+    sections = [Section('', html_content[:starts[0]])]
+    for start, stop in zip(starts, starts[1:] + [end]):
+        chunk = html_content[start:stop]
+        match = _H2_TEXT_RE.match(chunk)
+        heading = _STRIP_TAGS_RE.sub('', match.group(1)).strip() if match else ''
+        sections.append(Section(heading, chunk))
+    sections.append(Section('', html_content[end:]))
+    return sections
+
+
+def mark_stale(sections, keywords=STALE_KEYWORDS):
+    """
+    제목에 keywords가 있거나 재무 테이블이 들어 있는 섹션을 갱신 대상으로 표시하고 개수를 반환합니다.
+    """
+    keywords = [k.lower() for k in keywords]
+    count = 0
+    for section in sections:
+        if not section.heading:
+            continue
+        heading = section.heading.lower()
+        section.stale = any(k in heading for k in keywords) or FINANCIAL_TABLE_MARKER in section.html
+        count += section.stale
+    return count
+
+
+def parse_updates(text):
+    """
+    `<!-- section:N -->`으로 구분된 모델 응답을 {N: 섹션 HTML}로 나눕니다.
+    """
+    text = postprocess.clean_html(text)
+    markers = list(_MARKER_RE.finditer(text))
+    updates = {}
+    for marker, following in zip(markers, markers[1:] + [None]):
+        chunk = text[marker.end():following.start() if following else len(text)].strip()
+        if chunk:
+            updates[int(marker.group(1))] = chunk
+    return updates
+
+
+class PostUpdater:
+    """
+    이미 게시한 분석 글을 새로 올리는 대신 낡은 섹션만 다시 생성해 posts.patch로 수정합니다.
+    모델은 갱신 대상 섹션만 출력하고, 업로드에는 실제로 바뀐 필드만 담습니다.
+    (Blogger API에는 본문 일부 수정이 없으므로 본문이 바뀌면 content 필드 전체를 보냅니다.)
+    mirror(BlogMirror)가 있으면 글 찾기와 기존 본문 조회를 로컬 사본에서 합니다.
+    """
+
+    def __init__(self, content_engine, blogger, mirror=None, keywords=STALE_KEYWORDS):
+        self.content_engine = content_engine
+        self.blogger = blogger
+        self.mirror = mirror
+        self.keywords = keywords
+
+    def resolve(self, ref):
+        """
+        게시글 id 또는 티커('F', 'NYSE: F')로 게시글 id를 찾습니다. 없으면 None.
+        """
+        if ref.isdigit():
+            return ref
+        ticker = normalize_ticker(ref)
+        if not ticker:
+            return None
+        if self.mirror is not None:
+            post_id = self.mirror.find_by_ticker(ticker)
+            if post_id:
+                return post_id
+        # 사본이 없으면 제목만 최신순으로 훑다가 처음 일치하는 글에서 멈춤
+        for post in self.blogger.iter_posts(fields='nextPageToken,items(id,title)'):
+            if ticker_from_title(post.get('title')) == ticker:
+                return post['id']
+        return None
+
+    def load(self, post_id):
+        post = self.mirror.get(post_id) if self.mirror is not None else None
+        if post is None:
+            post = self.blogger.get_post(post_id)
+        return post
+
+    def refresh(self, post):
+        """
+        낡은 섹션을 다시 생성해 본문에 끼워 넣고, 기존 글과 비교한 결과(UpdateResult)를 반환합니다.
+        갱신할 섹션이 없으면 patch가 빈 결과(변경 없음)를, 생성에 실패하면 None을 반환합니다.
+        """
+        content = post.get('content') or ''
+        sections = split_sections(content)
+        if not mark_stale(sections, self.keywords):
+            print(f"--- 갱신할 섹션이 없습니다: {post.get('title')} ---")
+            return UpdateResult(
+                post_id=post['id'],
+                title=post.get('title') or '',
+                content=content,
+                patch={},
+                stats={
+                    'sections': len(sections) - 2 if len(sections) > 1 else 0,
+                    'regenerated': 0,
+                    'request_chars': 0,
+                    'generated_chars': 0,
+                    'before_chars': len(content),
+                    'after_chars': len(content),
+                },
+            )
+
+        stale = [i for i, section in enumerate(sections) if section.stale]
+        request = '\n\n'.join(f"<!-- section:{i} -->\n{sections[i].html.strip()}" for i in stale)
+        print(f"--- 섹션 {len(stale)}개 갱신: {', '.join(sections[i].heading for i in stale)} ---")
+        text = self.content_engine.update_sections(post.get('title') or '', request)
+        if not text:
+            return None
+
+        with metrics.span('diff', sections=len(sections)) as sp:
+            updates = parse_updates(text)
+            minifier = self.content_engine.minifier
+            changed = []
+            for i in stale:
+                new_html = updates.get(i)
+                if not new_html:
+                    print(f"--- 응답에 섹션이 없어 유지합니다: {sections[i].heading} ---")
+                    continue
+                if minifier is not None:
+                    # 새로 생성한 섹션만 업로드용으로 축소 (나머지 섹션은 원문 그대로)
+                    new_html = minifier.minify(new_html)[0]
+                # 섹션 사이 공백/줄바꿈은 원문 그대로 유지
+                old_html = sections[i].html
+                tail = old_html[len(old_html.rstrip()):]
+                new_html = new_html + tail
+                if new_html != old_html:
+                    sections[i].html = new_html
+                    changed.append(sections[i].heading)
+            new_content = ''.join(section.html for section in sections)
+            patch = self.diff_fields(post, content=new_content)
+            sp.set(changed=len(changed))
+
+        return UpdateResult(
+            post_id=post['id'],
+            title=post.get('title') or '',
+            content=new_content,
+            patch=patch,
+            changed=changed,
+            stats={
+                'sections': len(sections) - 2,
+                'regenerated': len(stale),
+                'request_chars': len(request),
+                'generated_chars': len(text),
+                'before_chars': len(content),
+                'after_chars': len(new_content),
+            },
+        )
+
+    @staticmethod
+    def diff_fields(post, title=None, content=None, labels=None):
+        """
+        기존 글과 다른 필드만 담은 patch 본문을 만듭니다.
+        """
+        patch = {}
+        if title is not None and title != post.get('title'):
+            patch['title'] = title
+        if content is not None and content != post.get('content'):
+            patch['content'] = content
+        if labels is not None and list(labels) != list(post.get('labels') or []):
+            patch['labels'] = list(labels)
+        return patch
+
+    def apply(self, post, result):
+        """
+        바뀐 필드만 posts.patch로 보내고, 사본에도 반영합니다. 바뀐 것이 없으면 요청하지 않습니다.
+        """
+        if not result.patch:
+            print("--- 바뀐 내용이 없어 수정하지 않습니다 ---")
+            return post
+        response = self.blogger.patch_post(result.post_id, **result.patch)
+        if not response:
+            return None
+        updated = dict(post, **result.patch)
+        updated.update(response)
+        if self.mirror is not None:
+            self.mirror.record(updated)
+        return updated
+
+    def update(self, ref, dry_run=False):
+        """
+        ref(게시글 id 또는 티커)의 글을 갱신하고 (UpdateResult, 수정된 글)을 반환합니다.
+        """
+        post_id = self.resolve(ref)
+        if not post_id:
+            print(f"--- 게시글을 찾지 못했습니다: {ref} ---")
+            return None, None
+        post = self.load(post_id)
+        if not post:
+            print(f"--- 게시글을 불러오지 못했습니다: {post_id} ---")
+            return None, None
+        result = self.refresh(post)
+        if result is None or dry_run:
+            return result, None
+        return result, self.apply(post, result)
@@ -0,0 +1,124 @@
+import re
+from dataclasses import dataclass, field
+from src import metrics
+
+# 본문 전체를 훑는 패턴은 '#' 하나뿐입니다. 리터럴로 시작하는 패턴이라 re의 빠른 검색 경로를 탑니다.
+# (대안 분기나 lookbehind로 시작하는 패턴은 모든 위치에서 시도되어 오히려 느려집니다.)
+_HASH_RE = re.compile(r'#(\w*)')
+# 나머지는 첫 매치에서 멈추는 검색이거나 특정 위치에서의 match()로만 사용합니다.
+# (기존 clean_html/extract_tags/main.py 정규식과 동일한 의미)
+_H1_RE = re.compile(r'<h1[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+_TAGS_DIV_RE = re.compile(r'<div id="tags"[^>]*>(.*?)</div>', re.DOTALL)
+_STRONG_RE = re.compile(r'<strong>(.*?)</strong>', re.IGNORECASE)
+_B_RE = re.compile(r'<b>(.*?)</b>', re.IGNORECASE)
+_MD_TITLE_RE = re.compile(r'#\s*(.*?)(?:\n|$)')
+_HEX_RE = re.compile(r'[0-9a-fA-F]{3,6}')
+_STRIP_TAGS_RE = re.compile('<[^<]+?>')
+_TAGS_DIV_MARKER = '<div id="tags"'
+
+MAX_TAGS = 20
+
+
+@dataclass
+class PostResult:
+    title: str
+    tags: list
+    body: str
+    stats: dict = field(default_factory=dict)
+    # 구조화 리포트로 생성한 경우의 원본 (report_model.Report, 다른 형식 렌더링용)
+    report: object = None
+
+
+def clean_html(html_content):
+    """
+    앞뒤 공백과 ```html 코드 펜스를 제거합니다.
+    """
+    cleaned = html_content.strip()
+    if cleaned[:7].lower() == '```html':
+        cleaned = cleaned[7:].lstrip()
+    if cleaned.endswith('```'):
+        cleaned = cleaned[:-3].rstrip()
+    return cleaned.strip()
+
+
+def _is_hex(tag):
+    # 색상 코드(#fff, #1a73e8)는 태그가 아님
+    return _HEX_RE.fullmatch(tag) is not None
+
+
+def scan(html_content, fallback_title):
+    """
+    정리된 본문에서 제목, 태그, 통계를 구합니다.
+    '#' 위치를 한 번 훑으면서 해시태그와 마크다운 제목 후보를 함께 수집하고,
+    나머지 항목(<h1>, 태그 div, 굵은 텍스트)은 첫 매치에서 멈추는 검색으로 찾습니다.
+    제목 우선순위: <h1> → 마크다운 # 제목 → <strong> → <b> → fallback_title
+    """
+    hashtags = []
+    md_title_pos = -1
+    for m in _HASH_RE.finditer(html_content):
+        pos = m.start()
+        if pos == 0:
+            md_title_pos = 0
+        else:
+            prev = html_content[pos - 1]
+            if not prev.isspace():
+                continue
+            if prev == '\n' and md_title_pos == -1:
+                md_title_pos = pos
+        if m.group(1):
+            hashtags.append(m.group(1))
+
+    # 1. 숨겨진 Div + 해시태그 (색상 코드는 반복되므로 판정 결과를 재사용)
+    tags = []
+    start = html_content.find(_TAGS_DIV_MARKER)
+    if start != -1:
+        match = _TAGS_DIV_RE.match(html_content, start)
+        if match:
+            for t in match.group(1).split(','):
+                tag = t.strip()
+                if tag and not _is_hex(tag):
+                    tags.append(tag)
+    hex_memo = {}
+    for ht in hashtags:
+        is_hex = hex_memo.get(ht)
+        if is_hex is None:
+            is_hex = hex_memo[ht] = _is_hex(ht)
+        if not is_hex:
+            tags.append(ht)
+    unique_tags = list(dict.fromkeys(tags))[:MAX_TAGS]
+
+    # 2. 제목
+    match = _H1_RE.search(html_content)
+    if match is None and md_title_pos != -1:
+        match = _MD_TITLE_RE.match(html_content, md_title_pos)
+    if match is None:
+        match = _STRONG_RE.search(html_content) or _B_RE.search(html_content)
+    title = _STRIP_TAGS_RE.sub('', match.group(1)).strip() if match else fallback_title
+
+    stats = {
+        'chars': len(html_content),
+        'tables': html_content.count('<table'),
+        'hashtags': len(hashtags),
+        'tags': len(unique_tags),
+    }
+    return title, unique_tags, stats
+
+
+def process_post(raw_content, fallback_title, minifier=None):
+    """
+    모델 응답(raw)에서 정리된 본문, 제목, 태그, 통계를 한 번에 만듭니다.
+    minifier(HtmlMinifier)가 있으면 제목/태그를 추출한 뒤 본문을 업로드용으로 축소합니다.
+    """
+    with metrics.span('clean', raw_chars=len(raw_content)):
+        body = clean_html(raw_content)
+    # 태그와 제목은 같은 스캔에서 함께 추출 (마크다운 제목은 줄바꿈 위치로 찾으므로 축소 전에 스캔)
+    with metrics.span('extract_tags_title', chars=len(body)) as sp:
+        title, tags, stats = scan(body, fallback_title)
+        sp.set(tags=len(tags), title_found=title != fallback_title)
+    stats['raw_chars'] = len(raw_content)
+    if minifier is not None:
+        with metrics.span('minify', chars=len(body)) as sp:
+            body, minify_stats = minifier.minify(body)
+            sp.set(bytes_before=minify_stats['bytes_before'], bytes_after=minify_stats['bytes_after'])
+        stats.update(minify_stats)
+    return PostResult(title=title, tags=tags, body=body, stats=stats)
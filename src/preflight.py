@@ -0,0 +1,90 @@
+import os
+import re
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# 클라이언트(SDK)를 만들지 않고 표준 라이브러리만으로 설정과 인증 정보를 확인합니다
+TOKEN_URI = 'https://oauth2.googleapis.com/token'
+GEMINI_MODELS_URI = 'https://generativelanguage.googleapis.com/v1beta/models'
+
+
+def _result(name, ok, detail=''):
+    return {'name': name, 'ok': ok, 'detail': detail}
+
+
+def check_config(config):
+    """
+    값의 형식만 확인합니다 (네트워크 요청 없음).
+    """
+    results = [
+        _result('BLOG_ID', config['blog_id'].isdigit(), '숫자로 된 블로그 ID여야 합니다'),
+        _result('CLIENT_ID', config['client_id'].endswith('.apps.googleusercontent.com'),
+                "'.apps.googleusercontent.com'으로 끝나야 합니다"),
+        _result('GEMINI_API_KEY', re.fullmatch(r'[\w\-]{20,}', config['gemini_key']) is not None,
+                '공백이나 따옴표가 섞이지 않았는지 확인하세요'),
+    ]
+    for result in results:
+        if result['ok']:
+            result['detail'] = ''
+    try:
+        os.makedirs('.cache', exist_ok=True)
+        probe = os.path.join('.cache', f".check.{os.getpid()}")
+        with open(probe, 'w', encoding='utf-8') as f:
+            f.write('ok')
+        os.remove(probe)
+        results.append(_result('.cache', True))
+    except OSError as e:
+        results.append(_result('.cache', False, f"상태 디렉터리에 쓸 수 없습니다: {e}"))
+    return results
+
+
+def check_oauth(config, timeout=10):
+    """
+    리프레시 토큰으로 액세스 토큰을 한 번 발급받아 봅니다. (발급받은 토큰은 사용하지 않음)
+    """
+    data = urllib.parse.urlencode({
+        'grant_type': 'refresh_token',
+        'refresh_token': config['refresh_token'],
+        'client_id': config['client_id'],
+        'client_secret': config['client_secret'],
+    }).encode('utf-8')
+    try:
+        with urllib.request.urlopen(urllib.request.Request(TOKEN_URI, data=data), timeout=timeout) as response:
+            scope = json.load(response).get('scope', '')
+        if 'blogger' not in scope:
+            return _result('Blogger OAuth', False, f"토큰에 Blogger 권한이 없습니다 (scope: {scope or '-'})")
+        return _result('Blogger OAuth', True)
+    except urllib.error.HTTPError as e:
+        try:
+            error = json.load(e).get('error', '')
+        except ValueError:
+            error = ''
+        if error == 'invalid_grant':
+            return _result('Blogger OAuth', False, "리프레시 토큰이 만료되었거나 취소되었습니다 (invalid_grant)")
+        return _result('Blogger OAuth', False, f"HTTP {e.code} {error}".strip())
+    except (urllib.error.URLError, OSError) as e:
+        return _result('Blogger OAuth', False, f"토큰 서버에 연결하지 못했습니다: {e}")
+
+
+def check_gemini(config, timeout=10):
+    """
+    모델 목록을 한 건만 조회해 API 키가 유효한지 확인합니다.
+    """
+    url = f"{GEMINI_MODELS_URI}?pageSize=1"
+    request = urllib.request.Request(url, headers={'x-goog-api-key': config['gemini_key']})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            return _result('Gemini API 키', True)
+    except urllib.error.HTTPError as e:
+        return _result('Gemini API 키', False, f"HTTP {e.code} (키가 잘못되었거나 API가 비활성화됨)")
+    except (urllib.error.URLError, OSError) as e:
+        return _result('Gemini API 키', False, f"API 서버에 연결하지 못했습니다: {e}")
+
+
+def run_checks(config, online=True):
+    results = check_config(config)
+    if online:
+        results += [check_oauth(config), check_gemini(config)]
+    return results
@@ -0,0 +1,512 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import contextlib
+from datetime import datetime
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 다시 읽기/병합만 수행
+    fcntl = None
+
+DEFAULT_CACHE_STATE_PATH = os.path.join('.cache', 'prompt_caches.json')
+
+# ---------------------------------------------------------------------------
+# [투자분석 블로그 통합 프롬프트 시스템 v3.0] 섹션 원문
+# full 변형을 순서대로 이어 붙이면 기존 generate_content 프롬프트와 정확히 같습니다.
+# ---------------------------------------------------------------------------
+
+_HEADER_FULL = """
+[투자분석 블로그 통합 프롬프트 시스템 v3.0]을 온전히 적용하여 다음 주제에 대한 전문적인 분석 리포트를 작성하십시오.
+
+---
+
+"""
+
+_DESIGN_SYSTEM_FULL = """## 2. Layer 1: Advanced Design System
+
+### 2.3 디자인 가이드라인 (Design System Reference)
+```css
+:root {
+  /* Font Stack */
+  --font-primary: -apple-system, "Noto Sans KR", sans-serif;
+  --font-mono: "SF Mono", Monaco, monospace;
+  
+  /* Font Sizes */
+  --text-base: 1rem;     /* 16px */
+  --text-lg: 1.125rem;   /* 18px */
+  --text-xl: 1.5rem;     /* 24px */
+}
+```
+
+### 2.4 컴포넌트 정의
+- `.tst-stock-info` - 종목 정보 헤더
+- `.key-points-list` - 핵심 포인트 리스트
+- `.rating` - 투자 등급 배지
+- `.tst-financial-table` - 재무 테이블
+- `.trend-{up|down|neutral}` - 트렌드 인디케이터
+- `.metric-card` - 지표 카드
+
+---
+
+"""
+
+_HTML_RULES_FULL = """## 3. Layer 2: HTML Structure Framework
+
+### 3.1 구조 설계 철학
+
+#### 📋 구조 설계 4대 원칙
+1. **Platform Awareness**
+   - 스킨 시스템 충돌 방지
+   - 에디터 자동 변환 대응
+
+2. **EEAT 준수**
+   - 작성자 푸터 포함 (작성자: 우디(Woody), 실전 투자 분석가)
+   - 면책조항 필수 포함
+
+### 3.2 5-Phase 템플릿 구조
+```
+Phase 1: Meta Header (메타데이터)
+    ├─ 기업 식별 정보
+    ├─ 핵심 투자 포인트
+    └─ 투자 등급 배지
+
+Phase 2: Navigation (목차)
+    └─ 조건부 자동 생성
+
+Phase 3: Main Content (본문)
+    ├─ Executive Summary
+    ├─ 재무 분석
+    ├─ 밸류에이션
+    └─ 리스크 요인
+
+Phase 4: Compliance Footer (푸터)
+    ├─ 면책조항
+    └─ 업데이트 정보
+
+Phase 5: Inline Styles (스타일)
+    └─ 스코프 한정 CSS
+```
+
+### 3.3 티스토리 및 블로거 제약사항 대응
+
+#### ⚠️ 필수 금지사항
+| 항목 | 이유 | 대안 |
+|------|------|------|
+| `!important` 남용 | 스킨 충돌 | 특정성 높은 선택자 |
+| 전역 선택자 | 페이지 영향 | `.tst-` 접두사 |
+| `<script>` 태그 | 보안 제거 | 순수 CSS |
+| 고정 픽셀값 | 반응형 깨짐 | rem, % 단위 |
+
+### 3.4 HTML 형식 요구사항 (Blogger 최적화)
+
+#### 📋 필수 준수사항
+1. **HTML 구조**
+   - `<body>` 태그 내의 콘텐츠만 작성
+   - `<html>`, `<head>`, `<body>` 태그는 작성하지 않음
+
+2. **CSS 처리 (Inline CSS ONLY)**
+   - 모든 스타일은 각 태그 내의 **인라인 'style' 속성**으로만 작성
+   - `<head>` 내의 `<style>` 태그 사용 **절대 금지**
+   - 모든 스타일 선언은 개별 요소에 직접 적용
+
+3. **제약 사항**
+   - JavaScript (`<script>`) 사용 금지
+   - 외부 iFrame 사용 금지
+   - Deprecated 태그 및 속성 사용 금지 (`bgcolor`, `font`, `center` 등)
+   - 모든 스타일링은 CSS를 활용
+
+---
+
+"""
+
+_PERSONA_FULL = """## 4. Layer 3: Content Generation Engine
+
+### 4.1 역할 정의
+
+#### 👤 페르소나
+**'Prudent Contrarian'** - 20년 경력 가치투자 애널리스트
+
+#### 🧠 3중 사고 모드
+```
+Primary Mode: 보수적 가치투자자 (자본 보존)
+     ↓↑
+Shadow Mode: 성장투자자 관점 (기회비용)
+     ↓↑
+Meta Mode: 통합적 지혜
+```
+
+### 4.2 콘텐츠 내용
+- 사용자가 입력한 주제를 기반으로 전문적인 데이터 분석 및 통찰을 제공
+
+"""
+
+_OUTPUT_SPEC_FULL = """### 4.3 출력 규격
+
+#### 📏 섹션별 분량 기준
+| 섹션 | 최소 분량 | 필수 요소 |
+|------|----------|----------|
+| Summary | 300-500자 | 3줄 요약 |
+| 재무분석 | 1,500자+ | 3년 데이터 |
+| 밸류에이션 | 1,500자+ | DCF, Multiple |
+| 리스크 | 1,000자+ | 매트릭스 |
+| 전략 | 800자+ | 진입/출구 |
+
+#### 📊 필수 시각화 요소
+- 테이블: 5개+
+- 차트: 3개+ (HTML/CSS로 구현)
+- 메트릭카드: 4개+
+- 트렌드지표: 10개+
+
+---
+
+## 5. 통합 실행 매뉴얼
+
+### 5.1 Phase 1: 준비 (Preparation)
+```
+□ 기업 선정 및 티커 확인
+□ 3개년 재무제표 수집
+□ 경쟁사 3개 선정
+□ 최근 공시/뉴스 수집
+```
+
+### 5.2 Phase 2: 실행 (Execution)
+```
+□ Layer 1: 디자인 시스템 적용 (인라인 스타일링)
+□ Layer 2: HTML 구조 생성
+□ Layer 3: 6단계 정밀 분석 실행
+□ 데이터 검증
+```
+
+### 5.3 Phase 3: 검증 (Validation)
+```
+□ 기술 검증 (HTML/CSS 호환성)
+□ 콘텐츠 검증 (정확성 및 EEAT)
+□ 품질 검증 (가독성 및 편집디자인)
+□ 법무 검증 (면책조항 포함)
+```
+
+"""
+
+# ---------------------------------------------------------------------------
+# lite 모델용 축약 변형: 규칙은 유지하고 설명용 예시/체크리스트를 덜어냅니다.
+# ---------------------------------------------------------------------------
+
+_DESIGN_SYSTEM_COMPACT = """## 디자인
+- 폰트: -apple-system, "Noto Sans KR", sans-serif / 크기는 rem 단위(1rem, 1.125rem, 1.5rem)
+- 컴포넌트: 종목 정보 헤더, 핵심 포인트 리스트, 투자 등급 배지, 재무 테이블, 트렌드 인디케이터(up/down/neutral), 지표 카드
+
+"""
+
+_HTML_RULES_COMPACT = """## HTML 규칙
+- 구조: Phase 1 메타 헤더(기업 정보, 핵심 포인트, 투자 등급) → Phase 2 목차 → Phase 3 본문(Executive Summary, 재무 분석, 밸류에이션, 리스크 요인) → Phase 4 푸터(면책조항, 업데이트 정보, 작성자: 우디(Woody), 실전 투자 분석가)
+- `<body>` 내부 콘텐츠만 작성 (`<html>`, `<head>`, `<body>` 태그 금지)
+- 모든 스타일은 인라인 style 속성으로만 작성, `<style>` 태그 금지
+- `<script>`, iFrame, Deprecated 태그/속성(`bgcolor`, `font`, `center`) 금지, `!important` 남용 금지
+- 고정 픽셀 대신 rem, % 단위 사용
+
+"""
+
+_PERSONA_COMPACT = """## 페르소나
+'Prudent Contrarian' - 20년 경력 가치투자 애널리스트. 보수적 가치투자(자본 보존)를 기본으로, 성장투자자 관점(기회비용)을 함께 검토하여 통합적으로 판단합니다.
+
+"""
+
+_OUTPUT_SPEC_COMPACT = """## 출력 규격
+- Summary 300-500자(3줄 요약), 재무분석 1,500자+(3년 데이터), 밸류에이션 1,500자+(DCF, Multiple), 리스크 1,000자+(매트릭스), 전략 800자+(진입/출구)
+- 테이블 5개+, HTML/CSS 차트 3개+, 메트릭카드 4개+, 트렌드지표 10개+
+- 경쟁사 3개 비교, 면책조항 포함
+
+"""
+
+_TOPIC_TEMPLATE = """**주제**: {topic}
+**날짜**: {date}
+**결과물 언어**: 한국어
+"""
+
+# 기존 글의 일부 섹션만 갱신할 때의 작업 지시 (규칙은 축약 변형을 사용)
+_UPDATE_TEMPLATE = """## 작업: 기존 분석 글 갱신
+아래는 이미 게시된 분석 글 "{title}"의 섹션 중 시간이 지나 낡은 섹션입니다.
+**{date}** 기준 최신 데이터로 수치, 표, 평가 문장을 갱신하십시오.
+- 각 섹션은 `<!-- section:번호 -->` 주석으로 시작합니다. 같은 주석과 순서를 유지하여 갱신한 섹션만 출력하십시오.
+- `<h2>` 제목, 인라인 스타일, 표/카드 구조는 그대로 두고 내용만 고치십시오.
+- 주어지지 않은 섹션, 설명 문장, 코드 펜스는 출력하지 마십시오.
+- 결과물 언어: 한국어
+
+{sections}
+"""
+
+# 여러 블로그 게시: 한 번 생성한 글을 다른 언어 블로그용으로 옮김 (새로 분석하지 않음)
+_LOCALIZE_TEMPLATE = """## 작업: [현지화: {language}]
+아래 분석 글 HTML을 **{language}** 독자용으로 옮기십시오.
+- 태그 구조, 인라인 스타일, 표/카드 레이아웃, 수치와 티커는 그대로 두고 보이는 텍스트만 옮기십시오.
+- 제목(`<h1>`)과 `<div id="tags">` 안의 태그, 해시태그도 {language}로 옮기십시오.
+- 원문에 없는 내용을 더하거나 빼지 마십시오. 면책조항도 {language}로 옮기십시오.
+- HTML만 출력하고 설명 문장이나 코드 펜스는 쓰지 마십시오.
+
+{html}
+"""
+
+LANGUAGE_NAMES = {
+    'ko': '한국어', 'en': 'English', 'ja': '日本語', 'zh': '简体中文', 'es': 'Español', 'de': 'Deutsch',
+    'fr': 'Français', 'vi': 'Tiếng Việt',
+}
+
+# 섹션 분할 생성: 모든 섹션이 같은 수치를 쓰도록 먼저 만드는 공통 팩트 시트
+_FACT_SHEET_TEMPLATE = """## 작업: [팩트 시트 작성]
+**주제**: {topic}
+**날짜**: {date}
+이 기업의 분석 리포트를 섹션별로 나누어 동시에 작성할 수 있도록 공통 팩트 시트를 작성하십시오.
+- 기업 개요, 최근 3년 핵심 재무 수치(매출, 영업이익, 순이익, FCF, 부채비율), 현재 주가/시가총액/PER/PBR/배당수익률
+- 경쟁사 3곳, 투자 등급과 목표가, 핵심 투자 논지 3가지, 주요 리스크 3가지
+- 숫자에는 단위와 기준 시점을 적으십시오.
+- HTML 없이 간결한 텍스트 목록으로만 작성하십시오.
+"""
+
+_SECTION_TEMPLATE = """## 작업: [섹션 작성: {name}]
+**주제**: {topic}
+**날짜**: {date}
+아래 팩트 시트를 바탕으로 분석 리포트의 **{name}** 부분만 HTML로 작성하십시오. 다른 부분은 따로 작성되어 합쳐집니다.
+- 요구 사항: {spec}
+- 섹션 제목(`<h2>`), 목차, 면책조항, 작성자 정보, 해시태그는 쓰지 마십시오. (조립 단계에서 한 번만 넣습니다)
+- 수치는 팩트 시트와 일치해야 합니다.
+- 결과물 언어: 한국어
+
+### 팩트 시트
+{fact_sheet}
+"""
+
+# 구조화 리포트: HTML 대신 response_schema(report_model.RESPONSE_SCHEMA)에 맞춘 JSON으로 출력 (디자인은 렌더러가 담당)
+_STRUCTURED_TEMPLATE = """## 작업: [구조화 리포트 작성]
+**주제**: {topic}
+**날짜**: {date}
+이 기업의 분석 리포트를 HTML 없이 주어진 JSON 스키마의 필드로 작성하십시오. 디자인과 목차, 면책조항은 렌더링 단계에서 넣습니다.
+- title: "기업명 (티커): 부제" 형식 한 줄, subtitle: 글 전체를 요약하는 한 문장
+- rating: 투자 등급 (buy/hold/sell), key_points: 핵심 포인트 3개
+- metrics: 지표 카드 4개 이상 (value에 단위 포함, trend는 up/down/neutral)
+- sections: 아래 순서의 섹션. heading은 섹션 이름, paragraphs는 문단 목록, tables는 표 목록(rows의 칸 수는 columns와 같게)
+{sections}
+- 문단과 표 칸은 일반 텍스트로만 쓰십시오. (HTML 태그, 마크다운, 해시태그 금지) 차트 요구는 표로 대신하십시오.
+- tags: 검색용 태그 5-10개 ('#' 없이)
+- 결과물 언어: 한국어
+"""
+
+# 섹션 분할 생성 단위: (키, 이름, 요구 사항). header는 Phase 1, 나머지는 Phase 3 본문 섹션입니다.
+REPORT_HEADER = (
+    'header', 'Phase 1 메타 헤더',
+    '맨 앞에 `<h1>` 제목(기업명 (티커): 부제), 종목 정보 헤더, 핵심 포인트 3개, 투자 등급 배지. '
+    '맨 끝에 `<div id="tags" style="display:none">태그1, 태그2, ...</div>` (태그 5-10개)'
+)
+REPORT_SECTIONS = [
+    ('summary', 'Executive Summary', '300-500자 3줄 요약, 메트릭 카드 4개'),
+    ('financials', '재무 분석', '1,500자 이상, 최근 3년 재무 테이블 2개 이상, HTML/CSS 막대 차트 1개 이상'),
+    ('valuation', '밸류에이션', '1,500자 이상, DCF와 Multiple 비교 테이블, 경쟁사 3곳 비교 테이블'),
+    ('risks', '리스크 요인', '1,000자 이상, 리스크 매트릭스 테이블, 트렌드 인디케이터'),
+    ('strategy', '투자 전략', '800자 이상, 진입/출구 전략, HTML/CSS 차트 1개 이상'),
+]
+
+# 섹션 갱신/분할 생성 프롬프트에 포함할 규칙 섹션 (분량 규격과 전체 구조 설명은 제외)
+PARTIAL_RULE_SECTIONS = ('design_system', 'html_rules', 'persona')
+
+
+class PromptSection:
+    """
+    이름과 버전이 있는 정적 프롬프트 섹션. compact가 없으면 full을 그대로 사용합니다.
+    """
+
+    def __init__(self, name, version, full, compact=None):
+        self.name = name
+        self.version = version
+        self.full = full
+        self.compact = compact
+
+    def text(self, variant):
+        if variant == 'compact' and self.compact is not None:
+            return self.compact
+        return self.full
+
+
+SECTIONS = [
+    PromptSection('header', 'v3.0', _HEADER_FULL),
+    PromptSection('design_system', 'v3.0', _DESIGN_SYSTEM_FULL, _DESIGN_SYSTEM_COMPACT),
+    PromptSection('html_rules', 'v3.0', _HTML_RULES_FULL, _HTML_RULES_COMPACT),
+    PromptSection('persona', 'v3.0', _PERSONA_FULL, _PERSONA_COMPACT),
+    PromptSection('output_spec', 'v3.0', _OUTPUT_SPEC_FULL, _OUTPUT_SPEC_COMPACT),
+]
+
+
+class PromptCompiler:
+    """
+    섹션 단위로 프롬프트를 조립합니다.
+    정적 섹션은 Gemini 컨텍스트 캐시(client.caches)에 올려 두고, 호출마다 주제/날짜만 전송할 수 있습니다.
+    """
+
+    def __init__(self, sections=None, state_path=None, cache_ttl_seconds=3600):
+        self.sections = sections or SECTIONS
+        self.state_path = state_path
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._lock = threading.Lock()
+        self._caches = {}
+        self._unsupported = set()
+        self._load()
+
+    @staticmethod
+    def variant_for(model):
+        # lite 모델에는 축약 프롬프트 사용
+        return 'compact' if 'lite' in model else 'full'
+
+    def static_text(self, variant='full'):
+        return ''.join(section.text(variant) for section in self.sections)
+
+    @staticmethod
+    def topic_text(topic, date=None):
+        return _TOPIC_TEMPLATE.format(topic=topic, date=date or datetime.now().strftime('%Y-%m-%d'))
+
+    def compile(self, topic, date=None, variant='full'):
+        return self.static_text(variant) + self.topic_text(topic, date)
+
+    def compile_update(self, title, sections, date=None, variant='compact'):
+        """
+        기존 글의 섹션 갱신 프롬프트. sections는 `<!-- section:N -->`으로 구분된 기존 섹션 HTML입니다.
+        기존 HTML이 스타일 예시 역할을 하므로 규칙은 축약 변형으로 충분합니다.
+        """
+        return self._partial_rules(variant) + _UPDATE_TEMPLATE.format(
+            title=title, date=date or datetime.now().strftime('%Y-%m-%d'), sections=sections
+        )
+
+    def compile_localize(self, html, language):
+        """
+        생성된 글을 다른 언어로 옮기는 프롬프트. 원문 HTML이 스타일과 구조를 모두 담고 있으므로 규칙 섹션은 넣지 않습니다.
+        """
+        return _LOCALIZE_TEMPLATE.format(language=LANGUAGE_NAMES.get(language, language), html=html)
+
+    def compile_structured(self, topic, date=None, variant='full'):
+        """
+        구조화 리포트(JSON) 생성 프롬프트. HTML 디자인/구조 규칙 대신 페르소나와 섹션별 요구 사항만 넣습니다.
+        """
+        persona = ''.join(section.text(variant) for section in self.sections if section.name == 'persona')
+        sections = '\n'.join(f"  - {name}: {spec}" for _, name, spec in REPORT_SECTIONS)
+        return persona + _STRUCTURED_TEMPLATE.format(
+            topic=topic, date=date or datetime.now().strftime('%Y-%m-%d'), sections=sections
+        )
+
+    def compile_fact_sheet(self, topic, date=None):
+        return _FACT_SHEET_TEMPLATE.format(topic=topic, date=date or datetime.now().strftime('%Y-%m-%d'))
+
+    def compile_section(self, topic, fact_sheet, name, spec, date=None, variant='compact'):
+        """
+        섹션 분할 생성의 섹션 하나를 쓰는 프롬프트. 스타일은 조립 단계에서 맞추므로 규칙은 축약 변형을 사용합니다.
+        """
+        return self._partial_rules(variant) + _SECTION_TEMPLATE.format(
+            name=name, spec=spec, topic=topic, fact_sheet=fact_sheet.strip(),
+            date=date or datetime.now().strftime('%Y-%m-%d')
+        )
+
+    def _partial_rules(self, variant):
+        return ''.join(section.text(variant) for section in self.sections if section.name in PARTIAL_RULE_SECTIONS)
+
+    def fingerprint(self, variant='full'):
+        """
+        섹션 버전과 본문으로 만든 식별자. 섹션이 바뀌면 컨텍스트 캐시도 새로 만들어집니다.
+        """
+        h = hashlib.sha256()
+        for section in self.sections:
+            h.update(f"{section.name}:{section.version}\x00".encode('utf-8'))
+            h.update(section.text(variant).encode('utf-8'))
+        return h.hexdigest()[:16]
+
+    def token_report(self, client, model, topic='예시 기업 (TICK)', variant=None):
+        """
+        섹션별 토큰 수를 SDK의 count_tokens로 계산합니다.
+        """
+        variant = variant or self.variant_for(model)
+        report = {}
+        for section in self.sections:
+            response = client.models.count_tokens(model=model, contents=section.text(variant))
+            report[section.name] = response.total_tokens
+        report['topic'] = client.models.count_tokens(model=model, contents=self.topic_text(topic)).total_tokens
+        report['total'] = sum(report.values())
+        return report
+
+    # -- 컨텍스트 캐시 ---------------------------------------------------------
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                self._caches = json.load(f)
+        except (OSError, ValueError):
+            self._caches = {}
+
+    def _save(self):
+        if not self.state_path:
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._caches, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    @contextlib.contextmanager
+    def _update(self):
+        """
+        캐시 목록을 고치고 저장합니다. (self._lock 안에서 사용)
+        상태 파일을 잠근 채 다시 읽은 뒤 고치므로 다른 워커가 그사이 만든 캐시 이름을 덮어쓰지 않습니다.
+        """
+        if not self.state_path:
+            yield self._caches
+            return
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.state_path}.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._load()
+            yield self._caches
+            self._save()
+
+    @staticmethod
+    def _usable(entry):
+        # 만료 직전의 캐시는 사용하지 않음
+        return bool(entry) and entry['expires_at'] - time.time() > 60
+
+    def cached_content(self, client, model, variant=None):
+        """
+        정적 섹션을 담은 컨텍스트 캐시 이름을 반환합니다. 만료됐으면 새로 만들고,
+        모델이 캐시를 지원하지 않거나(최소 토큰 수 미달 등) 생성에 실패하면 None을 반환합니다.
+        """
+        variant = variant or self.variant_for(model)
+        key = f"{model}:{variant}:{self.fingerprint(variant)}"
+        with self._lock:
+            if key in self._unsupported:
+                return None
+            entry = self._caches.get(key)
+            if self._usable(entry):
+                return entry['name']
+            # 파일을 잠근 채 다시 읽어, 다른 워커가 먼저 만든 캐시가 있으면 그대로 씀 (중복 생성 방지)
+            with self._update() as caches:
+                entry = caches.get(key)
+                if self._usable(entry):
+                    return entry['name']
+                try:
+                    from google.genai import types
+                    cache = client.caches.create(
+                        model=model,
+                        config=types.CreateCachedContentConfig(
+                            contents=[self.static_text(variant)],
+                            display_name=f"woody-prompt-{variant}-{self.fingerprint(variant)}",
+                            ttl=f"{self.cache_ttl_seconds}s",
+                        )
+                    )
+                except Exception as e:
+                    print(f"--- [PROMPT] {model} 컨텍스트 캐시 생성 실패, 전체 프롬프트 전송: {e} ---")
+                    self._unsupported.add(key)
+                    return None
+                caches[key] = {'name': cache.name, 'expires_at': time.time() + self.cache_ttl_seconds}
+            print(f"--- [PROMPT] {model} 컨텍스트 캐시 생성: {cache.name} ---")
+            return cache.name
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DEFAULT_LEDGER_PATH = os.path.join('.cache', 'publish_ledger.sqlite')
+
+PENDING = 'pending'
+PUBLISHED = 'published'
+FAILED = 'failed'
+
+
+def content_key(blog_id, title, content, labels=None, is_draft=True):
+    """
+    게시글 내용 기반 멱등성 키. 같은 블로그에 같은 글은 한 번만 게시됩니다.
+    """
+    h = hashlib.sha256()
+    for part in (blog_id, title, content, ','.join(labels or []), 'draft' if is_draft else 'live'):
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+class PublishLedger:
+    """
+    업로드 시도와 결과를 기록하는 로컬 원장(SQLite).
+    pending 상태로 남은 항목은 "성공했는지 알 수 없음"을 뜻하며, 재시도 전에 블로그와 대조합니다.
+    """
+
+    def __init__(self, path=DEFAULT_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS publishes (
+                key TEXT PRIMARY KEY,
+                blog_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                status TEXT NOT NULL,
+                post_id TEXT,
+                url TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_publishes_blog ON publishes(blog_id, status)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, blog_id, title, status, post_id, url, attempts, error, result, created_at, updated_at "
+                "FROM publishes WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(
+            ('key', 'blog_id', 'title', 'status', 'post_id', 'url', 'attempts', 'error', 'result', 'created_at',
+             'updated_at'), row
+        ))
+        entry['result'] = json.loads(entry['result']) if entry['result'] else None
+        return entry
+
+    def mark_pending(self, key, blog_id, title):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO publishes (key, blog_id, title, status, attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET status = excluded.status, attempts = attempts + 1, "
+                "updated_at = excluded.updated_at",
+                (key, blog_id, title, PENDING, now, now)
+            )
+            self._conn.commit()
+
+    def mark_published(self, key, result):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE publishes SET status = ?, post_id = ?, url = ?, result = ?, error = NULL, updated_at = ? "
+                "WHERE key = ?",
+                (PUBLISHED, result.get('id'), result.get('url'), json.dumps(result, ensure_ascii=False),
+                 time.time(), key)
+            )
+            self._conn.commit()
+
+    def mark_failed(self, key, error):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE publishes SET status = ?, error = ?, updated_at = ? WHERE key = ?",
+                (FAILED, str(error)[:2000], time.time(), key)
+            )
+            self._conn.commit()
+
+    def published(self, blog_id=None):
+        """
+        게시 완료된 항목 목록 (title, post_id, url)을 반환합니다.
+        """
+        query = "SELECT title, post_id, url FROM publishes WHERE status = ?"
+        params = [PUBLISHED]
+        if blog_id is not None:
+            query += " AND blog_id = ?"
+            params.append(blog_id)
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
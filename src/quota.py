@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_QUOTA_PATH = os.path.join('.cache', 'quota.sqlite')
+
+BLOGGER = 'blogger'
+
+# 키(모델 이름 또는 'blogger')별 한도. rpm/tpm: 분당 요청/입력 토큰, rpd/tpd: 하루 요청/토큰. 없는 키는 제한 없이 기록만 합니다.
+# Gemini는 무료 등급 기준, Blogger는 프로젝트 기본 할당량 기준입니다.
+# 유료 등급 등 다른 한도는 QUOTA_LIMITS 환경 변수(JSON, 예: '{"gemini-2.5-flash": {"rpm": 1000}}')로 덮어씁니다.
+DEFAULT_LIMITS = {
+    'gemini-3-flash': {'rpm': 10, 'tpm': 250000, 'rpd': 250},
+    'gemini-2.5-flash': {'rpm': 10, 'tpm': 250000, 'rpd': 250},
+    'gemini-2.5-flash-lite': {'rpm': 15, 'tpm': 250000, 'rpd': 1000},
+    BLOGGER: {'rpm': 60, 'rpd': 10000},
+}
+
+
+class QuotaExceeded(Exception):
+    """
+    한도 안에서 처리할 수 없는 요청. retry_after는 다시 시도할 수 있을 때까지의 초 (하루 한도면 초기화 시각까지)
+    """
+
+    def __init__(self, key, limit, retry_after=None):
+        self.key = key
+        self.limit = limit
+        self.retry_after = retry_after
+        detail = f", {retry_after:.0f}초 후 가능" if retry_after is not None else ''
+        super().__init__(f"{key}: {limit} 한도 초과{detail}")
+
+
+def estimate_tokens(text):
+    """
+    호출 전 입력 토큰 수 추정치. (한국어가 섞인 프롬프트 기준 약 3자당 1토큰, 실제 값은 응답 후 보정)
+    """
+    return len(text) // 3 + 1
+
+
+def _pacific():
+    # Google API의 하루 할당량은 태평양 시간 자정에 초기화됩니다
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo('America/Los_Angeles')
+    except Exception:
+        return timezone(timedelta(hours=-8))
+
+
+_QUOTA_TZ = _pacific()
+
+
+def quota_day(now=None):
+    return datetime.fromtimestamp(now or time.time(), _QUOTA_TZ).strftime('%Y-%m-%d')
+
+
+def _seconds_until_reset(now):
+    local = datetime.fromtimestamp(now, _QUOTA_TZ)
+    tomorrow = (local + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(0.0, tomorrow.timestamp() - now)
+
+
+def load_limits(overrides=None):
+    """
+    기본 한도에 QUOTA_LIMITS 환경 변수(JSON)와 overrides를 키별로 덮어쓴 한도를 반환합니다.
+    """
+    limits = {key: dict(value) for key, value in DEFAULT_LIMITS.items()}
+    env = os.getenv('QUOTA_LIMITS')
+    extra = []
+    if env:
+        try:
+            extra.append(json.loads(env))
+        except ValueError as e:
+            print(f"--- [QUOTA] QUOTA_LIMITS 환경 변수를 읽지 못했습니다 ({e}). 기본 한도를 사용합니다. ---")
+    if overrides:
+        extra.append(overrides)
+    for source in extra:
+        for key, value in source.items():
+            limits.setdefault(key, {}).update(value)
+    return limits
+
+
+class QuotaManager:
+    """
+    호출 전 예약 방식의 속도 제한 + 하루 사용량 원장(SQLite).
+    reserve()는 분당 한도 안에서 요청을 보낼 수 있는 가장 이른 시각을 잡아 두고 그때까지의 대기 시간을 반환합니다.
+    예약 시각은 앞선 예약 뒤로만 잡히므로(FIFO), 동시에 요청한 호출들은 429를 받는 대신 순서대로 간격을 두고 실행됩니다.
+    예약과 사용량은 모두 SQLite에 있으므로 스레드, asyncio 작업, 워커 프로세스가 같은 한도를 나눠 씁니다.
+    (대기는 호출자가 합니다: 스레드는 time.sleep, asyncio는 asyncio.sleep)
+    """
+
+    def __init__(self, limits=None, path=DEFAULT_QUOTA_PATH, window=60.0):
+        self.limits = limits if limits is not None else load_limits()
+        self.path = path
+        # 분당 한도의 기준 시간(초). 벤치마크에서 짧게 줄여 씁니다.
+        self.window = window
+        # 예약 시각과 실제 전송 사이의 지연(스케줄링, 인증 등)이나 서버와의 시계 차이로 구간 경계에서 429가 나지 않도록
+        # 기준 시간의 1%(최소 50ms)를 더 기다림
+        self.margin = max(window * 0.01, 0.05)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 예약은 BEGIN IMMEDIATE 트랜잭션으로 직접 묶으므로 autocommit 모드로 엽니다
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS reservations (
+                key TEXT NOT NULL,
+                at REAL NOT NULL,
+                requests INTEGER NOT NULL,
+                tokens INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_reservations_key_at ON reservations (key, at);
+            CREATE TABLE IF NOT EXISTS usage (
+                key TEXT NOT NULL,
+                day TEXT NOT NULL,
+                requests INTEGER NOT NULL DEFAULT 0,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                rate_limited INTEGER NOT NULL DEFAULT 0,
+                waited REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (key, day)
+            );
+            """
+        )
+
+    def _window_rows(self, key, now):
+        # 기준 시간이 지난 예약은 더 이상 한도에 영향을 주지 않으므로 정리
+        self._conn.execute("DELETE FROM reservations WHERE key = ? AND at <= ?", (key, now - self.window))
+        return self._conn.execute(
+            "SELECT at, requests, tokens FROM reservations WHERE key = ? ORDER BY at", (key,)
+        ).fetchall()
+
+    def _schedule(self, rows, limits, requests, tokens, now):
+        """
+        (t - window, t] 구간의 예약 합계 + 이번 요청이 rpm/tpm을 넘지 않는 가장 이른 시각 t를 찾습니다.
+        t는 마지막 예약보다 앞서지 않으므로 t에서 끝나는 구간만 확인하면 됩니다.
+        """
+        checks = [(index, limits[kind], cost) for index, kind, cost in ((1, 'rpm', requests), (2, 'tpm', tokens))
+                  if limits.get(kind) and cost]
+        start = max([now] + [row[0] for row in rows])
+        if not checks:
+            return start
+        totals = {index: sum(row[index] for row in rows) for index, _, _ in checks}
+        i = 0
+        while True:
+            while i < len(rows) and rows[i][0] <= start - self.window:
+                for index in totals:
+                    totals[index] -= rows[i][index]
+                i += 1
+            if i == len(rows) or all(totals[index] + cost <= limit for index, limit, cost in checks):
+                # 구간이 비었는데도 넘는다면 요청 하나가 한도보다 큰 경우 (기다려도 소용없으므로 그대로 보냄)
+                return start
+            start = rows[i][0] + self.window + self.margin
+
+    def _usage(self, key, day):
+        row = self._conn.execute("SELECT requests, tokens FROM usage WHERE key = ? AND day = ?", (key, day)).fetchone()
+        return row or (0, 0)
+
+    def reserve(self, key, requests=1, tokens=0, max_wait=None):
+        """
+        requests건(입력 tokens개 추정)을 예약하고 실행 전에 기다려야 할 초를 반환합니다.
+        하루 한도를 넘거나 대기 시간이 max_wait를 넘으면 예약하지 않고 QuotaExceeded를 발생시킵니다.
+        """
+        limits = self.limits.get(key, {})
+        now = time.time()
+        day = quota_day(now)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                used_requests, used_tokens = self._usage(key, day)
+                if limits.get('rpd') and used_requests + requests > limits['rpd']:
+                    raise QuotaExceeded(key, 'rpd', _seconds_until_reset(now))
+                if limits.get('tpd') and used_tokens + tokens > limits['tpd']:
+                    raise QuotaExceeded(key, 'tpd', _seconds_until_reset(now))
+
+                at = self._schedule(self._window_rows(key, now), limits, requests, tokens, now)
+                wait = at - now
+                if max_wait is not None and wait > max_wait:
+                    raise QuotaExceeded(key, 'rpm/tpm', wait)
+
+                self._conn.execute("INSERT INTO reservations (key, at, requests, tokens) VALUES (?, ?, ?, ?)",
+                                   (key, at, requests, tokens))
+                self._conn.execute(
+                    "INSERT INTO usage (key, day, requests, tokens, waited) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key, day) DO UPDATE SET requests = requests + excluded.requests, "
+                    "tokens = tokens + excluded.tokens, waited = waited + excluded.waited",
+                    (key, day, requests, tokens, wait)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def acquire(self, key, requests=1, tokens=0, max_wait=None):
+        """
+        예약 후 실행 가능한 시각까지 기다립니다. (스레드용)
+        """
+        wait = self.reserve(key, requests, tokens, max_wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def reserve_async(self, key, requests=1, tokens=0, max_wait=None):
+        """
+        reserve의 비동기 버전. 다른 프로세스와의 잠금 대기(BEGIN IMMEDIATE)가 이벤트 루프를 막지 않도록 스레드에서 예약합니다.
+        """
+        return await asyncio.to_thread(self.reserve, key, requests, tokens, max_wait)
+
+    async def acquire_async(self, key, requests=1, tokens=0, max_wait=None):
+        """
+        예약 후 실행 가능한 시각까지 asyncio.sleep으로 기다립니다. (asyncio 작업용)
+        """
+        wait = await self.reserve_async(key, requests, tokens, max_wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record(self, key, tokens, estimated=0):
+        """
+        응답의 실제 토큰 수로 예약 때의 추정치를 보정합니다.
+        """
+        delta = int(tokens or 0) - int(estimated or 0)
+        if not delta:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("INSERT INTO reservations (key, at, requests, tokens) VALUES (?, ?, 0, ?)",
+                                   (key, now, delta))
+                self._conn.execute(
+                    "INSERT INTO usage (key, day, tokens) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key, day) DO UPDATE SET tokens = tokens + excluded.tokens",
+                    (key, quota_day(now), delta)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def record_rate_limited(self, key):
+        """
+        예약했는데도 429를 받았다면 실제 한도가 설정보다 낮거나 다른 클라이언트가 같은 할당량을 쓰고 있는 것입니다.
+        현재 구간을 가득 찬 것으로 표시해 이후 호출이 구간이 지나갈 때까지 기다리도록 합니다.
+        """
+        limits = self.limits.get(key, {})
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if limits.get('rpm'):
+                    used = sum(row[1] for row in self._window_rows(key, now) if row[0] <= now)
+                    if used < limits['rpm']:
+                        self._conn.execute("INSERT INTO reservations (key, at, requests, tokens) VALUES (?, ?, ?, 0)",
+                                           (key, now, limits['rpm'] - used))
+                self._conn.execute(
+                    "INSERT INTO usage (key, day, rate_limited) VALUES (?, ?, 1) "
+                    "ON CONFLICT(key, day) DO UPDATE SET rate_limited = rate_limited + 1",
+                    (key, quota_day(now))
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def usage(self, day=None):
+        """
+        하루 사용량을 {키: {requests, tokens, rate_limited, waited, 한도...}}로 반환합니다.
+        """
+        day = day or quota_day()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, requests, tokens, rate_limited, waited FROM usage WHERE day = ? ORDER BY key", (day,)
+            ).fetchall()
+        report = {}
+        for key, requests, tokens, rate_limited, waited in rows:
+            report[key] = dict(self.limits.get(key, {}), requests=requests, tokens=tokens,
+                               rate_limited=rate_limited, waited=round(waited, 1))
+        return report
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
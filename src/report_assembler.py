@@ -0,0 +1,54 @@
+import re
+from src import postprocess
+
+# 조립 단계에서 한 번만 적용하는 공통 인라인 스타일 (섹션별 생성 결과의 스타일 편차를 맞춤)
+CONTAINER_STYLE = ("font-family: -apple-system, BlinkMacSystemFont, 'Noto Sans KR', sans-serif; color: #333; "
+                   "line-height: 1.7; max-width: 760px; margin: 0 auto;")
+H2_STYLE = "font-size: 1.25rem; color: #202124; border-bottom: 1px solid #dadce0; padding-bottom: 0.3rem;"
+NAV_STYLE = "background: #f8f9fa; border: 1px solid #dadce0; border-radius: 8px; padding: 1rem; margin: 1.5rem 0;"
+FOOTER_STYLE = "color: #5f6368; font-size: 0.8rem; margin-top: 2rem; border-top: 1px solid #dadce0; padding-top: 1rem;"
+
+AUTHOR = '우디(Woody), 실전 투자 분석가'
+DISCLAIMER = ('본 글은 투자 권유가 아니며, 모든 투자 판단의 책임은 투자자 본인에게 있습니다. '
+              '수치는 작성 시점의 공개 자료를 기준으로 하며 이후 달라질 수 있습니다.')
+
+_TAGS_DIV_RE = re.compile(r'<div id="tags"[^>]*>.*?</div>', re.DOTALL)
+_LEADING_H2_RE = re.compile(r'^\s*<h2[^>]*>.*?</h2>', re.IGNORECASE | re.DOTALL)
+# 섹션이 임의로 넣은 문서 태그는 제거 (<body> 내부 콘텐츠만 허용)
+_DOC_TAGS_RE = re.compile(r'</?(?:html|head|body)[^>]*>', re.IGNORECASE)
+
+
+def _clean_part(text):
+    return _DOC_TAGS_RE.sub('', postprocess.clean_html(text)).strip()
+
+
+def assemble(header, sections, date):
+    """
+    따로 생성한 조각을 Phase 1~5 구조의 본문 하나로 조립합니다.
+    header: Phase 1 메타 헤더 HTML, sections: [(키, 이름, HTML), ...] (Phase 3 순서)
+    Phase 2 목차와 Phase 4 푸터는 여기서 한 번만 만들고, 태그 div는 맨 끝으로 옮깁니다.
+    """
+    header = _clean_part(header)
+    tags = _TAGS_DIV_RE.search(header)
+    header = _TAGS_DIV_RE.sub('', header).strip()
+
+    toc = ''.join(f'<li><a href="#sec-{key}" style="color: #1a73e8; text-decoration: none;">{name}</a></li>'
+                  for key, name, _ in sections)
+    parts = [
+        f'<div style="{CONTAINER_STYLE}">',
+        header,
+        f'<nav style="{NAV_STYLE}"><strong>목차</strong>'
+        f'<ol style="margin: 0.5rem 0 0 1.2rem; padding: 0;">{toc}</ol></nav>',
+    ]
+    for key, name, html in sections:
+        # 지시와 달리 제목/태그/문서 태그를 넣은 경우 조립 단계의 것만 남김
+        body = _TAGS_DIV_RE.sub('', _LEADING_H2_RE.sub('', _clean_part(html), count=1)).strip()
+        parts.append(f'<h2 id="sec-{key}" style="{H2_STYLE}">{name}</h2>\n{body}')
+    parts.append(
+        f'<div style="{FOOTER_STYLE}"><p style="margin: 0 0 0.3rem;">{DISCLAIMER}</p>'
+        f'<p style="margin: 0;">업데이트: {date} · 작성자: {AUTHOR}</p></div>'
+    )
+    if tags:
+        parts.append(tags.group(0))
+    parts.append('</div>')
+    return '\n\n'.join(parts)
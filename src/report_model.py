@@ -0,0 +1,156 @@
+import json
+from dataclasses import dataclass, field, asdict
+
+# 구조화 리포트: Gemini가 HTML 대신 아래 스키마의 JSON을 출력하고, 렌더러(report_render)가 HTML을 만듭니다.
+# 제목/태그를 정규식으로 긁어낼 필요가 없고, 같은 리포트를 다른 형식(AMP 등)으로도 바로 렌더링할 수 있습니다.
+
+TRENDS = ('up', 'down', 'neutral')
+RATINGS = ('buy', 'hold', 'sell')
+
+_STRING = {'type': 'STRING'}
+_STRINGS = {'type': 'ARRAY', 'items': _STRING}
+
+# generate_content의 response_schema (OpenAPI 스키마 부분집합, propertyOrdering으로 출력 순서를 고정)
+RESPONSE_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'title': _STRING,
+        'subtitle': _STRING,
+        'rating': {'type': 'STRING', 'enum': list(RATINGS)},
+        'key_points': _STRINGS,
+        'metrics': {'type': 'ARRAY', 'items': {
+            'type': 'OBJECT',
+            'properties': {'label': _STRING, 'value': _STRING, 'trend': {'type': 'STRING', 'enum': list(TRENDS)}},
+            'required': ['label', 'value'],
+            'propertyOrdering': ['label', 'value', 'trend'],
+        }},
+        'sections': {'type': 'ARRAY', 'items': {
+            'type': 'OBJECT',
+            'properties': {
+                'heading': _STRING,
+                'paragraphs': _STRINGS,
+                'tables': {'type': 'ARRAY', 'items': {
+                    'type': 'OBJECT',
+                    'properties': {'caption': _STRING, 'columns': _STRINGS,
+                                   'rows': {'type': 'ARRAY', 'items': _STRINGS}},
+                    'required': ['columns', 'rows'],
+                    'propertyOrdering': ['caption', 'columns', 'rows'],
+                }},
+            },
+            'required': ['heading', 'paragraphs'],
+            'propertyOrdering': ['heading', 'paragraphs', 'tables'],
+        }},
+        'tags': _STRINGS,
+    },
+    'required': ['title', 'rating', 'key_points', 'metrics', 'sections', 'tags'],
+    'propertyOrdering': ['title', 'subtitle', 'rating', 'key_points', 'metrics', 'sections', 'tags'],
+}
+
+
+@dataclass(slots=True)
+class Metric:
+    label: str
+    value: str
+    trend: str = 'neutral'
+
+
+@dataclass(slots=True)
+class Table:
+    columns: list
+    rows: list
+    caption: str = ''
+
+
+@dataclass(slots=True)
+class Section:
+    heading: str
+    paragraphs: list
+    tables: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Report:
+    title: str
+    rating: str
+    key_points: list
+    metrics: list
+    sections: list
+    tags: list
+    subtitle: str = ''
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ''
+
+
+def _texts(values):
+    if not isinstance(values, list):
+        return []
+    return [t for t in (_text(v) for v in values) if t]
+
+
+def _table(data):
+    columns = _texts(data.get('columns'))
+    if not columns:
+        return None
+    rows = []
+    for row in data.get('rows') or []:
+        if not isinstance(row, list):
+            continue
+        # 열 수가 다른 행은 빈 칸으로 채우거나 잘라서 표 모양을 유지
+        cells = [_text(c) if isinstance(c, str) else str(c) for c in row[:len(columns)]]
+        rows.append(cells + [''] * (len(columns) - len(cells)))
+    return Table(columns=columns, rows=rows, caption=_text(data.get('caption')))
+
+
+def parse_report(text):
+    """
+    JSON 응답을 Report로 변환합니다. 코드 펜스는 제거하고, 알 수 없는 등급/추세 값은 기본값으로 바꿉니다.
+    JSON이 아니거나 제목/섹션이 없으면 ValueError를 발생시킵니다.
+    """
+    cleaned = text.strip()
+    if cleaned.startswith('```'):
+        cleaned = cleaned.split('\n', 1)[1] if '\n' in cleaned else ''
+        if cleaned.rstrip().endswith('```'):
+            cleaned = cleaned.rstrip()[:-3]
+    try:
+        data = json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"리포트 JSON 형식 오류 ({e})")
+    if not isinstance(data, dict):
+        raise ValueError("리포트 JSON이 객체가 아닙니다")
+
+    title = _text(data.get('title'))
+    if not title:
+        raise ValueError("리포트에 title이 없습니다")
+    sections = []
+    for s in data.get('sections') or []:
+        if not isinstance(s, dict) or not _text(s.get('heading')):
+            continue
+        tables = [t for t in (_table(t) for t in s.get('tables') or [] if isinstance(t, dict)) if t]
+        sections.append(Section(heading=_text(s['heading']), paragraphs=_texts(s.get('paragraphs')), tables=tables))
+    if not sections:
+        raise ValueError("리포트에 sections가 없습니다")
+
+    metrics = []
+    for m in data.get('metrics') or []:
+        if isinstance(m, dict) and _text(m.get('label')) and _text(m.get('value')):
+            trend = m.get('trend') if m.get('trend') in TRENDS else 'neutral'
+            metrics.append(Metric(label=_text(m['label']), value=_text(m['value']), trend=trend))
+
+    rating = data.get('rating') if data.get('rating') in RATINGS else 'hold'
+    return Report(
+        title=title,
+        rating=rating,
+        key_points=_texts(data.get('key_points')),
+        metrics=metrics,
+        sections=sections,
+        tags=list(dict.fromkeys(t.lstrip('#') for t in _texts(data.get('tags')))),
+        subtitle=_text(data.get('subtitle')),
+    )
@@ -0,0 +1,151 @@
+from datetime import datetime
+from html import escape
+from src import metrics
+from src.html_minifier import normalize_style
+from src.postprocess import PostResult, MAX_TAGS
+from src.report_assembler import CONTAINER_STYLE, H2_STYLE, NAV_STYLE, FOOTER_STYLE, AUTHOR, DISCLAIMER
+
+# 구조화 리포트(report_model.Report) → Blogger HTML / AMP 문서 렌더러.
+# 스타일 문자열은 import 시 한 번만 축소해 두므로 렌더링 결과는 축소 단계를 거치지 않아도 됩니다.
+
+
+def _s(style):
+    return normalize_style(style)
+
+
+_CONTAINER = _s(CONTAINER_STYLE)
+_H1 = _s("font-size: 1.6rem; color: #1a73e8; margin-bottom: 0.5rem;")
+_SUBTITLE = _s("color: #5f6368; font-size: 0.9rem;")
+_BADGE = "display:inline-block;padding:0.2rem 0.7rem;border-radius:1rem;color:#fff;font-weight:bold;background:"
+_POINTS = _s("background: #e8f0fe; border-left: 4px solid #1a73e8; padding: 1rem; margin: 1.5rem 0;")
+_POINTS_UL = _s("margin: 0.5rem 0 0 1rem; padding: 0;")
+_NAV = _s(NAV_STYLE)
+_NAV_OL = _s("margin: 0.5rem 0 0 1.2rem; padding: 0;")
+_NAV_A = _s("color: #1a73e8; text-decoration: none;")
+_CARD = _s("display: inline-block; width: 30%; min-width: 160px; padding: 1rem; margin: 0.3rem; "
+           "border: 1px solid #dadce0; border-radius: 8px; background: #fff;")
+_CARD_LABEL = _s("color: #5f6368; font-size: 0.8rem;")
+_CARD_VALUE = "font-size:1.4rem;color:"
+_H2 = _s(H2_STYLE)
+_TABLE = _s("width: 100%; border-collapse: collapse; margin: 1rem 0; font-size: 0.9rem;")
+_CAPTION = _s("caption-side: top; text-align: left; color: #5f6368; font-size: 0.8rem; padding-bottom: 0.3rem;")
+_TH = _s("padding: 0.6rem; text-align: left; border-bottom: 2px solid #dadce0; background: #f1f3f4;")
+_TD = _s("padding: 0.6rem; border-bottom: 1px solid #f1f3f4;")
+_FOOTER = _s(FOOTER_STYLE)
+
+RATING_LABELS = {'buy': ('매수', '#188038'), 'hold': ('보유', '#f29900'), 'sell': ('매도', '#d93025')}
+TREND_MARKS = {'up': ('▲', '#188038'), 'down': ('▼', '#d93025'), 'neutral': ('―', '#1a73e8')}
+
+
+def _table(table, th=_TH, td=_TD, table_attr=f' style="{_TABLE}"', caption_attr=f' style="{_CAPTION}"'):
+    parts = [f'<table class="tst-financial-table"{table_attr}>']
+    if table.caption:
+        parts.append(f'<caption{caption_attr}>{escape(table.caption)}</caption>')
+    th_attr = f' style="{th}"' if th else ''
+    td_attr = f' style="{td}"' if td else ''
+    parts.append('<thead><tr>' + ''.join(f'<th{th_attr}>{escape(c)}</th>' for c in table.columns) + '</tr></thead><tbody>')
+    for row in table.rows:
+        parts.append('<tr>' + ''.join(f'<td{td_attr}>{escape(c)}</td>' for c in row) + '</tr>')
+    parts.append('</tbody></table>')
+    return ''.join(parts)
+
+
+def render_blogger(report, date=None):
+    """
+    Blogger 본문 HTML을 만듭니다. 섹션 분할 생성의 조립 결과(report_assembler.assemble)와 같은
+    Phase 1~4 구조(헤더 → 목차 → 본문 섹션 → 푸터)와 공통 스타일을 사용하고, 모든 텍스트는 이스케이프합니다.
+    """
+    date = date or datetime.now().strftime('%Y-%m-%d')
+    rating, rating_color = RATING_LABELS[report.rating]
+    parts = [f'<div style="{_CONTAINER}"><h1 style="{_H1}">{escape(report.title)}</h1>']
+    if report.subtitle:
+        parts.append(f'<p style="{_SUBTITLE}">{escape(report.subtitle)}</p>')
+    parts.append(f'<p>투자 등급 <span style="{_BADGE}{rating_color}">{rating}</span></p>')
+    if report.key_points:
+        parts.append(f'<div style="{_POINTS}"><strong>핵심 포인트</strong><ul style="{_POINTS_UL}">'
+                     + ''.join(f'<li>{escape(p)}</li>' for p in report.key_points) + '</ul></div>')
+    toc = ''.join(f'<li><a href="#sec-{i}" style="{_NAV_A}">{escape(s.heading)}</a></li>'
+                  for i, s in enumerate(report.sections, 1))
+    parts.append(f'<nav style="{_NAV}"><strong>목차</strong><ol style="{_NAV_OL}">{toc}</ol></nav>')
+    for m in report.metrics:
+        mark, color = TREND_MARKS[m.trend]
+        parts.append(f'<div class="metric-card" style="{_CARD}"><span style="{_CARD_LABEL}">{escape(m.label)}</span><br>'
+                     f'<strong style="{_CARD_VALUE}{color}">{mark} {escape(m.value)}</strong></div>')
+    for i, section in enumerate(report.sections, 1):
+        parts.append(f'<h2 id="sec-{i}" style="{_H2}">{escape(section.heading)}</h2>')
+        parts.extend(f'<p>{escape(p)}</p>' for p in section.paragraphs)
+        parts.extend(_table(t) for t in section.tables)
+    parts.append(f'<div style="{_FOOTER}"><p style="margin:0 0 0.3rem">{DISCLAIMER}</p>'
+                 f'<p style="margin:0">업데이트: {date} · 작성자: {AUTHOR}</p></div>')
+    if report.tags:
+        parts.append(f'<div id="tags" style="display:none">{escape(", ".join(report.tags))}</div>')
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+# AMP는 인라인 style 속성 대신 <style amp-custom> 하나에 클래스 스타일을 모아야 합니다.
+AMP_BOILERPLATE = (
+    '<style amp-boilerplate>body{-webkit-animation:-amp-start 8s steps(1,end) 0s 1 normal both;'
+    '-moz-animation:-amp-start 8s steps(1,end) 0s 1 normal both;-ms-animation:-amp-start 8s steps(1,end) 0s 1 normal both;'
+    'animation:-amp-start 8s steps(1,end) 0s 1 normal both}@-webkit-keyframes -amp-start{from{visibility:hidden}'
+    'to{visibility:visible}}@-moz-keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}'
+    '@-ms-keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}@-o-keyframes -amp-start'
+    '{from{visibility:hidden}to{visibility:visible}}@keyframes -amp-start{from{visibility:hidden}to{visibility:visible}}'
+    '</style><noscript><style amp-boilerplate>body{-webkit-animation:none;-moz-animation:none;-ms-animation:none;'
+    'animation:none}</style></noscript>'
+)
+AMP_CSS = (
+    f'body{{{_CONTAINER};padding:0 1rem}}h1{{{_H1}}}h2{{{_H2}}}.sub{{{_SUBTITLE}}}.badge{{{_BADGE}#1a73e8}}'
+    f'.buy{{background:#188038}}.hold{{background:#f29900}}.sell{{background:#d93025}}'
+    f'.points{{{_POINTS}}}.points ul{{{_POINTS_UL}}}nav{{{_NAV}}}nav ol{{{_NAV_OL}}}nav a{{{_NAV_A}}}'
+    f'.card{{{_CARD}}}.card span{{{_CARD_LABEL}}}.card strong{{font-size:1.4rem}}'
+    f'.up{{color:#188038}}.down{{color:#d93025}}.neutral{{color:#1a73e8}}'
+    f'table{{{_TABLE}}}caption{{{_CAPTION}}}th{{{_TH}}}td{{{_TD}}}footer{{{_FOOTER}}}footer p{{margin:0 0 0.3rem}}'
+)
+
+
+def render_amp(report, canonical_url, date=None, language='ko'):
+    """
+    같은 리포트를 AMP 문서 하나로 렌더링합니다. canonical_url은 Blogger 게시글 주소입니다.
+    """
+    date = date or datetime.now().strftime('%Y-%m-%d')
+    rating, _ = RATING_LABELS[report.rating]
+    parts = [
+        f'<!doctype html><html amp lang="{escape(language)}"><head><meta charset="utf-8">'
+        f'<script async src="https://cdn.ampproject.org/v0.js"></script>'
+        f'<title>{escape(report.title)}</title><link rel="canonical" href="{escape(canonical_url)}">'
+        f'<meta name="viewport" content="width=device-width">'
+        f'{AMP_BOILERPLATE}<style amp-custom>{AMP_CSS}</style></head><body>',
+        f'<h1>{escape(report.title)}</h1>',
+    ]
+    if report.subtitle:
+        parts.append(f'<p class="sub">{escape(report.subtitle)}</p>')
+    parts.append(f'<p>투자 등급 <span class="badge {report.rating}">{rating}</span></p>')
+    if report.key_points:
+        parts.append('<div class="points"><strong>핵심 포인트</strong><ul>'
+                     + ''.join(f'<li>{escape(p)}</li>' for p in report.key_points) + '</ul></div>')
+    toc = ''.join(f'<li><a href="#sec-{i}">{escape(s.heading)}</a></li>' for i, s in enumerate(report.sections, 1))
+    parts.append(f'<nav><strong>목차</strong><ol>{toc}</ol></nav>')
+    for m in report.metrics:
+        mark, _ = TREND_MARKS[m.trend]
+        parts.append(f'<div class="card"><span>{escape(m.label)}</span><br>'
+                     f'<strong class="{m.trend}">{mark} {escape(m.value)}</strong></div>')
+    for i, section in enumerate(report.sections, 1):
+        parts.append(f'<h2 id="sec-{i}">{escape(section.heading)}</h2>')
+        parts.extend(f'<p>{escape(p)}</p>' for p in section.paragraphs)
+        parts.extend(_table(t, th=None, td=None, table_attr='', caption_attr='') for t in section.tables)
+    parts.append(f'<footer><p>{DISCLAIMER}</p><p>업데이트: {date} · 작성자: {AUTHOR}</p></footer></body></html>')
+    return ''.join(parts)
+
+
+def render_post(report, raw_chars=0, date=None):
+    """
+    구조화 리포트에서 업로드용 PostResult를 만듭니다. 제목과 태그는 리포트 필드를 그대로 사용합니다.
+    """
+    with metrics.span('render', sections=len(report.sections)) as sp:
+        body = render_blogger(report, date)
+        sp.set(chars=len(body))
+    tables = sum(len(s.tables) for s in report.sections)
+    tags = report.tags[:MAX_TAGS]
+    stats = {'chars': len(body), 'tables': tables, 'tags': len(tags), 'raw_chars': raw_chars, 'structured': True}
+    return PostResult(title=report.title, tags=tags, body=body, stats=stats, report=report)
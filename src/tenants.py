@@ -0,0 +1,145 @@
+import os
+import threading
+import tomllib
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from src.blogger_client import BloggerClient
+from src.batch_runner import load_topics
+
+# 여러 블로그 설정 파일 예시 (blogs.toml)
+#
+#   base_language = "ko"            # 생성 프롬프트의 언어. 다른 언어 블로그에는 현지화한 글을 게시
+#
+#   [defaults]                      # 모든 블로그에 적용 (블로그 항목에서 덮어씀)
+#   client_id_env = "CLIENT_ID"     # 비밀 값은 환경 변수 이름(<필드>_env)으로 지정
+#   client_secret_env = "CLIENT_SECRET"
+#   draft = true                  # 초안으로 올림 (기본값 false: 단일/배치 모드처럼 바로 게시)
+#
+#   [[blog]]
+#   name = "woody-kr"
+#   blog_id = "1234567890"
+#   refresh_token_env = "REFRESH_TOKEN"
+#   labels = ["미국주식"]
+#
+#   [[blog]]
+#   name = "woody-en"
+#   blog_id = "9876543210"
+#   refresh_token_env = "EN_REFRESH_TOKEN"
+#   language = "en"
+#   topics_file = "topics_en.txt"   # 이 블로그에만 게시할 주제 (설정 파일 기준 상대 경로)
+
+SECRET_FIELDS = ('client_id', 'client_secret', 'refresh_token')
+
+
+@dataclass
+class Tenant:
+    name: str
+    blog_id: str
+    client_id: str
+    client_secret: str
+    refresh_token: str
+    language: str = 'ko'
+    labels: list = field(default_factory=list)
+    draft: bool = False
+    topics: list = field(default_factory=list)
+    api_endpoint: str = None
+
+
+def _resolve(entry, name, key):
+    value = entry.get(key)
+    if not value and entry.get(f"{key}_env"):
+        value = os.getenv(entry[f"{key}_env"])
+    if not value:
+        hint = f" (환경 변수 {entry[f'{key}_env']} 없음)" if entry.get(f"{key}_env") else ''
+        raise ValueError(f"블로그 '{name}': {key} 값이 없습니다{hint}")
+    return str(value)
+
+
+def load_tenants(path):
+    """
+    블로그 설정 파일(TOML)을 읽어 (Tenant 목록, 기준 언어)를 반환합니다.
+    설정이 잘못되면 ValueError를 발생시킵니다.
+    """
+    with open(path, 'rb') as f:
+        try:
+            data = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"{path}: TOML 형식 오류 ({e})")
+    base_language = data.get('base_language', 'ko')
+    defaults = data.get('defaults', {})
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    tenants = []
+    for i, blog in enumerate(data.get('blog', [])):
+        entry = dict(defaults, **blog)
+        name = entry.get('name') or f"blog-{i + 1}"
+        blog_id = str(entry.get('blog_id') or '')
+        if not blog_id.isdigit():
+            raise ValueError(f"블로그 '{name}': blog_id는 숫자여야 합니다")
+        topics = list(entry.get('topics', []))
+        if entry.get('topics_file'):
+            topics += load_topics(os.path.join(base_dir, entry['topics_file']))
+        tenants.append(Tenant(
+            name=name,
+            blog_id=blog_id,
+            **{key: _resolve(entry, name, key) for key in SECRET_FIELDS},
+            language=entry.get('language', base_language),
+            labels=list(entry.get('labels', [])),
+            draft=bool(entry.get('draft', False)),
+            topics=topics,
+            api_endpoint=entry.get('api_endpoint'),
+        ))
+
+    if not tenants:
+        raise ValueError(f"{path}: [[blog]] 항목이 없습니다")
+    names = [t.name for t in tenants]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: 블로그 name이 중복되었습니다")
+    return tenants, base_language
+
+
+class BloggerPool:
+    """
+    블로그(테넌트)별 BloggerClient를 한 번씩 만들어 재사용합니다.
+    클라이언트가 액세스 토큰, 서비스 객체, 스레드별 keep-alive 연결을 유지하므로
+    warm()으로 토큰 발급과 서비스 생성을 미리 해 두면 게시 요청이 인증 없이 바로 나갑니다.
+    게시 원장(ledger)과 할당량(quota)은 모든 블로그가 함께 씁니다. (원장 키에 blog_id가 포함됨)
+    """
+
+    def __init__(self, tenants, ledger=None, quota=None):
+        self.tenants = {t.name: t for t in tenants}
+        self.ledger = ledger
+        self.quota = quota
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant):
+        with self._lock:
+            client = self._clients.get(tenant.name)
+            if client is None:
+                client = BloggerClient(tenant.client_id, tenant.client_secret, tenant.refresh_token,
+                                       tenant.blog_id, api_endpoint=tenant.api_endpoint, ledger=self.ledger)
+                client.quota = self.quota
+                self._clients[tenant.name] = client
+            return client
+
+    def _warm_one(self, tenant):
+        try:
+            client = self.get(tenant)
+            client.ensure_token()
+            client.get_service()
+            return None
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+
+    def warm(self, max_workers=8):
+        """
+        모든 블로그의 토큰 발급과 서비스 생성을 동시에 미리 해 둡니다. 반환: {이름: 오류 또는 None}
+        """
+        tenants = list(self.tenants.values())
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tenants)))) as executor:
+            errors = list(executor.map(self._warm_one, tenants))
+        for tenant, error in zip(tenants, errors):
+            if error:
+                print(f"--- [{tenant.name}] 인증 준비 실패: {error} ---")
+        return {tenant.name: error for tenant, error in zip(tenants, errors)}
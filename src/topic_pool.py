@@ -0,0 +1,311 @@
+import os
+import re
+import time
+import random
+import sqlite3
+import threading
+
+DEFAULT_POOL_PATH = os.path.join('.cache', 'topics.sqlite')
+
+TOPIC_BATCH_PROMPT = """
+        당신은 금융 시장 트렌드 스카우터입니다.
+        다음 조건에 맞는 **상장 기업 {count}곳**을 화제성 순위대로 추천해주세요. (S&P 500 지수 포함 기업 위주)
+
+        **조건**:
+        1. 최근 주요 금융 뉴스나 Reddit에서 화제가 되고 있는 기업.
+        2. 메이저 빅테크(NVDA, AAPL 등) 제외.
+        3. 최근에 이미 다룬 기업 제외: {exclude}
+
+        **결과물**: 한 줄에 하나씩 오직 **기업명(티커)** 만 출력하세요. 번호나 설명은 쓰지 마세요. (예: Ford Motor (F))
+        """
+
+# 프롬프트에서 제외한 메이저 빅테크. 모델이 그래도 추천하면 버립니다.
+EXCLUDED_TICKERS = {'NVDA', 'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'META', 'TSLA'}
+
+# 모델 호출이 모두 실패하고 후보도 남지 않았을 때 사용할 기업 (빅테크 제외, 아직 다루지 않은 것부터)
+FALLBACK_TOPICS = [
+    'Ford Motor (F)', 'Caterpillar (CAT)', 'Costco Wholesale (COST)', 'Walt Disney (DIS)',
+    'Nike (NKE)', 'Starbucks (SBUX)', 'Boeing (BA)', 'Pfizer (PFE)', 'Intel (INTC)',
+    'PayPal (PYPL)', 'Target (TGT)', 'Delta Air Lines (DAL)', 'Deere & Company (DE)',
+    'Chevron (CVX)', "McDonald's (MCD)", 'Verizon (VZ)',
+]
+
+BACKLOG = 'backlog'
+# 꺼내서 생성 중인 후보. 게시되면(mark_covered) used, 실패하면(release) 또는 예약 시간이 지나면 다시 backlog로 취급
+RESERVED = 'reserved'
+USED = 'used'
+SKIPPED = 'skipped'
+
+# 꺼낼 수 있는 후보: backlog 또는 예약 시간이 지난 예약 (매개변수: BACKLOG, RESERVED, 예약 만료 기준 시각)
+_AVAILABLE = "(status = ? OR (status = ? AND reserved_at < ?))"
+
+_TICKER_RE = re.compile(r'^[A-Z]{1,5}(?:\.[A-Z]{1,2})?$')
+_EXCHANGE_RE = re.compile(r'^(?:NYSE|NASDAQ|NASDAQGS|NASDAQGM|AMEX|NYSEARCA|OTC|TSX)\s*[:\-]\s*', re.IGNORECASE)
+# "기업명 (티커)" 형태에서 괄호 안
+_PAREN_RE = re.compile(r'\(([^()]{1,20})\)')
+_LIST_PREFIX_RE = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s*')
+
+
+def normalize_ticker(raw):
+    """
+    '$brk-b', 'NYSE: F', 'AAPL.US' 같은 표기를 'BRK.B', 'F', 'AAPL'로 맞춥니다. 티커가 아니면 None.
+    """
+    if not raw:
+        return None
+    ticker = _EXCHANGE_RE.sub('', raw.strip()).lstrip('$').strip().upper()
+    if ticker.endswith('.US'):
+        ticker = ticker[:-3]
+    ticker = ticker.replace('-', '.').replace('/', '.')
+    return ticker if _TICKER_RE.match(ticker) else None
+
+
+def parse_candidate(line):
+    """
+    모델 출력 한 줄에서 (기업명, 티커)를 구합니다. 형식이 맞지 않으면 None.
+    """
+    line = _LIST_PREFIX_RE.sub('', line.strip().strip('*'))
+    match = None
+    for match in _PAREN_RE.finditer(line):
+        pass
+    if match is None:
+        return None
+    ticker = normalize_ticker(match.group(1))
+    name = line[:match.start()].strip(' *:-')
+    if not ticker or not name:
+        return None
+    return name, ticker
+
+
+def ticker_from_title(title):
+    """
+    게시글 제목의 괄호에서 티커를 찾습니다. 예: '포드 모터 (F): 배당이 버티는 이유' → 'F'
+    """
+    for match in _PAREN_RE.finditer(title or ''):
+        ticker = normalize_ticker(match.group(1))
+        if ticker:
+            return ticker
+    return None
+
+
+class TopicPool:
+    """
+    추천 후보 backlog와 이미 다룬 기업 색인(SQLite).
+    모델에 한 번에 여러 후보를 받아 두고, 실행마다 이미 다룬 티커를 건너뛰며 하나씩 꺼냅니다.
+    색인은 티커를 기본 키로 조회하므로 과거 게시글이 수천 개여도 조회 비용이 거의 늘지 않습니다.
+    꺼낸 후보는 게시가 확인될 때까지 예약 상태로 두므로, 생성/업로드가 실패해도 후보를 잃지 않습니다.
+    """
+
+    def __init__(self, path=DEFAULT_POOL_PATH, batch_size=10, max_age_seconds=3 * 24 * 3600,
+                 reserve_seconds=6 * 3600):
+        self.path = path
+        # 추천 호출 한 번에 받을 후보 수 (backlog가 비었을 때만 호출)
+        self.batch_size = batch_size
+        # 화제성 기반 후보이므로 오래된 후보는 사용하지 않음
+        self.max_age_seconds = max_age_seconds
+        # 실패를 알리지 못하고 종료된 실행의 예약은 이 시간이 지나면 풀림
+        self.reserve_seconds = reserve_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS candidates (
+                ticker TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                reserved_at REAL
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(candidates)")}
+        if 'reserved_at' not in columns:
+            # 예약 상태가 생기기 전에 만든 파일
+            self._conn.execute("ALTER TABLE candidates ADD COLUMN reserved_at REAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS covered (
+                ticker TEXT PRIMARY KEY,
+                title TEXT,
+                source TEXT NOT NULL,
+                covered_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates(status, fetched_at)")
+        self._conn.commit()
+
+    # --- 이미 다룬 기업 색인 ---
+
+    def is_covered(self, ticker):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM covered WHERE ticker = ?", (ticker,)).fetchone() is not None
+
+    def mark_covered(self, ticker, title=None, source='publish'):
+        if not ticker:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO covered (ticker, title, source, covered_at) VALUES (?, ?, ?, ?)",
+                (ticker, title, source, time.time())
+            )
+            self._conn.execute("UPDATE candidates SET status = ? WHERE ticker = ? AND status = ?",
+                               (USED, ticker, RESERVED))
+            self._conn.commit()
+
+    def index_titles(self, titles, source):
+        """
+        게시글 제목 목록에서 티커를 추출해 색인에 추가하고, 새로 추가된 개수를 반환합니다.
+        """
+        now = time.time()
+        rows = [(ticker, title, source, now) for title in titles for ticker in [ticker_from_title(title)] if ticker]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO covered (ticker, title, source, covered_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def index_ledger(self, ledger, blog_id=None):
+        """
+        게시 원장(PublishLedger)의 게시 완료 기록으로 색인을 채웁니다. (로컬 조회만 함)
+        """
+        return self.index_titles([title for title, _, _ in ledger.published(blog_id)], 'ledger')
+
+    def index_blogger(self, blogger):
+        """
+        Blogger posts.list(제목만)로 블로그 전체 글을 색인합니다. 최초 한 번이면 충분합니다.
+        """
+        return self.index_titles((post.get('title') for post in blogger.iter_posts(
+            fields='nextPageToken,items(title)'
+        )), 'blogger')
+
+    def covered_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM covered").fetchone()[0]
+
+    def recent_covered(self, limit=30):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ticker FROM covered ORDER BY covered_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # --- 추천 후보 backlog ---
+
+    def batch_prompt(self):
+        exclude = ', '.join(self.recent_covered()) or '없음'
+        return TOPIC_BATCH_PROMPT.format(count=self.batch_size, exclude=exclude)
+
+    def add_candidates(self, text):
+        """
+        모델 응답(한 줄에 하나)을 파싱해 backlog에 넣고 추가된 후보 수를 반환합니다.
+        빅테크와 이미 다룬 티커는 제외합니다.
+        """
+        now = time.time()
+        added = 0
+        seen = set()
+        for line in text.splitlines():
+            parsed = parse_candidate(line)
+            if parsed is None:
+                continue
+            name, ticker = parsed
+            if ticker in seen or ticker in EXCLUDED_TICKERS or self.is_covered(ticker):
+                continue
+            seen.add(ticker)
+            with self._lock:
+                cursor = self._conn.execute(
+                    "INSERT INTO candidates (ticker, name, rank, status, fetched_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(ticker) DO UPDATE SET name = excluded.name, rank = excluded.rank, "
+                    "status = excluded.status, fetched_at = excluded.fetched_at, reserved_at = NULL "
+                    f"WHERE {_AVAILABLE}",
+                    (ticker, name, len(seen), BACKLOG, now, BACKLOG, RESERVED, self._reserve_cutoff())
+                )
+                self._conn.commit()
+                added += cursor.rowcount
+        return added
+
+    def _reserve_cutoff(self):
+        return time.time() - self.reserve_seconds
+
+    def backlog_size(self):
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM candidates WHERE {_AVAILABLE} AND fetched_at >= ?",
+                (BACKLOG, RESERVED, self._reserve_cutoff(), time.time() - self.max_age_seconds)
+            ).fetchone()[0]
+
+    def take(self):
+        """
+        아직 다루지 않은 가장 순위가 높은 후보를 예약하고 '기업명 (티커)'로 반환합니다. 없으면 None.
+        게시되면 mark_covered가 used로 바꾸고, 실패하면 release로 되돌립니다.
+        예약은 조건부 UPDATE로 하므로 여러 프로세스가 동시에 꺼내도 같은 후보를 두 번 예약하지 않습니다.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT ticker, name FROM candidates WHERE {_AVAILABLE} AND fetched_at >= ? "
+                "ORDER BY fetched_at DESC, rank",
+                (BACKLOG, RESERVED, self._reserve_cutoff(), now - self.max_age_seconds)
+            ).fetchall()
+            for ticker, name in rows:
+                covered = self._conn.execute("SELECT 1 FROM covered WHERE ticker = ?", (ticker,)).fetchone()
+                # 그 사이 다른 프로세스가 예약했으면 rowcount가 0
+                cursor = self._conn.execute(
+                    f"UPDATE candidates SET status = ?, reserved_at = ? WHERE ticker = ? AND {_AVAILABLE}",
+                    (SKIPPED if covered else RESERVED, now, ticker, BACKLOG, RESERVED, self._reserve_cutoff())
+                )
+                self._conn.commit()
+                if not covered and cursor.rowcount:
+                    return f"{name} ({ticker})"
+        return None
+
+    def release(self, ticker):
+        """
+        예약한 후보를 backlog로 되돌립니다. 생성이나 업로드가 실패했을 때 호출합니다.
+        """
+        if not ticker:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE candidates SET status = ?, reserved_at = NULL WHERE ticker = ? AND status = ?",
+                (BACKLOG, ticker, RESERVED)
+            )
+            self._conn.commit()
+
+    def fallback(self):
+        """
+        모델 호출이 모두 실패했을 때의 주제. backlog 후보(take와 같은 조건) → 아직 다루지 않은 기본 목록 순입니다.
+        """
+        topic = self.take()
+        if topic:
+            return topic
+        now = time.time()
+        for topic in FALLBACK_TOPICS:
+            ticker = ticker_from_title(topic)
+            if self.is_covered(ticker):
+                continue
+            with self._lock:
+                # 다음 실패 때 같은 기본 후보가 반복되지 않도록 예약 기록을 남김 (이미 예약/사용된 후보면 rowcount가 0)
+                cursor = self._conn.execute(
+                    "INSERT INTO candidates (ticker, name, rank, status, fetched_at, reserved_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(ticker) DO UPDATE SET status = excluded.status, fetched_at = excluded.fetched_at, "
+                    f"reserved_at = excluded.reserved_at WHERE {_AVAILABLE}",
+                    (ticker, topic[:topic.rfind('(')].strip(), 0, RESERVED, now, now,
+                     BACKLOG, RESERVED, self._reserve_cutoff())
+                )
+                self._conn.commit()
+            if cursor.rowcount:
+                return topic
+        return random.choice(FALLBACK_TOPICS)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
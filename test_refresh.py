@@ -1,7 +1,5 @@
 import os
 from dotenv import load_dotenv
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +13,10 @@ def test_refresh():
         print("Missing credentials in .env")
         return
 
+    # google-auth는 인증 정보가 있을 때만 불러옵니다 (import 비용이 큼)
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+
     creds = Credentials(
         None,
         refresh_token=refresh_token,